@@ -0,0 +1,487 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from dataclasses import dataclass
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+from urllib.parse import quote
+
+from ngwidgets.progress import TqdmProgressbar
+
+from nicepdf.linearize import Linearizer
+from nicepdf.pdf_backend import PdfBackends
+from nicepdf.pdftool import PdfFile, PDFTool
+from nicepdf.progress import ProgressBus
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    the result of a single benchmark run
+    """
+
+    name: str
+    pages: int  # number of output pages
+    seconds: float
+    peak_memory: int  # peak of traced memory in bytes
+    output_size: int = 0  # size of the output file in bytes
+
+    @property
+    def memory_per_page(self) -> float:
+        """
+        the peak memory per output page in bytes
+        """
+        per_page = self.peak_memory / self.pages if self.pages else 0.0
+        return per_page
+
+    def __str__(self):
+        text = f"{self.name:30} {self.pages:5} pages {self.seconds:8.3f} s {self.memory_per_page/1024:9.1f} KiB/page {self.output_size/1024:9.1f} KiB"
+        return text
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """
+    static file handler without request logging
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Benchmark:
+    """
+    benchmark for the nicepdf operations
+    """
+
+    def __init__(self, work_dir: str = None, verbose: bool = False):
+        """
+        constructor
+
+        Args:
+            work_dir (str): the directory for the example and output files - default: a nicepdf_benchmark temp directory
+            verbose (bool): if True show the results when they are available
+        """
+        if work_dir is None:
+            work_dir = os.path.join(tempfile.gettempdir(), "nicepdf_benchmark")
+        os.makedirs(work_dir, exist_ok=True)
+        self.work_dir = work_dir
+        self.verbose = verbose
+        self.results = []
+
+    def measure(
+        self,
+        name: str,
+        pages: int,
+        func: Callable,
+        *args,
+        output_path: str = None,
+        trace_memory: bool = True,
+        **kwargs,
+    ):
+        """
+        measure the time and the peak memory of the given function call
+
+        Args:
+            name (str): the name of the benchmark
+            pages (int): the number of pages processed
+            func (Callable): the function to call
+            output_path (str): the output file created by the function call - if any
+            trace_memory (bool): if False only measure the time - tracing slows down python code
+
+        Returns:
+            BenchmarkResult: the result of the measurement
+        """
+        if trace_memory:
+            tracemalloc.start()
+        peak = 0
+        start = time.perf_counter()
+        try:
+            func(*args, **kwargs)
+            seconds = time.perf_counter() - start
+            if trace_memory:
+                _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+        result = BenchmarkResult(
+            name=name, pages=pages, seconds=seconds, peak_memory=peak
+        )
+        if output_path:
+            result.output_size = os.path.getsize(output_path)
+        self.results.append(result)
+        if self.verbose:
+            print(result)
+        return result
+
+    def get_example_booklet(
+        self,
+        double_pages: int,
+        with_random_rotation: bool = False,
+        as_scan: bool = False,
+        seed: int = None,
+    ) -> str:
+        """
+        get the path of an example booklet with the given number of double pages
+        - the booklet is created if it does not exist yet
+
+        Args:
+            double_pages (int): the number of double pages
+            with_random_rotation (bool): if True rotate the pages randomly
+            as_scan (bool): if True create image only pages like scans
+            seed (int): the seed for reproducible random rotations
+        """
+        postfix = "_rot" if with_random_rotation else ""
+        if as_scan:
+            postfix += "_scan"
+        if seed is not None:
+            postfix += f"_seed{seed}"
+        path = os.path.join(self.work_dir, f"booklet_{double_pages}{postfix}.pdf")
+        if not os.path.exists(path):
+            booklet = PdfFile(path)
+            booklet.create_example_booklet(
+                double_pages,
+                with_random_rotation=with_random_rotation,
+                as_scan=as_scan,
+                seed=seed,
+            )
+        return path
+
+    def unbooklet(
+        self,
+        double_pages: int,
+        compact: bool = False,
+        as_scan: bool = False,
+        image_mode: str = "clip",
+    ) -> BenchmarkResult:
+        """
+        benchmark the un-booklet operation for the given number of double pages
+
+        Args:
+            double_pages (int): the number of double pages of the booklet
+            compact (bool): if True use the compact HalfPageRef representation
+            as_scan (bool): if True use a booklet of scanned images
+            image_mode (str): see PDFTool.image_modes
+        """
+        input_path = self.get_example_booklet(double_pages, as_scan=as_scan)
+        mode = "compact" if compact else "standard"
+        if as_scan:
+            mode = f"{mode} scan {image_mode}"
+        output_path = os.path.join(
+            self.work_dir, f"booklet_{double_pages}_{mode.replace(' ', '_')}.pdf"
+        )
+        tool = PDFTool(input_path, output_path)
+        tool.compact = compact
+        tool.image_mode = image_mode
+        progress_bar = TqdmProgressbar(
+            total=tool.get_total_steps(), desc=f"unbooklet {mode}", unit="step"
+        )
+        result = self.measure(
+            f"unbooklet {mode}",
+            double_pages * 2,
+            tool.split_booklet_style,
+            progress_bar,
+            output_path=output_path,
+        )
+        return result
+
+    def backends(
+        self, double_pages: int, as_scan: bool = False, repeat: int = 3
+    ) -> List[BenchmarkResult]:
+        """
+        benchmark the un-booklet operation with each available PdfBackend
+
+        the memory is not traced since the backends based on native
+        libraries allocate most of their memory outside of python
+
+        Args:
+            double_pages (int): the number of double pages of the booklet
+            as_scan (bool): if True use a booklet of scanned images
+            repeat (int): the number of runs per backend - the fastest run counts
+
+        Returns:
+            List[BenchmarkResult]: the result for each backend
+        """
+        input_path = self.get_example_booklet(
+            double_pages, with_random_rotation=True, as_scan=as_scan
+        )
+        mode = "scan" if as_scan else "vector"
+        results = []
+        for name in PdfBackends.available():
+            output_path = os.path.join(
+                self.work_dir, f"booklet_{double_pages}_{mode}_{name}.pdf"
+            )
+            tool = PDFTool(input_path, output_path)
+            tool.backend = name
+            runs = []
+            for _i in range(repeat):
+                progress_bus = ProgressBus(total=tool.get_total_steps(), interval=60.0)
+                result = self.measure(
+                    f"unbooklet {mode} {name}",
+                    double_pages * 2,
+                    tool.split_booklet_style,
+                    progress_bus,
+                    output_path=output_path,
+                    trace_memory=False,
+                )
+                self.results.remove(result)
+                runs.append(result)
+            result = min(runs, key=lambda run: run.seconds)
+            self.results.append(result)
+            results.append(result)
+        return results
+
+    def fastest_backend(self, double_pages: int = 10, choice_path: str = None) -> str:
+        """
+        benchmark the available PdfBackends and save the fastest one
+        as the choice of the auto backend
+
+        Args:
+            double_pages (int): the number of double pages of the example booklets to benchmark with
+            choice_path (str): the path to save the choice to - default: PdfBackends.choice_path
+
+        Returns:
+            str: the name of the backend
+        """
+        names = PdfBackends.available()
+        seconds = {name: 0.0 for name in names}
+        for as_scan in [False, True]:
+            results = self.backends(double_pages, as_scan=as_scan)
+            for name, result in zip(names, results):
+                seconds[name] += result.seconds
+        fastest = min(seconds, key=seconds.get)
+        PdfBackends.save_choice(fastest, seconds, path=choice_path)
+        if self.verbose:
+            print(f"fastest backend: {fastest}")
+        return fastest
+
+    def poster(
+        self,
+        double_pages: int,
+        source_format: str = "A4",
+        target_format: str = "A2",
+        deterministic: bool = False,
+        max_workers: int = None,
+    ) -> BenchmarkResult:
+        """
+        benchmark the poster operation for an example booklet with the given number of double pages
+
+        Args:
+            double_pages (int): the number of double pages of the booklet
+            source_format (str): the sheet format
+            target_format (str): the poster format
+            deterministic (bool): if True write reproducible output
+            max_workers (int): the number of worker processes - default: no process pool
+        """
+        input_path = self.get_example_booklet(double_pages)
+        output_path = os.path.join(
+            self.work_dir, f"poster_{double_pages}_{target_format}.pdf"
+        )
+        tool = PDFTool(input_path, output_path)
+        tool.deterministic = deterministic
+        tool.max_workers = max_workers
+        name = f"poster {source_format} {target_format}"
+        if max_workers is not None:
+            name = f"{name} {max_workers} workers"
+        result = self.measure(
+            name,
+            double_pages,
+            tool.poster,
+            source_format,
+            target_format,
+            output_path=output_path,
+        )
+        return result
+
+    def poster_scaling(
+        self,
+        double_pages: int,
+        source_format: str = "A4",
+        target_format: str = "A0",
+        worker_counts: List[int] = None,
+    ) -> List[BenchmarkResult]:
+        """
+        benchmark the poster operation with different numbers of worker processes
+
+        Args:
+            double_pages (int): the number of double pages of the booklet
+            source_format (str): the sheet format
+            target_format (str): the poster format
+            worker_counts (list): the numbers of workers - default: 1, 2, 4 ... up to the number of cpus
+
+        Returns:
+            List[BenchmarkResult]: the result for each number of workers
+        """
+        if worker_counts is None:
+            cpus = os.cpu_count() or 1
+            worker_counts = [1]
+            while worker_counts[-1] * 2 <= cpus:
+                worker_counts.append(worker_counts[-1] * 2)
+        results = [
+            self.poster(
+                double_pages, source_format, target_format, max_workers=max_workers
+            )
+            for max_workers in worker_counts
+        ]
+        return results
+
+    def time_to_first_page(
+        self, path: str, bytes_per_second: float = 1e6, chunk_size: int = 16384
+    ) -> float:
+        """
+        measure the time until a viewer could show the first page of the given pdf
+        when it is loaded from a local http server with the given bandwidth
+
+        a linearized pdf may be shown as soon as the first page section (/E)
+        has arrived - any other pdf needs the xref table at the end of the file
+
+        Args:
+            path (str): the pdf to serve
+            bytes_per_second (float): the simulated bandwidth
+            chunk_size (int): the number of bytes to read at a time
+
+        Returns:
+            float: the time in seconds
+        """
+        handler = partial(QuietHandler, directory=os.path.dirname(path))
+        with ThreadingHTTPServer(("127.0.0.1", 0), handler) as server:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                url = f"http://127.0.0.1:{server.server_port}/{quote(os.path.basename(path))}"
+                start = time.perf_counter()
+                with urllib.request.urlopen(url) as response:
+                    needed = int(response.headers["Content-Length"])
+                    received = b""
+                    while len(received) < needed:
+                        chunk = response.read(chunk_size)
+                        if not chunk:
+                            break
+                        time.sleep(len(chunk) / bytes_per_second)
+                        if len(received) < 1024 <= len(received) + len(chunk):
+                            parameters = Linearizer.get_parameters(received + chunk)
+                            if parameters:
+                                needed = parameters["E"]
+                        received += chunk
+                seconds = time.perf_counter() - start
+            finally:
+                server.shutdown()
+        return seconds
+
+    def first_page(
+        self,
+        double_pages: int,
+        linearize: bool,
+        as_scan: bool = True,
+        bytes_per_second: float = 1e6,
+    ) -> BenchmarkResult:
+        """
+        benchmark the time to the first page of an un-booklet result
+        served by a local http server
+
+        Args:
+            double_pages (int): the number of double pages of the booklet
+            linearize (bool): if True write linearized output
+            as_scan (bool): if True use a booklet of scanned images
+            bytes_per_second (float): the simulated bandwidth
+        """
+        input_path = self.get_example_booklet(double_pages, as_scan=as_scan)
+        mode = "linearized" if linearize else "standard"
+        output_path = os.path.join(
+            self.work_dir, f"booklet_{double_pages}_first_page_{mode}.pdf"
+        )
+        tool = PDFTool(input_path, output_path)
+        tool.linearize = linearize
+        tool.split_booklet_style()
+        seconds = self.time_to_first_page(output_path, bytes_per_second)
+        result = BenchmarkResult(
+            name=f"first page {mode}",
+            pages=1,
+            seconds=seconds,
+            peak_memory=0,
+            output_size=os.path.getsize(output_path),
+        )
+        self.results.append(result)
+        if self.verbose:
+            print(result)
+        return result
+
+    def render_time(self, path: str, dpi: int = 72, repeat: int = 3) -> float:
+        """
+        measure the time to render all pages of the given pdf with pymupdf
+
+        Args:
+            path (str): the pdf to render
+            dpi (int): the resolution to render with
+            repeat (int): the number of runs - the fastest run counts
+
+        Returns:
+            float: the time in seconds or None if pymupdf is not installed
+        """
+        try:
+            import pymupdf
+        except ImportError:
+            return None
+        times = []
+        for _i in range(repeat):
+            start = time.perf_counter()
+            with pymupdf.open(path) as document:
+                for page in document:
+                    page.get_pixmap(dpi=dpi)
+            times.append(time.perf_counter() - start)
+        seconds = min(times)
+        return seconds
+
+    def simplify(
+        self, double_pages: int, as_scan: bool = False
+    ) -> List[BenchmarkResult]:
+        """
+        benchmark the content stream simplifier - the results show the time
+        to render the un-booklet result without and with simplified content streams
+
+        Args:
+            double_pages (int): the number of double pages of the booklet
+            as_scan (bool): if True use a booklet of scanned images
+
+        Returns:
+            List[BenchmarkResult]: the standard and the simplified result
+            - empty if pymupdf is not installed
+        """
+        input_path = self.get_example_booklet(
+            double_pages, with_random_rotation=True, as_scan=as_scan
+        )
+        results = []
+        for simplify in [False, True]:
+            mode = "simplified" if simplify else "standard"
+            output_path = os.path.join(
+                self.work_dir, f"booklet_{double_pages}_render_{mode}.pdf"
+            )
+            tool = PDFTool(input_path, output_path)
+            tool.simplify = simplify
+            tool.split_booklet_style()
+            if simplify and self.verbose:
+                print(f"simplified content streams: {tool.simplifier.stats}")
+            seconds = self.render_time(output_path)
+            if seconds is None:
+                return []
+            result = BenchmarkResult(
+                name=f"render {mode}",
+                pages=double_pages * 2,
+                seconds=seconds,
+                peak_memory=0,
+                output_size=os.path.getsize(output_path),
+            )
+            self.results.append(result)
+            if self.verbose:
+                print(result)
+            results.append(result)
+        return results
@@ -0,0 +1,238 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import os
+import shutil
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import List
+
+from pypdf import PdfWriter
+
+
+@dataclass
+class Chunk:
+    """
+    a chunk of output pages that has been flushed to disk
+    """
+
+    index: int  # counting from 0
+    first: int  # index of the first output page of the chunk
+    count: int  # number of pages in the chunk
+    file_name: str  # relative to the checkpoint directory
+
+
+@dataclass
+class Manifest:
+    """
+    the progress of a checkpointed job
+    """
+
+    job_id: str  # changes whenever the input or the options change
+    total: int  # the number of output pages
+    chunks: List[Chunk] = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        """
+        the number of output pages that have been flushed
+        """
+        done = sum(chunk.count for chunk in self.chunks)
+        return done
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "Manifest":
+        chunks = [Chunk(**chunk) for chunk in record.get("chunks", [])]
+        manifest = cls(job_id=record["job_id"], total=record["total"], chunks=chunks)
+        return manifest
+
+
+class Checkpoint:
+    """
+    flushes the pages of a long running job to chunk files and records
+    the progress in a manifest so that the job may be resumed after a crash
+
+    several jobs may convert the same input to the same output e.g. in
+    the sessions of the web server - the job holding the lock file next to
+    the checkpoint directory is the only one using it
+    """
+
+    # number of pages per chunk if not specified otherwise
+    default_interval = 50
+
+    def __init__(self, output_path: str, job_id: str, total: int, interval: int = None):
+        """
+        constructor
+
+        Args:
+            output_path (str): the final output file - the chunks are kept next to it
+            job_id (str): the id of the job - a different id invalidates older chunks
+            total (int): the number of output pages
+            interval (int): the number of pages per chunk - default: default_interval
+        """
+        self.output_path = output_path
+        self.checkpoint_dir = f"{output_path}.checkpoint"
+        self.manifest_path = os.path.join(self.checkpoint_dir, "manifest.json")
+        self.lock_path = f"{self.checkpoint_dir}.lock"
+        # identifies my lock and my temporary files
+        self.owner = f"{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self.locked = False
+        if interval is None:
+            interval = Checkpoint.default_interval
+        self.interval = max(1, interval)
+        self.manifest = Manifest(job_id=job_id, total=total)
+
+    def acquire(self) -> bool:
+        """
+        lock my checkpoint directory - the lock of a crashed process is taken over
+
+        Returns:
+            bool: False if another running job holds the lock
+        """
+        for _attempt in range(2):
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self.is_lock_alive():
+                    break
+                try:
+                    os.remove(self.lock_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as lock_file:
+                lock_file.write(self.owner)
+            self.locked = True
+            break
+        return self.locked
+
+    def is_lock_alive(self) -> bool:
+        """
+        check whether the process holding my lock file is still running
+        """
+        try:
+            with open(self.lock_path) as lock_file:
+                owner = lock_file.read()
+            pid = int(owner.split("_")[0])
+        except FileNotFoundError:
+            return False
+        except ValueError:
+            # the lock file is just being written
+            return True
+        try:
+            os.kill(pid, 0)
+            alive = True
+        except ProcessLookupError:
+            alive = False
+        except PermissionError:
+            # a process of another user
+            alive = True
+        return alive
+
+    def release(self):
+        """
+        remove my lock file
+        """
+        if self.locked:
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+            self.locked = False
+
+    def load(self) -> bool:
+        """
+        load the manifest of an earlier run of the same job
+
+        Returns:
+            bool: True if the earlier progress may be resumed
+        """
+        resumable = False
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path) as manifest_file:
+                    manifest = Manifest.from_dict(json.load(manifest_file))
+            except (ValueError, KeyError, TypeError):
+                # e.g. a truncated manifest of an old format - start over
+                manifest = None
+            if (
+                manifest
+                and manifest.job_id == self.manifest.job_id
+                and manifest.total == self.manifest.total
+            ):
+                chunks = []
+                for chunk in manifest.chunks:
+                    if not os.path.exists(self.get_path(chunk)):
+                        break
+                    chunks.append(chunk)
+                self.manifest.chunks = chunks
+                resumable = True
+        return resumable
+
+    def reset(self):
+        """
+        remove all chunks and start over
+        """
+        self.cleanup()
+        self.manifest.chunks = []
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        self.store()
+
+    def get_path(self, chunk: Chunk) -> str:
+        path = os.path.join(self.checkpoint_dir, chunk.file_name)
+        return path
+
+    def store(self):
+        """
+        store my manifest atomically
+        """
+        tmp_path = f"{self.manifest_path}.tmp{self.owner}"
+        with open(tmp_path, "w") as manifest_file:
+            json.dump(asdict(self.manifest), manifest_file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    @property
+    def done(self) -> int:
+        return self.manifest.done
+
+    def add_chunk(self, writer: PdfWriter):
+        """
+        flush the pages of the given writer to the next chunk file
+
+        Args:
+            writer (PdfWriter): the writer with the next pages
+        """
+        index = len(self.manifest.chunks)
+        chunk = Chunk(
+            index=index,
+            first=self.done,
+            count=len(writer.pages),
+            file_name=f"chunk_{index:05d}.pdf",
+        )
+        chunk_path = self.get_path(chunk)
+        # the chunk only counts once it has been completely written
+        tmp_path = f"{chunk_path}.tmp{self.owner}"
+        with open(tmp_path, "wb") as chunk_file:
+            writer.write(chunk_file)
+        os.replace(tmp_path, chunk_path)
+        self.manifest.chunks.append(chunk)
+        self.store()
+
+    def get_chunk_paths(self) -> List[str]:
+        """
+        get the paths of my chunk files in page order
+        - see PdfConcatenator to concatenate them
+        """
+        paths = [self.get_path(chunk) for chunk in self.manifest.chunks]
+        return paths
+
+    def cleanup(self):
+        """
+        remove my checkpoint directory
+        """
+        if os.path.isdir(self.checkpoint_dir):
+            shutil.rmtree(self.checkpoint_dir)
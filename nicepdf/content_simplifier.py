@@ -0,0 +1,209 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+from copy import copy
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from pypdf import PageObject, PdfWriter
+from pypdf.generic import FloatObject, NumberObject
+
+
+@dataclass
+class SimplifyStats:
+    """
+    the operator counts of the simplified content streams
+    """
+
+    pages: int = 0
+    operators_before: int = 0
+    operators_after: int = 0
+
+    @property
+    def reduction(self) -> float:
+        """
+        the fraction of operators that has been removed
+        """
+        reduction = 0.0
+        if self.operators_before:
+            reduction = 1 - self.operators_after / self.operators_before
+        return reduction
+
+    def __str__(self):
+        text = f"{self.pages} pages {self.operators_before} → {self.operators_after} operators (-{self.reduction:.0%})"
+        return text
+
+
+class ContentSimplifier:
+    """
+    flattens the content streams of generated pages - each copy, merge or
+    scale of a page wraps its content in another q/cm/Q level
+
+    - consecutive cm matrices are pre-multiplied and identity matrices dropped
+    - save/restore pairs whose restore has no effect are removed
+    - empty q Q and BT ET pairs and path ends without a path are removed
+    """
+
+    path_operators = {b"m", b"l", b"c", b"v", b"y", b"h", b"re", b"W", b"W*"}
+
+    def __init__(self):
+        self.stats = SimplifyStats()
+
+    @classmethod
+    def multiply(cls, first: Tuple[float, ...], second: Tuple[float, ...]) -> tuple:
+        """
+        get the matrix that has the effect of first cm followed by second cm
+
+        Args:
+            first (tuple): the operands a b c d e f of the first cm
+            second (tuple): the operands of the second cm
+
+        Returns:
+            tuple: the operands of the combined cm
+        """
+        a1, b1, c1, d1, e1, f1 = first
+        a2, b2, c2, d2, e2, f2 = second
+        product = (
+            a2 * a1 + b2 * c1,
+            a2 * b1 + b2 * d1,
+            c2 * a1 + d2 * c1,
+            c2 * b1 + d2 * d1,
+            e2 * a1 + f2 * c1 + e1,
+            e2 * b1 + f2 * d1 + f1,
+        )
+        return product
+
+    @classmethod
+    def to_number(cls, value: float):
+        # no rounding - viewers snap exactly axis aligned images differently
+        if value == int(value):
+            number = NumberObject(int(value))
+        else:
+            number = FloatObject(value)
+        return number
+
+    @classmethod
+    def get_pairs(cls, operations: list) -> Optional[Dict[int, int]]:
+        """
+        get the matching save/restore pairs of the given operations
+
+        Returns:
+            dict: the index of the Q by the index of its q - None if q and Q are unbalanced
+        """
+        pairs = {}
+        stack = []
+        for index, (_operands, operator) in enumerate(operations):
+            if operator == b"q":
+                stack.append(index)
+            elif operator == b"Q":
+                if not stack:
+                    return None
+                pairs[stack.pop()] = index
+        if stack:
+            return None
+        return pairs
+
+    def remove_redundant_pairs(self, operations: list) -> list:
+        """
+        remove the save/restore pairs that are directly followed by the
+        restore of the enclosing pair or by the end of the stream - the state
+        they restore is not used anymore
+        """
+        pairs = self.get_pairs(operations)
+        if not pairs:
+            return operations
+        last = len(operations) - 1
+        removed = set()
+        for start, end in pairs.items():
+            if end == last or operations[end + 1][1] == b"Q":
+                removed.update((start, end))
+        operations = [op for index, op in enumerate(operations) if index not in removed]
+        return operations
+
+    def merge_operations(self, operations: list) -> list:
+        """
+        merge consecutive cm operators and drop operations without effect
+        """
+        identity = (1, 0, 0, 1, 0, 0)
+        result = []
+        for operands, operator in operations:
+            previous = result[-1][1] if result else None
+            if operator == b"cm":
+                matrix = tuple(float(value) for value in operands)
+                if previous == b"cm":
+                    first = tuple(float(value) for value in result.pop()[0])
+                    matrix = self.multiply(first, matrix)
+                    operands = [self.to_number(value) for value in matrix]
+                if matrix != identity:
+                    result.append((operands, operator))
+                continue
+            if operator == b"Q" and previous == b"q":
+                result.pop()
+                continue
+            if operator == b"ET" and previous == b"BT":
+                result.pop()
+                continue
+            if operator == b"n" and previous not in self.path_operators:
+                continue
+            result.append((operands, operator))
+        return result
+
+    def simplify_operations(self, operations: list) -> list:
+        """
+        simplify the given content stream operations
+
+        Args:
+            operations (list): (operands, operator) tuples as parsed by pypdf
+
+        Returns:
+            list: the simplified operations
+        """
+        while True:
+            count = len(operations)
+            operations = self.merge_operations(operations)
+            operations = self.remove_redundant_pairs(operations)
+            if len(operations) == count:
+                break
+        return operations
+
+    def simplify_page(self, page: PageObject) -> PageObject:
+        """
+        replace the content stream of the given page by a simplified one
+
+        Args:
+            page (PageObject): the page e.g. a generated half page
+
+        Returns:
+            PageObject: the page or a simplified copy of a page of a reader
+        """
+        content = page.get_contents()
+        if content is None:
+            return page
+        reference = page.indirect_reference
+        if reference is not None and not isinstance(reference.pdf, PdfWriter):
+            # keep the page of the reader - simplify a detached copy
+            page = copy(page)
+            page.indirect_reference = None
+        operations = content.operations
+        simplified = self.simplify_operations(operations)
+        self.stats.pages += 1
+        self.stats.operators_before += len(operations)
+        self.stats.operators_after += len(simplified)
+        content.operations = simplified
+        page.replace_contents(content)
+        return page
+
+    @classmethod
+    def count_operators(cls, pages: List[PageObject]) -> int:
+        """
+        count the content stream operators of the given pages
+        """
+        count = 0
+        for page in pages:
+            content = page.get_contents()
+            if content is not None:
+                count += len(content.operations)
+        return count
@@ -0,0 +1,139 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import List, Optional
+
+from pypdf import PageObject, PdfWriter
+
+
+class DebugCollector:
+    """
+    collects the rotated, left and right page of each split double page in
+    a single debug pdf with an outline entry per double page and a json
+    trace of the numbering and rotation
+
+    the pages are added to one shared writer so that the resources of a
+    scan are stored once instead of once per debug file - the pdf and the
+    trace are serialized by a background thread started by close
+    """
+
+    def __init__(self, debug_path: str, source: str = None):
+        """
+        constructor
+
+        Args:
+            debug_path (str): the path of the debug pdf - the trace is written next to it as .json
+            source (str): the path of the split pdf for the trace
+        """
+        self.pdf_path = debug_path
+        self.trace_path = os.path.splitext(debug_path)[0] + ".json"
+        self.source = source
+        self.writer = PdfWriter()
+        self.trace: List[dict] = []
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[Exception] = None
+
+    @classmethod
+    def for_input(cls, input_path: str, debug_dir: str = None) -> "DebugCollector":
+        """
+        get a collector for the given input file
+
+        Args:
+            input_path (str): the path of the booklet
+            debug_dir (str): the directory for the debug files - default: the temp directory
+
+        Returns:
+            DebugCollector: the collector writing to {debug_dir}/{name}_debug.pdf
+        """
+        if debug_dir is None:
+            debug_dir = tempfile.gettempdir()
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        debug_path = os.path.join(debug_dir, f"{name}_debug.pdf")
+        collector = cls(debug_path, source=input_path)
+        return collector
+
+    def add(
+        self,
+        index: int,
+        left_num: int,
+        right_num: int,
+        rotation: int,
+        rotated_page: PageObject,
+        left_half: PageObject,
+        right_half: PageObject,
+    ):
+        """
+        add the pages of the given split double page
+
+        Args:
+            index (int): the index of the double page counting from 0
+            left_num (int): the page number of the left half
+            right_num (int): the page number of the right half
+            rotation (int): the rotation of the double page
+            rotated_page (PageObject): the upright double page
+            left_half (PageObject): the left half page
+            right_half (PageObject): the right half page
+        """
+        if self.thread is not None:
+            raise RuntimeError("the debug collector has already been closed")
+        first = len(self.writer.pages)
+        for page in (rotated_page, left_half, right_half):
+            self.writer.add_page(page)
+        self.writer.add_outline_item(
+            f"{index}: {left_num}-{right_num} {rotation}", first
+        )
+        record = {
+            "index": index,
+            "left": left_num,
+            "right": right_num,
+            "rotation": rotation,
+            # the page indices of the rotated page and the halves in the debug pdf
+            "debug_pages": [first, first + 1, first + 2],
+        }
+        self.trace.append(record)
+
+    def write(self):
+        """
+        write the debug pdf and the trace - each file is replaced atomically
+        """
+        try:
+            tmp_path = f"{self.pdf_path}.tmp{os.getpid()}"
+            with open(tmp_path, "wb") as pdf_file:
+                self.writer.write(pdf_file)
+            os.replace(tmp_path, self.pdf_path)
+            trace = {"source": self.source, "double_pages": self.trace}
+            tmp_path = f"{self.trace_path}.tmp{os.getpid()}"
+            with open(tmp_path, "w") as json_file:
+                json.dump(trace, json_file, indent=2)
+            os.replace(tmp_path, self.trace_path)
+        except Exception as ex:
+            self.error = ex
+
+    def close(self):
+        """
+        start writing the debug files in the background
+        """
+        if self.thread is None:
+            self.thread = threading.Thread(
+                target=self.write, name="debug collector", daemon=True
+            )
+            self.thread.start()
+
+    def wait(self):
+        """
+        wait until the debug files have been written
+
+        Raises:
+            Exception: the error that happened while writing
+        """
+        self.close()
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,288 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject, StreamObject
+
+from nicepdf.memory_budget import PageMemoryEstimator
+
+
+@dataclass
+class CacheStats:
+    """
+    the metrics of a DocumentCache
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    in_use: int = 0  # entries referenced by at least one session
+    memory: int = 0  # the estimated bytes of all entries
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return rate
+
+    def as_dict(self) -> dict:
+        record = asdict(self)
+        record["hit_rate"] = self.hit_rate
+        return record
+
+    def __str__(self):
+        text = (
+            f"{self.entries} documents ({self.in_use} in use) {self.memory/1024:.1f} KiB "
+            f"hit rate {self.hit_rate:.1%} - {self.hits} hits {self.misses} misses {self.evictions} evictions"
+        )
+        return text
+
+
+class CachedDocument:
+    """
+    a parsed pdf shared by several sessions
+
+    all objects are parsed when the document is loaded so that the reader
+    does not touch its stream any more and can be read from several
+    threads - the sessions must not modify the objects of the reader
+    """
+
+    def __init__(self, key: Tuple[str, int, int]):
+        """
+        constructor
+
+        Args:
+            key (tuple): the real path, mtime in ns and size of the file
+        """
+        self.key = key
+        self.path = key[0]
+        self.reader: PdfReader = None
+        self.size = 0  # the estimated bytes of the buffer and the parsed streams
+        self.refs = 0
+        self.loaded = threading.Event()
+        self.error: Exception = None
+        # structures derived from the reader e.g. the half page references,
+        # the single image pages and the scan analyses
+        self.derived: Dict[Any, Any] = {}
+        self.lock = threading.Lock()
+
+    def __str__(self):
+        return f"{self.path} {self.size/1024:.1f} KiB {self.refs} refs"
+
+    def load(self):
+        """
+        read and parse my file
+        """
+        with open(self.path, "rb") as pdf_file:
+            data = pdf_file.read()
+        reader = PdfReader(BytesIO(data))
+        stream_bytes = self.preload(reader)
+        self.size = len(data) + stream_bytes
+        self.reader = reader
+
+    @classmethod
+    def preload(cls, reader: PdfReader) -> int:
+        """
+        parse all objects of the given reader
+
+        Returns:
+            int: the encoded bytes of the parsed streams
+        """
+        stream_bytes = 0
+        refs = [
+            (idnum, generation)
+            for generation, offsets in reader.xref.items()
+            for idnum in offsets
+            # free objects
+            if generation != 65535
+        ]
+        refs.extend((idnum, 0) for idnum in reader.xref_objStm)
+        for idnum, generation in refs:
+            pdf_object = reader.get_object(IndirectObject(idnum, generation, reader))
+            if isinstance(pdf_object, StreamObject):
+                stream_bytes += PageMemoryEstimator.stream_length(pdf_object)
+        # flatten the page tree
+        len(reader.pages)
+        return stream_bytes
+
+    def derive(self, key, factory: Callable[[], Any]) -> Any:
+        """
+        get the structure with the given key derived from my reader - it is
+        created by the given factory once and shared afterwards
+
+        Args:
+            key: the key of the structure e.g. ("half_page_refs", from_binder)
+            factory (Callable): creates the structure
+
+        Returns:
+            the shared structure which must not be modified
+        """
+        with self.lock:
+            if key not in self.derived:
+                self.derived[key] = factory()
+            value = self.derived[key]
+        return value
+
+
+class DocumentCache:
+    """
+    a cache of parsed pdf files shared by the sessions of the web server
+
+    documents are keyed by their path, modification time and size so that
+    a changed file is parsed again - referenced documents are kept and
+    the least recently released documents are evicted when there are more
+    than max_entries or they need more than max_memory bytes
+    """
+
+    def __init__(self, max_entries: int = 16, max_memory: int = 256 << 20):
+        """
+        constructor
+
+        Args:
+            max_entries (int): the maximum number of unreferenced documents to keep
+            max_memory (int): the maximum estimated bytes of the documents to keep
+        """
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        # in the order of their last use
+        self.documents: OrderedDict = OrderedDict()
+        # the current key of each path
+        self.keys: Dict[str, tuple] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def get_key(cls, path: str) -> Tuple[str, int, int]:
+        real_path = os.path.realpath(path)
+        stat = os.stat(real_path)
+        key = (real_path, stat.st_mtime_ns, stat.st_size)
+        return key
+
+    def acquire(self, path: str) -> CachedDocument:
+        """
+        get the parsed document for the given path - it is parsed once even if
+        several threads ask for it at the same time
+
+        Args:
+            path (str): the path of the pdf file
+
+        Returns:
+            CachedDocument: the document - release it when it is not needed any more
+        """
+        key = self.get_key(path)
+        with self.lock:
+            document = self.documents.get(key)
+            if document is None:
+                self.misses += 1
+                document = CachedDocument(key)
+                self.documents[key] = document
+                old_key = self.keys.get(key[0])
+                self.keys[key[0]] = key
+                if old_key is not None:
+                    # the file has changed
+                    self.evict_stale(old_key)
+                loading = True
+            else:
+                self.hits += 1
+                self.documents.move_to_end(key)
+                loading = False
+            document.refs += 1
+        if loading:
+            try:
+                document.load()
+            except Exception as ex:
+                document.error = ex
+                with self.lock:
+                    self.documents.pop(key, None)
+            finally:
+                document.loaded.set()
+        else:
+            document.loaded.wait()
+        if document.error is not None:
+            raise document.error
+        return document
+
+    def release(self, document: CachedDocument):
+        """
+        release the given document acquired before
+        """
+        with self.lock:
+            document.refs -= 1
+            if document.refs == 0 and self.keys.get(document.path) != document.key:
+                self.evict_stale(document.key)
+            self.evict()
+
+    @contextmanager
+    def open(self, path: str) -> Iterator[CachedDocument]:
+        """
+        acquire the document for the given path and release it afterwards
+        """
+        document = self.acquire(path)
+        try:
+            yield document
+        finally:
+            self.release(document)
+
+    def evict_stale(self, key: tuple):
+        """
+        remove the document with the given key if it is not referenced - call with my lock held
+        """
+        document = self.documents.get(key)
+        if document is not None and document.refs == 0:
+            del self.documents[key]
+            self.evictions += 1
+
+    def evict(self):
+        """
+        remove the least recently used unreferenced documents that exceed my
+        limits - call with my lock held
+        """
+        unused = [key for key, document in self.documents.items() if document.refs == 0]
+        unused_count = len(unused)
+        memory = sum(document.size for document in self.documents.values())
+        for key in unused:
+            if unused_count <= self.max_entries and memory <= self.max_memory:
+                break
+            document = self.documents.pop(key)
+            unused_count -= 1
+            memory -= document.size
+            self.evictions += 1
+            if self.keys.get(document.path) == key:
+                del self.keys[document.path]
+
+    def clear(self):
+        """
+        remove all documents that are not referenced
+        """
+        with self.lock:
+            for key in list(self.documents):
+                self.evict_stale(key)
+            self.keys = {
+                path: key for path, key in self.keys.items() if key in self.documents
+            }
+
+    def stats(self) -> CacheStats:
+        with self.lock:
+            stats = CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self.documents),
+                in_use=sum(1 for document in self.documents.values() if document.refs),
+                memory=sum(document.size for document in self.documents.values()),
+            )
+        return stats
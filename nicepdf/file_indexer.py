@@ -0,0 +1,220 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from pypdf import PdfReader
+
+from nicepdf.image_page import ImagePage
+from nicepdf.pdf_index import DocumentInfo, PdfIndex
+
+
+@dataclass
+class FileEntry:
+    """
+    the metadata of a pdf file as shown in the file selector
+    """
+
+    path: str
+    doc_info: DocumentInfo
+    kind: str  # see DocumentInfo.classify
+    thumbnail: Optional[str] = None  # file name in the thumbnail directory
+
+    @property
+    def summary(self) -> str:
+        """
+        get a short summary e.g. for a label
+        """
+        text = f"{self.doc_info.page_count} p, {self.kind}"
+        return text
+
+
+class FileIndexer:
+    """
+    indexes the pdf files below a root path in a background thread pool
+    and keeps the index up to date with a filesystem watcher
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        pdf_index: PdfIndex,
+        thumbnail_dir: str = None,
+        max_workers: int = None,
+        filter_func: Callable[[str], bool] = None,
+        thumbnail_size: int = 64,
+    ):
+        """
+        constructor
+
+        Args:
+            root_path (str): the directory to index
+            pdf_index (PdfIndex): the persistent index of the document structures
+            thumbnail_dir (str): the directory for thumbnails - default: ~/.nicepdf/thumbnails
+            max_workers (int): the maximum number of threads
+            filter_func (Callable): optional filter for file names
+            thumbnail_size (int): the maximum width/height of thumbnails
+        """
+        if thumbnail_dir is None:
+            thumbnail_dir = os.path.join(
+                os.path.expanduser("~"), ".nicepdf", "thumbnails"
+            )
+        self.root_path = os.path.abspath(root_path)
+        self.pdf_index = pdf_index
+        self.thumbnail_dir = thumbnail_dir
+        self.max_workers = max_workers
+        self.filter_func = filter_func
+        self.thumbnail_size = thumbnail_size
+        self.entries: Dict[str, FileEntry] = {}
+        # increased on every change of the entries e.g. to refresh a view
+        self.version = 0
+        self.lock = threading.Lock()
+        self.executor = None
+        self.stop_event = threading.Event()
+        self.watcher = None
+
+    def is_pdf(self, path: str) -> bool:
+        name = os.path.basename(path)
+        pdf = name.lower().endswith(".pdf") and not name.startswith("._")
+        if pdf and self.filter_func:
+            pdf = self.filter_func(name)
+        return pdf
+
+    def find_files(self) -> List[str]:
+        """
+        find the pdf files below my root path
+        """
+        paths = []
+        for dirpath, _dirnames, filenames in os.walk(self.root_path):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                if self.is_pdf(path):
+                    paths.append(path)
+        return paths
+
+    def create_thumbnail(self, path: str, file_hash: str) -> Optional[str]:
+        """
+        create a thumbnail of the first page of the given file if it is a scan
+
+        only single image pages can be shown without a pdf renderer
+
+        Returns:
+            str: the file name of the thumbnail in my thumbnail directory or None
+        """
+        name = f"{file_hash}.jpg"
+        thumbnail_path = os.path.join(self.thumbnail_dir, name)
+        if os.path.exists(thumbnail_path):
+            return name
+        reader = PdfReader(path)
+        if not reader.pages:
+            return None
+        image_page = ImagePage.detect(reader.pages[0])
+        if image_page is None:
+            return None
+        image, _area = image_page.get_upright_image()
+        image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+        tmp_path = f"{thumbnail_path}.tmp{threading.get_ident()}"
+        image.convert("RGB").save(tmp_path, "JPEG", quality=80)
+        os.replace(tmp_path, thumbnail_path)
+        return name
+
+    def index_file(self, path: str) -> Optional[FileEntry]:
+        """
+        index the given file - runs in a worker thread
+
+        Returns:
+            FileEntry: the entry or None if the file is not a readable pdf
+        """
+        try:
+            doc_info = self.pdf_index.get(path)
+            thumbnail = self.create_thumbnail(path, doc_info.file_hash)
+        except Exception:
+            # e.g. a partially written or damaged file - wait for the next change
+            return None
+        entry = FileEntry(
+            path=doc_info.path,
+            doc_info=doc_info,
+            kind=doc_info.classify(),
+            thumbnail=thumbnail,
+        )
+        with self.lock:
+            self.entries[entry.path] = entry
+            self.version += 1
+        return entry
+
+    def remove(self, path: str):
+        with self.lock:
+            if self.entries.pop(os.path.abspath(path), None):
+                self.version += 1
+
+    def get_entry(self, path: str) -> Optional[FileEntry]:
+        with self.lock:
+            entry = self.entries.get(os.path.abspath(path))
+        return entry
+
+    def submit(self, path: str) -> Future:
+        future = self.executor.submit(self.index_file, path)
+        return future
+
+    def scan(self) -> List[Future]:
+        """
+        index all pdf files below my root path in my thread pool
+        """
+        futures = [self.submit(path) for path in self.find_files()]
+        return futures
+
+    def watch(self):
+        """
+        keep my entries up to date - runs in the watcher thread
+        """
+        import watchfiles
+
+        for changes in watchfiles.watch(
+            self.root_path,
+            watch_filter=lambda _change, path: self.is_pdf(path),
+            stop_event=self.stop_event,
+        ):
+            for change, path in changes:
+                if change == watchfiles.Change.deleted:
+                    self.remove(path)
+                else:
+                    self.submit(path)
+
+    def start(self, with_watcher: bool = True) -> List[Future]:
+        """
+        start indexing in the background
+
+        Args:
+            with_watcher (bool): if True watch the root path for changes
+
+        Returns:
+            List[Future]: the futures of the initial scan
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="nicepdf-indexer"
+        )
+        futures = self.scan()
+        if with_watcher:
+            self.watcher = threading.Thread(
+                target=self.watch, name="nicepdf-watcher", daemon=True
+            )
+            self.watcher.start()
+        return futures
+
+    def stop(self):
+        """
+        stop watching and indexing
+        """
+        self.stop_event.set()
+        if self.watcher:
+            self.watcher.join()
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,439 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from nicepdf.job_queue import Job, JobWorker
+from nicepdf.progress import ProgressBus
+
+
+@dataclass
+class FolderProfile:
+    """
+    the conversions of the files dropped into a hot folder - read from
+    the profile file of the folder
+    """
+
+    unbooklet: bool = True
+    from_binder: bool = False
+    # a poster is created for each format e.g. ["A2", "A1"]
+    poster_formats: List[str] = field(default_factory=list)
+    sheet_format: str = "A4"
+    # further PDFTool attributes see JobWorker.tool_options
+    options: Dict[str, Any] = field(default_factory=dict)
+    # the directories relative to the hot folder
+    output_dir: str = "converted"
+    processed_dir: str = "processed"
+    failed_dir: str = "failed"
+
+    profile_file = "nicepdf.json"
+
+    @classmethod
+    def load(cls, folder: str) -> "FolderProfile":
+        """
+        load the profile of the given folder - the default profile un-booklets each file
+
+        Args:
+            folder (str): the hot folder
+        """
+        profile_path = os.path.join(folder, cls.profile_file)
+        record = {}
+        if os.path.exists(profile_path):
+            with open(profile_path, "r") as json_file:
+                record = json.load(json_file)
+        profile = cls(**record)
+        return profile
+
+    def get_jobs(self, input_path: str, output_dir: str) -> List[Job]:
+        """
+        get the jobs for the given input file
+
+        Args:
+            input_path (str): the pdf file dropped into the hot folder
+            output_dir (str): the directory for the results
+
+        Returns:
+            List[Job]: the jobs with the final output paths
+        """
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        options = dict(self.options)
+        options["from_binder"] = self.from_binder
+        options["sheet_format"] = self.sheet_format
+        jobs = []
+        if self.unbooklet:
+            output_path = os.path.join(output_dir, f"{stem}.pdf")
+            jobs.append(Job("unbooklet", input_path, output_path, options=options))
+        for target_format in self.poster_formats:
+            output_path = os.path.join(output_dir, f"{stem}-poster-{target_format}.pdf")
+            poster_options = dict(options, target_format=target_format)
+            jobs.append(Job("poster", input_path, output_path, options=poster_options))
+        return jobs
+
+
+@dataclass
+class WatchedFile:
+    """
+    the state of a file seen in a hot folder
+    """
+
+    size: int
+    mtime_ns: int
+    stable_since: float  # monotonic time since which size and mtime did not change
+
+
+class Journal:
+    """
+    the status journal of a hot folder - one json line per state change
+    """
+
+    journal_file = "nicepdf-journal.jsonl"
+
+    def __init__(self, folder: str):
+        self.path = os.path.join(folder, self.journal_file)
+        self.lock = threading.Lock()
+
+    def add(self, file_name: str, state: str, **details):
+        """
+        append an entry - each entry is written with a single write so
+        that readers never see partial lines
+
+        Args:
+            file_name (str): the name of the input file
+            state (str): queued, done or failed
+            details: e.g. outputs, error and seconds
+        """
+        record = {"time": time.time(), "file": file_name, "state": state, **details}
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            with open(self.path, "a") as journal:
+                journal.write(line)
+                journal.flush()
+                os.fsync(journal.fileno())
+
+    def read(self) -> List[dict]:
+        """
+        read all entries
+        """
+        entries = []
+        if os.path.exists(self.path):
+            with open(self.path, "r") as journal:
+                entries = [json.loads(line) for line in journal if line.strip()]
+        return entries
+
+
+class HotFolder:
+    """
+    watches folders for scans dropped by a scanner and converts them with
+    the profile of the folder
+
+    a file is converted when its size and mtime have not changed for the
+    settle time and it ends with %%EOF - bursts of files are queued and fed
+    to a bounded process pool
+
+    results are written to temporary files that are renamed when all
+    conversions of an input file succeeded - the input file is then moved
+    to the processed or failed directory of its folder
+    """
+
+    def __init__(
+        self,
+        folders: List[str],
+        max_workers: int = None,
+        settle: float = 2.0,
+        poll_interval: float = 1.0,
+        max_in_flight: int = None,
+    ):
+        """
+        constructor
+
+        Args:
+            folders (list): the folders to watch
+            max_workers (int): the number of worker processes - default: the number of CPUs
+            settle (float): seconds a file has to be unchanged before it is converted
+            poll_interval (float): seconds between two scans of the folders
+            max_in_flight (int): the maximum number of files submitted to the pool - default: 2 per worker
+        """
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.settle = settle
+        self.poll_interval = poll_interval
+        if max_in_flight is None:
+            max_in_flight = 2 * max_workers
+        self.max_in_flight = max_in_flight
+        self.profiles = {folder: FolderProfile.load(folder) for folder in self.folders}
+        self.journals = {folder: Journal(folder) for folder in self.folders}
+        self.watched: Dict[str, WatchedFile] = {}
+        self.ready = deque()
+        self.in_flight: Dict[Future, Tuple[str, str, List[Job], float]] = {}
+        self.executor = None
+        self.stopped = threading.Event()
+        self.done_count = 0
+        self.failed_count = 0
+
+    @classmethod
+    def is_candidate(cls, file_name: str) -> bool:
+        """
+        check whether the given file name is a pdf dropped into the folder
+        - hidden and temporary files are ignored
+        """
+        candidate = file_name.lower().endswith(".pdf") and not file_name.startswith(
+            (".", "~")
+        )
+        return candidate
+
+    @classmethod
+    def is_complete(cls, path: str, tail: int = 1024) -> bool:
+        """
+        check whether the given pdf file has been written completely
+        """
+        with open(path, "rb") as pdf_file:
+            pdf_file.seek(0, os.SEEK_END)
+            size = pdf_file.tell()
+            pdf_file.seek(max(0, size - tail))
+            complete = b"%%EOF" in pdf_file.read()
+        return complete
+
+    def scan(self) -> List[str]:
+        """
+        scan my folders and queue the files that have become stable
+
+        Returns:
+            List[str]: the paths of the newly queued files
+        """
+        now = time.monotonic()
+        seen = set()
+        queued = []
+        busy = {path for _folder, path in self.ready}
+        busy.update(entry[1] for entry in self.in_flight.values())
+        for folder in self.folders:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not self.is_candidate(entry.name):
+                        continue
+                    path = entry.path
+                    seen.add(path)
+                    if path in busy:
+                        continue
+                    stat = entry.stat()
+                    watched = self.watched.get(path)
+                    if (
+                        watched is None
+                        or watched.size != stat.st_size
+                        or watched.mtime_ns != stat.st_mtime_ns
+                    ):
+                        # new or still growing - debounce
+                        self.watched[path] = WatchedFile(
+                            stat.st_size, stat.st_mtime_ns, now
+                        )
+                        continue
+                    if now - watched.stable_since < self.settle:
+                        continue
+                    if not self.is_complete(path):
+                        continue
+                    del self.watched[path]
+                    self.ready.append((folder, path))
+                    queued.append(path)
+                    self.journals[folder].add(os.path.basename(path), "queued")
+        # forget files that have been removed
+        for path in list(self.watched):
+            if path not in seen:
+                del self.watched[path]
+        return queued
+
+    @classmethod
+    def convert(cls, jobs: List[Job]) -> List[str]:
+        """
+        run the given jobs of one input file - runs in a worker process
+
+        Args:
+            jobs (list): the jobs with temporary output paths
+
+        Returns:
+            List[str]: the temporary output paths
+        """
+        worker = JobWorker(queue=None, max_workers=1)
+        for job in jobs:
+            worker.process(job, ProgressBus(desc=job.operation, interval=60.0))
+        outputs = [job.output_path for job in jobs]
+        return outputs
+
+    @classmethod
+    def get_temporary_path(cls, output_path: str) -> str:
+        """
+        get the hidden path the given output is written to before it is renamed
+        """
+        directory, name = os.path.split(output_path)
+        tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.part")
+        return tmp_path
+
+    def submit(self) -> int:
+        """
+        submit queued files to the process pool up to my in flight limit
+
+        Returns:
+            int: the number of submitted files
+        """
+        count = 0
+        while self.ready and len(self.in_flight) < self.max_in_flight:
+            folder, path = self.ready.popleft()
+            profile = self.profiles[folder]
+            output_dir = os.path.join(folder, profile.output_dir)
+            os.makedirs(output_dir, exist_ok=True)
+            jobs = profile.get_jobs(path, output_dir)
+            tmp_jobs = []
+            for job in jobs:
+                tmp_job = Job(
+                    job.operation,
+                    job.input_path,
+                    self.get_temporary_path(job.output_path),
+                    options=job.options,
+                )
+                tmp_jobs.append(tmp_job)
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self.executor.submit(HotFolder.convert, tmp_jobs)
+            self.in_flight[future] = (folder, path, jobs, time.monotonic())
+            count += 1
+        return count
+
+    def move_input(self, path: str, target_dir: str) -> str:
+        """
+        move the given input file to the given directory without overwriting
+        earlier files of the same name
+        """
+        os.makedirs(target_dir, exist_ok=True)
+        name = os.path.basename(path)
+        target = os.path.join(target_dir, name)
+        stem, ext = os.path.splitext(name)
+        index = 1
+        while os.path.exists(target):
+            target = os.path.join(target_dir, f"{stem}-{index}{ext}")
+            index += 1
+        shutil.move(path, target)
+        return target
+
+    def collect(self, timeout: float = 0) -> int:
+        """
+        finish the conversions that are done
+
+        Args:
+            timeout (float): seconds to wait for the first conversion to finish
+
+        Returns:
+            int: the number of finished input files
+        """
+        if not self.in_flight:
+            return 0
+        done, _pending = wait(
+            list(self.in_flight), timeout=timeout, return_when=FIRST_COMPLETED
+        )
+        for future in done:
+            folder, path, jobs, start = self.in_flight.pop(future)
+            self.finish(folder, path, jobs, future, time.monotonic() - start)
+        return len(done)
+
+    def finish(
+        self, folder: str, path: str, jobs: List[Job], future: Future, seconds: float
+    ):
+        """
+        publish the results of the given conversion and record it in the journal
+        """
+        profile = self.profiles[folder]
+        journal = self.journals[folder]
+        name = os.path.basename(path)
+        try:
+            tmp_paths = future.result()
+            outputs = []
+            for job, tmp_path in zip(jobs, tmp_paths):
+                os.replace(tmp_path, job.output_path)
+                outputs.append(os.path.relpath(job.output_path, folder))
+            self.move_input(path, os.path.join(folder, profile.processed_dir))
+            journal.add(name, "done", outputs=outputs, seconds=round(seconds, 3))
+            self.done_count += 1
+        except Exception as ex:
+            for job in jobs:
+                tmp_path = self.get_temporary_path(job.output_path)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            if os.path.exists(path):
+                self.move_input(path, os.path.join(folder, profile.failed_dir))
+            journal.add(name, "failed", error=f"{type(ex).__name__}: {ex}")
+            self.failed_count += 1
+
+    @property
+    def is_idle(self) -> bool:
+        idle = not self.watched and not self.ready and not self.in_flight
+        return idle
+
+    def run_once(self) -> int:
+        """
+        scan, submit and collect once
+
+        Returns:
+            int: the number of finished input files
+        """
+        self.scan()
+        self.submit()
+        finished = self.collect(timeout=self.poll_interval)
+        if not self.in_flight:
+            self.stopped.wait(self.poll_interval)
+        return finished
+
+    def run(self, stop_when_idle: bool = False) -> int:
+        """
+        watch my folders until stopped
+
+        Args:
+            stop_when_idle (bool): if True stop as soon as all files have been converted
+
+        Returns:
+            int: the number of finished input files
+        """
+        count = 0
+        try:
+            while not self.stopped.is_set():
+                count += self.run_once()
+                if stop_when_idle and self.is_idle:
+                    break
+        finally:
+            self.close()
+        return count
+
+    def stop(self):
+        self.stopped.set()
+
+    def close(self):
+        """
+        wait for the submitted conversions and shut down the process pool
+        """
+        while self.in_flight:
+            self.collect(timeout=None)
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def status(self) -> dict:
+        """
+        get my current state e.g. for monitoring
+        """
+        status = {
+            "watching": len(self.watched),
+            "queued": len(self.ready),
+            "in_flight": len(self.in_flight),
+            "done": self.done_count,
+            "failed": self.failed_count,
+        }
+        return status
@@ -0,0 +1,575 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import zlib
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from pypdf import PageObject, Transformation
+from pypdf.generic import (
+    ArrayObject,
+    ContentStream,
+    DictionaryObject,
+    FloatObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    RectangleObject,
+    StreamObject,
+)
+
+
+class ImagePage:
+    """
+    a page that just shows a single image XObject - e.g. a scanned double page
+
+    the half pages of such a page can be created by placing the original image
+    with a clipping transformation instead of merging content streams
+    """
+
+    # operators that do not paint anything and may accompany the image
+    STATE_OPERATORS = {
+        b"q",
+        b"Q",
+        b"cm",
+        b"gs",
+        b"BT",
+        b"ET",
+        b"Tf",
+        b"TL",
+        b"Tc",
+        b"Tw",
+        b"Tz",
+        b"Td",
+        b"TD",
+        b"Tm",
+        b"T*",
+        b"w",
+        b"J",
+        b"j",
+        b"M",
+        b"d",
+        b"ri",
+        b"i",
+    }
+
+    def __init__(
+        self,
+        page: PageObject,
+        name: str,
+        image,
+        matrix: Transformation,
+        gstates: List[str] = None,
+    ):
+        """
+        constructor
+
+        Args:
+            page (PageObject): the page showing the image
+            name (str): the resource name of the image XObject e.g. /Im0
+            image: the (indirect) image XObject
+            matrix (Transformation): the transformation matrix in effect when the image is drawn
+            gstates (list): the resource names of the graphics state parameter
+            dictionaries set by gs when the image is drawn e.g. /GS0
+        """
+        self.page = page
+        self.name = name
+        self.image = image
+        self.matrix = matrix
+        self.gstates = gstates or []
+
+    @classmethod
+    def detect(cls, page: PageObject) -> Optional["ImagePage"]:
+        """
+        check whether the given page is a single image page
+
+        Args:
+            page (PageObject): the page to check
+
+        Returns:
+            ImagePage: the image page or None if the page shows anything else than one image
+        """
+        resources = page.get("/Resources")
+        if resources is None:
+            return None
+        resources = resources.get_object()
+        xobjects = resources.get("/XObject")
+        if xobjects is None:
+            return None
+        xobjects = xobjects.get_object()
+        if len(xobjects) != 1:
+            return None
+        name, image = next(iter(xobjects.items()))
+        if image.get_object().get("/Subtype") != "/Image":
+            return None
+        contents = page.get_contents()
+        if contents is None:
+            return None
+        ext_gstates = resources.get("/ExtGState")
+        ext_gstates = ext_gstates.get_object() if ext_gstates is not None else {}
+        matrix = None
+        image_gstates = None
+        ctm = Transformation()
+        gstates = []
+        stack = []
+        for operands, operator in contents.operations:
+            if operator == b"Do":
+                if operands[0] != name or matrix is not None:
+                    return None
+                matrix = ctm
+                image_gstates = list(gstates)
+            elif operator == b"cm":
+                ctm = Transformation(tuple(float(v) for v in operands)).transform(ctm)
+            elif operator == b"gs":
+                ext_gstate = ext_gstates.get(operands[0])
+                if ext_gstate is None:
+                    return None
+                # a soft mask depends on the transformation when gs is used
+                if ext_gstate.get_object().get("/SMask", "/None") != "/None":
+                    return None
+                gstates.append(operands[0])
+            elif operator == b"q":
+                stack.append((ctm, list(gstates)))
+            elif operator == b"Q":
+                if stack:
+                    ctm, gstates = stack.pop()
+            elif operator not in cls.STATE_OPERATORS:
+                return None
+        if matrix is None:
+            return None
+        image_page = cls(page, name, image, matrix, image_gstates)
+        return image_page
+
+    def get_ext_gstates(self) -> DictionaryObject:
+        """
+        get the graphics state parameter dictionaries in effect for my image
+
+        Returns:
+            DictionaryObject: the ExtGState resources by name
+        """
+        resources = self.page["/Resources"].get_object()
+        ext_gstates = DictionaryObject()
+        if self.gstates:
+            page_gstates = resources["/ExtGState"].get_object()
+            for name in self.gstates:
+                ext_gstates[NameObject(name)] = page_gstates.raw_get(name)
+        return ext_gstates
+
+    def rotation_transformation(self) -> Transformation:
+        """
+        get the transformation that moves the rotation of my page to the content
+
+        see PageObject.transfer_rotation_to_content
+        """
+        rotation = -self.page.get("/Rotate", 0)
+        mb = RectangleObject(self.page.mediabox)
+        trsf = (
+            Transformation()
+            .translate(
+                -float(mb.left + mb.width / 2), -float(mb.bottom + mb.height / 2)
+            )
+            .rotate(rotation)
+        )
+        pt1 = trsf.apply_on(mb.lower_left)
+        pt2 = trsf.apply_on(mb.upper_right)
+        trsf = trsf.translate(-min(pt1[0], pt2[0]), -min(pt1[1], pt2[1]))
+        return trsf
+
+    def placement(self) -> Transformation:
+        """
+        get the transformation that places my image on the page after
+        the rotation of the page has been transferred to the content
+        """
+        matrix = self.matrix.transform(self.rotation_transformation())
+        return matrix
+
+    def copy_page(
+        self,
+        width: float,
+        height: float,
+        tx: float = 0,
+        ty: float = 0,
+        transformation: Transformation = None,
+    ) -> PageObject:
+        """
+        create a new page of the given size that shows my image clipped to the page
+        - the counterpart of DoublePage.copy_page without content stream merging
+
+        Args:
+            width: The width of the new page.
+            height: The height of the new page.
+            tx: The horizontal translation applied to the original page.
+            ty: The vertical translation applied to the original page.
+            transformation: an additional transformation e.g. to deskew and crop a scan
+
+        Returns:
+            PageObject: the new page reusing the original image XObject
+        """
+        matrix = self.placement()
+        if transformation is not None:
+            matrix = matrix.transform(transformation)
+        matrix = matrix.translate(tx=tx, ty=ty)
+        new_page = self.create_image_page(
+            width,
+            height,
+            self.name,
+            self.image,
+            matrix,
+            gstates=self.gstates,
+            ext_gstates=self.get_ext_gstates(),
+        )
+        return new_page
+
+    @classmethod
+    def create_image_page(
+        cls,
+        width: float,
+        height: float,
+        name: str,
+        image,
+        matrix: Transformation,
+        gstates: List[str] = None,
+        ext_gstates: DictionaryObject = None,
+    ) -> PageObject:
+        """
+        create a new page of the given size showing the given image clipped to the page
+
+        Args:
+            width: The width of the new page.
+            height: The height of the new page.
+            name (str): the resource name of the image
+            image: the image XObject
+            matrix (Transformation): the transformation to apply to the image
+            gstates (list): the names of the graphics states to set before drawing the image
+            ext_gstates (DictionaryObject): the ExtGState resources of the gstates
+
+        Returns:
+            PageObject: the new page
+        """
+        new_page = PageObject.create_blank_page(pdf=None, width=width, height=height)
+        floats = lambda values: [FloatObject(value) for value in values]
+        content = ContentStream(None, None)
+        content.operations = [
+            ([], b"q"),
+            (floats([0, 0, width, height]), b"re"),
+            ([], b"W"),
+            ([], b"n"),
+        ]
+        for gstate in gstates or []:
+            content.operations.append(([NameObject(gstate)], b"gs"))
+        content.operations += [
+            (floats(matrix.ctm), b"cm"),
+            ([NameObject(name)], b"Do"),
+            ([], b"Q"),
+        ]
+        xobjects = DictionaryObject({NameObject(name): image})
+        new_page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/XObject"): xobjects,
+                NameObject("/ProcSet"): ArrayObject(
+                    [NameObject("/PDF"), NameObject("/ImageB"), NameObject("/ImageC")]
+                ),
+            }
+        )
+        if ext_gstates:
+            new_page["/Resources"][NameObject("/ExtGState")] = ext_gstates
+        new_page[NameObject("/Contents")] = content
+        return new_page
+
+    def is_jpeg(self) -> bool:
+        """
+        check whether my image is JPEG (DCT) encoded
+        """
+        filters = self.image.get_object().get("/Filter", [])
+        if not isinstance(filters, list):
+            filters = [filters]
+        jpeg = "/DCTDecode" in filters
+        return jpeg
+
+    def prefetch(self):
+        """
+        resolve my image XObject so that the image data is in memory and
+        decoding does not need to access the reader e.g. from a worker thread
+        """
+        self.image = self.image.get_object()
+
+    def check_raster(self):
+        """
+        check that my image can be re-encoded as plain gray/RGB image without
+        losing anything
+
+        Raises:
+            ValueError: for stencil masks, images with a (soft) mask and ICC based colors
+        """
+        xobject = self.image.get_object()
+        if xobject.get("/ImageMask", False):
+            raise ValueError("image is a stencil mask")
+        for mask in ("/SMask", "/Mask"):
+            if mask in xobject:
+                raise ValueError(f"image has a {mask}")
+        color_space = xobject.get("/ColorSpace")
+        if isinstance(color_space, IndirectObject):
+            color_space = color_space.get_object()
+        if isinstance(color_space, ArrayObject) and "/ICCBased" in [
+            str(value) for value in color_space
+        ]:
+            raise ValueError("image has an ICC based color space")
+
+    def get_upright_image(self):
+        """
+        decode my image and transpose it the way it is shown on the page
+
+        Returns:
+            Tuple[Image, Tuple[float, float, float, float]]: the PIL image and the
+            page area x0, y0, x1, y1 covered by it
+
+        Raises:
+            ValueError: if the image can not be decoded or is not placed axis aligned
+        """
+        try:
+            image = self.image.get_object().decode_as_image()
+        except Exception as ex:
+            # e.g. JBIG2 or CCITT images pypdf can not decode
+            raise ValueError(f"image can not be decoded: {ex}") from ex
+        ctm = self.placement().ctm
+        image = self.orient_image(image, ctm)
+        area = self.get_area()
+        return image, area
+
+    def get_area(self) -> Tuple[float, float, float, float]:
+        """
+        get the page area covered by my image
+
+        Returns:
+            Tuple[float, float, float, float]: x0, y0, x1, y1
+        """
+        a, b, c, d, e, f = self.placement().ctm
+        xs = [e, a + e, c + e, a + c + e]
+        ys = [f, b + f, d + f, b + d + f]
+        area = (min(xs), min(ys), max(xs), max(ys))
+        return area
+
+    @classmethod
+    def orient_image(cls, image, ctm: tuple):
+        """
+        transpose the given image the way it is shown with the given
+        transformation matrix
+
+        Args:
+            image: the PIL image
+            ctm (tuple): the transformation matrix a, b, c, d, e, f
+
+        Returns:
+            the transposed PIL image
+
+        Raises:
+            ValueError: if the image is not placed axis aligned
+        """
+        from PIL import Image
+
+        a, b, c, d, _e, _f = ctm
+        eps = 1e-6
+        if abs(b) < eps and abs(c) < eps:
+            if a < 0:
+                image = image.transpose(Image.FLIP_LEFT_RIGHT)
+            if d < 0:
+                image = image.transpose(Image.FLIP_TOP_BOTTOM)
+        elif abs(a) < eps and abs(d) < eps:
+            # columns of the image run vertically on the page
+            image = image.transpose(Image.TRANSPOSE)
+            if c > 0:
+                image = image.transpose(Image.FLIP_LEFT_RIGHT)
+            if b > 0:
+                image = image.transpose(Image.FLIP_TOP_BOTTOM)
+        else:
+            raise ValueError("image is not placed axis aligned")
+        return image
+
+    def get_raster_source(self) -> tuple:
+        """
+        get a picklable source of my image raster e.g. for a worker process
+
+        Returns:
+            tuple: ("jpeg", data) for JPEG images, ("raw", mode, size, data) for
+            plain gray/RGB images or ("png", data) for any other image
+        """
+        xobject = self.image.get_object()
+        color_space = xobject.get("/ColorSpace")
+        bits = xobject.get("/BitsPerComponent", 8)
+        if self.is_jpeg():
+            # the DCT data is passed through as is
+            source = ("jpeg", xobject.get_data())
+        elif color_space in ("/DeviceGray", "/DeviceRGB") and bits in (1, 8):
+            mode = "RGB" if color_space == "/DeviceRGB" else "L"
+            if bits == 1:
+                mode = "1"
+            size = (xobject["/Width"], xobject["/Height"])
+            source = ("raw", mode, size, xobject.get_data())
+        else:
+            buffer = BytesIO()
+            xobject.decode_as_image().save(buffer, "PNG")
+            source = ("png", buffer.getvalue())
+        return source
+
+    @classmethod
+    def image_from_raster_source(cls, source: tuple):
+        """
+        create a PIL image from the given raster source
+
+        Args:
+            source (tuple): see get_raster_source
+        """
+        from PIL import Image
+
+        if source[0] == "raw":
+            _kind, mode, size, data = source
+            image = Image.frombytes(mode, size, data)
+        else:
+            image = Image.open(BytesIO(source[1]))
+        return image
+
+    @classmethod
+    def detect_gutter(cls, image, band: float = 0.2, smooth: int = 9) -> float:
+        """
+        detect the gutter of the given double page image from its column profile
+
+        the binding typically shows as the darkest (shadow) column band close to
+        the middle of the scan
+
+        Args:
+            image: the PIL image of the upright double page
+            band (float): the fraction of the width around the middle to search
+            smooth (int): the width of the box filter for the column profile
+
+        Returns:
+            float: the position of the gutter as fraction of the image width
+        """
+        import numpy as np
+
+        gray = image.convert("L")
+        # a downsampled raster is sufficient for the column profile
+        gray.thumbnail((1024, 1024))
+        pixels = np.asarray(gray, dtype=np.float32)
+        width = pixels.shape[1]
+        profile = pixels.mean(axis=0)
+        kernel = np.ones(smooth, dtype=np.float32) / smooth
+        profile = np.convolve(profile, kernel, mode="same")
+        lo = int(width * (0.5 - band / 2))
+        hi = max(int(width * (0.5 + band / 2)), lo + 1)
+        candidates = profile[lo:hi]
+        # no distinct binding shadow - keep the middle
+        if candidates.max() - candidates.min() < 8:
+            return 0.5
+        gutter = (lo + float(np.argmin(candidates)) + 0.5) / width
+        return gutter
+
+    @classmethod
+    def encode_image(cls, image, jpeg: bool, quality: int = 85) -> StreamObject:
+        """
+        encode the given PIL image as image XObject
+
+        Args:
+            image: the PIL image
+            jpeg (bool): if True use JPEG (DCT) encoding otherwise Flate
+            quality (int): the JPEG quality
+
+        Returns:
+            StreamObject: the image XObject
+        """
+        if image.mode not in ("1", "L", "RGB"):
+            image = image.convert("RGB")
+        if jpeg and image.mode == "1":
+            image = image.convert("L")
+        color_space = "/DeviceRGB" if image.mode == "RGB" else "/DeviceGray"
+        bits = 1 if image.mode == "1" else 8
+        if jpeg:
+            buffer = BytesIO()
+            image.save(buffer, "JPEG", quality=quality)
+            data = buffer.getvalue()
+            image_filter = "/DCTDecode"
+        else:
+            data = zlib.compress(image.tobytes())
+            image_filter = "/FlateDecode"
+        xobject = StreamObject()
+        xobject.set_data(data)
+        xobject.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(image.width),
+                NameObject("/Height"): NumberObject(image.height),
+                NameObject("/ColorSpace"): NameObject(color_space),
+                NameObject("/BitsPerComponent"): NumberObject(bits),
+                NameObject("/Filter"): NameObject(image_filter),
+            }
+        )
+        return xobject
+
+    def split_raster(
+        self,
+        width: float,
+        height: float,
+        gutter: float = None,
+        auto_gutter: bool = False,
+    ) -> Tuple[PageObject, PageObject]:
+        """
+        split my image physically at the gutter and create a left and a right
+        half page of the given size each embedding only its half of the image
+
+        Args:
+            width: the width of the double page
+            height: the height of the double page
+            gutter (float): the position of the gutter as fraction of the image width - default: the middle of the page
+            auto_gutter (bool): if True detect the gutter from the image
+
+        Returns:
+            Tuple[PageObject, PageObject]: the left and the right half page
+
+        Raises:
+            ValueError: if my image can not be split physically - use the clip mode instead
+        """
+        self.check_raster()
+        image, (x0, y0, x1, y1) = self.get_upright_image()
+        if auto_gutter:
+            gutter = self.detect_gutter(image)
+        elif gutter is None:
+            gutter = (width / 2 - x0) / (x1 - x0)
+        gutter = min(max(gutter, 0.0), 1.0)
+        split_col = round(gutter * image.width)
+        scale_x = (x1 - x0) / image.width
+        gutter_x = x0 + split_col * scale_x
+        jpeg = self.is_jpeg()
+        halves = []
+        for is_left in [True, False]:
+            if is_left:
+                box = (0, 0, split_col, image.height)
+                # the gutter is the inner (right) edge of the left half page
+                left_x = width / 2 - (gutter_x - x0)
+            else:
+                box = (split_col, 0, image.width, image.height)
+                # the gutter is the inner (left) edge of the right half page
+                left_x = 0
+            part = image.crop(box)
+            part_width = (box[2] - box[0]) * scale_x
+            matrix = Transformation((part_width, 0, 0, y1 - y0, left_x, y0))
+            if part.width == 0:
+                # nothing left of/right of the gutter - show an empty page
+                half_page = PageObject.create_blank_page(
+                    pdf=None, width=width / 2, height=height
+                )
+            else:
+                xobject = self.encode_image(part, jpeg=jpeg)
+                half_page = self.create_image_page(
+                    width / 2,
+                    height,
+                    "/Im0",
+                    xobject,
+                    matrix,
+                    gstates=self.gstates,
+                    ext_gstates=self.get_ext_gstates(),
+                )
+            halves.append(half_page)
+        return halves[0], halves[1]
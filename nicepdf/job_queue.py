@@ -0,0 +1,745 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hmac
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from nicepdf.checkpoint import Checkpoint
+from nicepdf.pdftool import PDFTool
+from nicepdf.progress import ProgressBus, ProgressConsumer, ProgressEvent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """
+    a conversion job of a JobQueue
+    """
+
+    operation: str  # see JobQueue.operations
+    input_path: str
+    output_path: str
+    # PDFTool attributes see JobWorker.tool_options and the poster target_format
+    options: Dict[str, Any] = field(default_factory=dict)
+    job_id: str = None
+    state: str = "queued"  # queued, running, done or failed
+    worker: str = None  # the id of the worker that claimed the job
+    error: str = None
+    progress: Dict[str, Any] = field(default_factory=dict)  # see ProgressEvent
+    created: float = 0.0
+    updated: float = 0.0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in ("done", "failed")
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "Job":
+        job = cls(**record)
+        return job
+
+
+class JobQueue(ABC):
+    """
+    a queue of conversion jobs that workers on one or more nodes pull from
+    """
+
+    operations = ("unbooklet", "poster")
+
+    def __init__(self, lease: float = 600.0):
+        """
+        constructor
+
+        Args:
+            lease (float): seconds without progress after which a running job
+            is given to another worker e.g. after a crash of its node
+        """
+        self.lease = lease
+
+    @classmethod
+    def of(cls, location: str = None, token: str = None) -> "JobQueue":
+        """
+        get the queue at the given location
+
+        Args:
+            location (str): the url of a nicepdf web server or the path
+            of a SQLite database - default: ~/.nicepdf/jobs.db
+            token (str): the shared token of the json api of a web server
+
+        Returns:
+            JobQueue: the queue
+        """
+        if location and location.startswith(("http://", "https://")):
+            queue = HttpJobQueue(location, token=token)
+        else:
+            queue = SqliteJobQueue(location)
+        return queue
+
+    @abstractmethod
+    def submit(self, job: Job) -> Job:
+        """
+        add the given job to the queue
+
+        Returns:
+            Job: the queued job with its job_id
+        """
+
+    @abstractmethod
+    def claim(self, worker: str) -> Optional[Job]:
+        """
+        claim the oldest queued job for the given worker
+
+        Args:
+            worker (str): the id of the worker
+
+        Returns:
+            Job: the running job or None if there is nothing to do
+        """
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """
+        renew the lease of the given worker on the given running job
+
+        Returns:
+            bool: False if the job is not running for the worker any more
+        """
+
+    @abstractmethod
+    def update_progress(self, job_id: str, worker: str, progress: dict) -> bool:
+        """
+        record the progress of a running job of the given worker - this renews the lease
+
+        Returns:
+            bool: False if the job is not running for the worker any more
+        """
+
+    @abstractmethod
+    def finish(self, job_id: str, worker: str, error: str = None) -> bool:
+        """
+        mark the given job of the given worker as done or as failed with the given error
+
+        Returns:
+            bool: False if the job has been given to another worker in the meantime
+        """
+
+    @abstractmethod
+    def cancel(self, job_id: str, error: str) -> bool:
+        """
+        mark the given job as failed with the given error if no worker has claimed it yet
+
+        Returns:
+            bool: False if a worker has claimed the job in the meantime
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        get the job with the given id - None if there is no such job
+        """
+
+    @abstractmethod
+    def list_jobs(self, state: str = None) -> List[Job]:
+        """
+        get the jobs with the given state - default: all jobs
+        """
+
+
+class SqliteJobQueue(JobQueue):
+    """
+    a job queue in a SQLite database - workers on other nodes may share
+    the database file e.g. on a network file system
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS job (
+        job_id TEXT PRIMARY KEY,
+        operation TEXT NOT NULL,
+        input_path TEXT NOT NULL,
+        output_path TEXT NOT NULL,
+        options TEXT NOT NULL,
+        state TEXT NOT NULL,
+        worker TEXT,
+        error TEXT,
+        progress TEXT NOT NULL,
+        created REAL NOT NULL,
+        updated REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS job_state ON job (state, created);
+    """
+
+    columns = (
+        "job_id",
+        "operation",
+        "input_path",
+        "output_path",
+        "options",
+        "state",
+        "worker",
+        "error",
+        "progress",
+        "created",
+        "updated",
+    )
+
+    def __init__(self, db_path: str = None, lease: float = 600.0):
+        """
+        constructor
+
+        Args:
+            db_path (str): the path of the SQLite database - default: ~/.nicepdf/jobs.db
+            lease (float): see JobQueue
+        """
+        super().__init__(lease)
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".nicepdf", "jobs.db")
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        with self.connect() as connection:
+            connection.executescript(self.schema)
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        connect to my database - the transaction is committed and the
+        connection is closed afterwards
+        """
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as connection:
+            with connection:
+                yield connection
+
+    def to_job(self, row: tuple) -> Job:
+        record = dict(zip(self.columns, row))
+        record["options"] = json.loads(record["options"])
+        record["progress"] = json.loads(record["progress"])
+        job = Job.from_dict(record)
+        return job
+
+    def select(self, where: str, params: tuple) -> List[Job]:
+        sql = (
+            f"SELECT {', '.join(self.columns)} FROM job WHERE {where} ORDER BY created"
+        )
+        with self.connect() as connection:
+            rows = connection.execute(sql, params).fetchall()
+        jobs = [self.to_job(row) for row in rows]
+        return jobs
+
+    def submit(self, job: Job) -> Job:
+        if job.operation not in self.operations:
+            raise ValueError(f"unknown operation {job.operation}")
+        job.job_id = job.job_id or uuid.uuid4().hex
+        job.state = "queued"
+        job.created = job.updated = time.time()
+        record = asdict(job)
+        record["options"] = json.dumps(job.options)
+        record["progress"] = json.dumps(job.progress)
+        with self.lock, self.connect() as connection:
+            connection.execute(
+                f"INSERT INTO job ({', '.join(self.columns)}) VALUES ({', '.join('?' * len(self.columns))})",
+                tuple(record[column] for column in self.columns),
+            )
+        return job
+
+    def claim(self, worker: str) -> Optional[Job]:
+        now = time.time()
+        with self.lock, self.connect() as connection:
+            # the write lock keeps other workers from claiming the same job
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                """SELECT job_id FROM job
+                WHERE state='queued' OR (state='running' AND updated < ?)
+                ORDER BY created LIMIT 1""",
+                (now - self.lease,),
+            ).fetchone()
+            if row:
+                connection.execute(
+                    "UPDATE job SET state='running', worker=?, updated=? WHERE job_id=?",
+                    (worker, now, row[0]),
+                )
+        job = self.get(row[0]) if row else None
+        return job
+
+    def update_owned(
+        self, job_id: str, worker: str, assignments: str, params: tuple
+    ) -> bool:
+        """
+        update the given running job if it is owned by the given worker
+        """
+        with self.lock, self.connect() as connection:
+            cursor = connection.execute(
+                f"UPDATE job SET {assignments}, updated=? WHERE job_id=? AND worker=? AND state='running'",
+                params + (time.time(), job_id, worker),
+            )
+            owned = cursor.rowcount > 0
+        return owned
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        owned = self.update_owned(job_id, worker, "state=state", ())
+        return owned
+
+    def update_progress(self, job_id: str, worker: str, progress: dict) -> bool:
+        owned = self.update_owned(job_id, worker, "progress=?", (json.dumps(progress),))
+        return owned
+
+    def finish(self, job_id: str, worker: str, error: str = None) -> bool:
+        state = "failed" if error else "done"
+        owned = self.update_owned(job_id, worker, "state=?, error=?", (state, error))
+        return owned
+
+    def cancel(self, job_id: str, error: str) -> bool:
+        with self.lock, self.connect() as connection:
+            cursor = connection.execute(
+                "UPDATE job SET state='failed', error=?, updated=? WHERE job_id=? AND state='queued'",
+                (error, time.time(), job_id),
+            )
+            cancelled = cursor.rowcount > 0
+        return cancelled
+
+    def get(self, job_id: str) -> Optional[Job]:
+        jobs = self.select("job_id=?", (job_id,))
+        job = jobs[0] if jobs else None
+        return job
+
+    def list_jobs(self, state: str = None) -> List[Job]:
+        if state is None:
+            jobs = self.select("1=1", ())
+        else:
+            jobs = self.select("state=?", (state,))
+        return jobs
+
+
+class JobQueueApi:
+    """
+    the json api of a job queue - see HttpJobQueue for the client
+
+    each call needs the shared token and the paths of submitted jobs
+    must be inside of the given root directories
+    """
+
+    actions = (
+        "submit",
+        "claim",
+        "heartbeat",
+        "progress",
+        "finish",
+        "cancel",
+        "get",
+        "list",
+    )
+
+    def __init__(self, queue: JobQueue, token: str, roots: List[str]):
+        """
+        constructor
+
+        Args:
+            queue (JobQueue): the queue to give access to
+            token (str): the shared token of the clients
+            roots (list): the directories the input and output paths of jobs have to be in
+        """
+        if not token:
+            raise ValueError("the job api needs a token")
+        self.queue = queue
+        self.token = token
+        self.roots = [os.path.realpath(root) for root in roots]
+
+    def authorize(self, token: str):
+        """
+        check the given token of a call
+
+        Raises:
+            PermissionError: if the token is missing or wrong
+        """
+        if not token or not hmac.compare_digest(token.encode(), self.token.encode()):
+            raise PermissionError("invalid job api token")
+
+    def check_path(self, path: str) -> str:
+        """
+        resolve the given path of a job
+
+        Returns:
+            str: the real path
+
+        Raises:
+            PermissionError: if the path is not inside of my roots
+        """
+        real_path = os.path.realpath(path)
+        for root in self.roots:
+            if os.path.commonpath([root, real_path]) == root:
+                return real_path
+        raise PermissionError(f"{path} is outside of the allowed directories")
+
+    def handle(self, action: str, payload: dict, token: str = None) -> dict:
+        """
+        handle the given api call
+
+        Args:
+            action (str): one of my actions
+            payload (dict): the json parameters of the call
+            token (str): the token of the client
+
+        Returns:
+            dict: the json result
+
+        Raises:
+            PermissionError: for a wrong token or a path outside of my roots
+        """
+        self.authorize(token)
+        if action == "submit":
+            job = Job.from_dict(payload["job"])
+            job.input_path = self.check_path(job.input_path)
+            job.output_path = self.check_path(job.output_path)
+            job = self.queue.submit(job)
+            result = {"job": asdict(job)}
+        elif action == "claim":
+            job = self.queue.claim(payload["worker"])
+            result = {"job": asdict(job) if job else None}
+        elif action == "heartbeat":
+            owned = self.queue.heartbeat(payload["job_id"], payload["worker"])
+            result = {"owned": owned}
+        elif action == "progress":
+            owned = self.queue.update_progress(
+                payload["job_id"], payload["worker"], payload["progress"]
+            )
+            result = {"owned": owned}
+        elif action == "finish":
+            owned = self.queue.finish(
+                payload["job_id"], payload["worker"], payload.get("error")
+            )
+            result = {"owned": owned}
+        elif action == "cancel":
+            cancelled = self.queue.cancel(payload["job_id"], payload["error"])
+            result = {"cancelled": cancelled}
+        elif action == "get":
+            job = self.queue.get(payload["job_id"])
+            result = {"job": asdict(job) if job else None}
+        elif action == "list":
+            jobs = self.queue.list_jobs(payload.get("state"))
+            result = {"jobs": [asdict(job) for job in jobs]}
+        else:
+            raise ValueError(f"unknown action {action}")
+        return result
+
+
+class HttpJobQueue(JobQueue):
+    """
+    the job queue of a nicepdf web server - lets workers on other nodes
+    pull jobs via the json api at /api/jobs/<action>
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0, token: str = None):
+        """
+        constructor
+
+        Args:
+            url (str): the base url of the web server e.g. http://nicepdf.local:9861
+            timeout (float): the timeout of each api call in seconds
+            token (str): the shared token of the json api
+        """
+        super().__init__()
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+
+    def call(self, action: str, **payload) -> dict:
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(
+            f"{self.url}/api/jobs/{action}",
+            data=json.dumps(payload).encode(),
+            headers=headers,
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            result = json.load(response)
+        return result
+
+    def to_job(self, record: Optional[dict]) -> Optional[Job]:
+        job = Job.from_dict(record) if record else None
+        return job
+
+    def submit(self, job: Job) -> Job:
+        job = self.to_job(self.call("submit", job=asdict(job))["job"])
+        return job
+
+    def claim(self, worker: str) -> Optional[Job]:
+        job = self.to_job(self.call("claim", worker=worker)["job"])
+        return job
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        owned = self.call("heartbeat", job_id=job_id, worker=worker)["owned"]
+        return owned
+
+    def update_progress(self, job_id: str, worker: str, progress: dict) -> bool:
+        owned = self.call("progress", job_id=job_id, worker=worker, progress=progress)[
+            "owned"
+        ]
+        return owned
+
+    def finish(self, job_id: str, worker: str, error: str = None) -> bool:
+        owned = self.call("finish", job_id=job_id, worker=worker, error=error)["owned"]
+        return owned
+
+    def cancel(self, job_id: str, error: str) -> bool:
+        cancelled = self.call("cancel", job_id=job_id, error=error)["cancelled"]
+        return cancelled
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self.to_job(self.call("get", job_id=job_id)["job"])
+        return job
+
+    def list_jobs(self, state: str = None) -> List[Job]:
+        records = self.call("list", state=state)["jobs"]
+        jobs = [Job.from_dict(record) for record in records]
+        return jobs
+
+
+class LeaseLost(Exception):
+    """
+    the job of a worker has been given to another worker
+    """
+
+
+class QueueProgress(ProgressConsumer):
+    """
+    records the progress events of a job in its queue and aborts the job
+    when its lease has been lost
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        job_id: str,
+        worker: str,
+        lease_lost: threading.Event = None,
+    ):
+        """
+        constructor
+
+        Args:
+            queue (JobQueue): the queue of the job
+            job_id (str): the id of the job
+            worker (str): the id of the worker running the job
+            lease_lost (threading.Event): set when the job has been given to another worker
+        """
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.lease_lost = lease_lost or threading.Event()
+
+    def on_progress(self, event: ProgressEvent):
+        """
+        record the given event
+
+        Raises:
+            LeaseLost: if the job has been given to another worker - the
+            output belongs to the other worker now
+        """
+        if not self.lease_lost.is_set():
+            try:
+                owned = self.queue.update_progress(
+                    self.job_id, self.worker, event.as_dict()
+                )
+                if not owned:
+                    self.lease_lost.set()
+            except Exception as ex:
+                # e.g. the server is not reachable for a moment - the next event will tell
+                logger.warning(f"progress of job {self.job_id} not recorded: {ex}")
+        if self.lease_lost.is_set():
+            raise LeaseLost(f"job {self.job_id} has been given to another worker")
+
+
+class JobWorker:
+    """
+    pulls jobs from a queue and runs them - start one worker per node
+    to scale the conversion capacity
+    """
+
+    # the PDFTool attributes a job may set
+    tool_options = (
+        "debug",
+        "from_binder",
+        "compact",
+        "image_mode",
+        "gutter",
+        "auto_gutter",
+        "analyze",
+        "deterministic",
+        "linearize",
+        "simplify",
+        "sheet_format",
+        "overlap",
+        "margin",
+        "crop_marks",
+        "backend",
+    )
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: str = None,
+        poll_interval: float = 1.0,
+        max_workers: int = None,
+        heartbeat_interval: float = None,
+    ):
+        """
+        constructor
+
+        Args:
+            queue (JobQueue): the queue to pull the jobs from
+            worker_id (str): my id - default: host name and process id
+            poll_interval (float): seconds to wait when the queue is empty
+            max_workers (int): the number of worker processes of each job
+            heartbeat_interval (float): seconds between two renewals of the lease of a running job - default: a quarter of the lease
+        """
+        self.queue = queue
+        if worker_id is None:
+            worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers
+        if heartbeat_interval is None and queue is not None:
+            heartbeat_interval = queue.lease / 4
+        self.heartbeat_interval = heartbeat_interval
+        # set when the current job has been given to another worker
+        self.lease_lost = threading.Event()
+        self.stopped = threading.Event()
+
+    def get_tool(self, job: Job) -> PDFTool:
+        """
+        get the tool for the given job
+        """
+        tool = PDFTool(job.input_path, job.output_path)
+        tool.max_workers = self.max_workers
+        for key, value in job.options.items():
+            if key in self.tool_options:
+                setattr(tool, key, value)
+        return tool
+
+    def process(self, job: Job, progress_bus: ProgressBus = None):
+        """
+        run the given job
+
+        Args:
+            job (Job): the job to run
+            progress_bus (ProgressBus): the bus for the progress events - default: report to my queue
+        """
+        tool = self.get_tool(job)
+        if progress_bus is None:
+            progress_bus = ProgressBus(
+                desc=job.operation,
+                interval=1.0,
+                consumers=[
+                    QueueProgress(
+                        self.queue, job.job_id, self.worker_id, self.lease_lost
+                    )
+                ],
+            )
+        if job.operation == "unbooklet":
+            # a job taken over from a crashed worker continues at its last chunk
+            tool.checkpoint_interval = Checkpoint.default_interval
+            tool.resume = True
+            progress_bus.total = tool.get_total_steps()
+            tool.split_booklet_style(progress_bus)
+        elif job.operation == "poster":
+            tool.poster(
+                tool.sheet_format,
+                job.options.get("target_format", "A3"),
+                progress_bus,
+                overlap=tool.overlap,
+                margin=tool.margin,
+                crop_marks=tool.crop_marks,
+            )
+        else:
+            raise ValueError(f"unknown operation {job.operation}")
+
+    def run_once(self) -> Optional[Job]:
+        """
+        claim and run the next job
+
+        Returns:
+            Job: the job that has been run or None if the queue was empty
+        """
+        job = self.queue.claim(self.worker_id)
+        if job is not None:
+            self.lease_lost.clear()
+            done = threading.Event()
+            heartbeat = threading.Thread(
+                target=self.send_heartbeats,
+                args=(job, done),
+                name="job heartbeat",
+                daemon=True,
+            )
+            heartbeat.start()
+            try:
+                self.process(job)
+                error = None
+            except Exception as ex:
+                error = f"{type(ex).__name__}: {ex}"
+            finally:
+                done.set()
+                heartbeat.join()
+            try:
+                if not self.queue.finish(job.job_id, self.worker_id, error=error):
+                    logger.warning(f"job {job.job_id} has been given to another worker")
+            except Exception as ex:
+                # the lease expires and the job is claimed again
+                logger.warning(f"job {job.job_id} not finished: {ex}")
+        return job
+
+    def send_heartbeats(self, job: Job, done: threading.Event):
+        """
+        renew my lease on the given job until it is done - a slow page does
+        not let the job be given to another worker
+        """
+        while not done.wait(self.heartbeat_interval):
+            try:
+                if not self.queue.heartbeat(job.job_id, self.worker_id):
+                    # the next progress event aborts the job
+                    self.lease_lost.set()
+                    break
+            except Exception as ex:
+                # e.g. the server is not reachable for a moment - try again later
+                logger.warning(f"heartbeat of job {job.job_id} failed: {ex}")
+
+    def run(self, max_jobs: int = None, stop_when_idle: bool = False) -> int:
+        """
+        run jobs until stopped
+
+        Args:
+            max_jobs (int): the maximum number of jobs to run - default: unlimited
+            stop_when_idle (bool): if True stop as soon as the queue is empty
+
+        Returns:
+            int: the number of jobs that have been run
+        """
+        count = 0
+        while not self.stopped.is_set() and (max_jobs is None or count < max_jobs):
+            job = self.run_once()
+            if job is None:
+                if stop_when_idle:
+                    break
+                self.stopped.wait(self.poll_interval)
+            else:
+                count += 1
+        return count
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,413 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+from nicepdf.pdf_concat import PdfConcatenator, PdfFragment
+
+
+class BitWriter:
+    """
+    writes the bit packed values of hint tables - most significant bit first
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.value = 0
+        self.nbits = 0
+
+    def write(self, value: int, nbits: int):
+        self.value = (self.value << nbits) | value
+        self.nbits += nbits
+        while self.nbits >= 8:
+            self.nbits -= 8
+            self.data.append((self.value >> self.nbits) & 0xFF)
+        self.value &= (1 << self.nbits) - 1
+
+    def flush(self):
+        """
+        continue at the next byte boundary
+        """
+        if self.nbits:
+            self.write(0, 8 - self.nbits)
+
+
+@dataclass
+class PageHint:
+    """
+    the entry of a page in the page offset hint table
+    """
+
+    nobjects: int
+    length: int  # in bytes
+    shared_ids: List[int] = field(default_factory=list)
+
+
+class Linearizer:
+    """
+    rewrites a pdf as linearized pdf (fast web view) see ISO 32000-1 Annex F
+
+    the catalog and the objects of the first page come first together with
+    a hint stream so that a viewer can show the first page while the rest
+    of the file is still loading
+
+    the objects are kept as raw bytes and are only renumbered - see PdfConcatenator
+    """
+
+    linearized_regex = re.compile(rb"/Linearized\s")
+    parameter_regex = re.compile(rb"/(L|O|E|N|T)\s+(\d+)")
+    id_regex = re.compile(rb"/ID\s*\[[^\]]*\]")
+
+    def __init__(self, data: bytes):
+        """
+        constructor
+
+        Args:
+            data (bytes): a pdf with a classic xref table e.g. written by pypdf
+
+        Raises:
+            ValueError: if the pdf can not be linearized
+        """
+        self.fragment = PdfFragment.parse(data)
+        objects = self.fragment.objects()
+        self.order = list(objects.keys())
+        self.heads: Dict[int, bytes] = {}
+        self.tails: Dict[int, bytes] = {}
+        self.refs: Dict[int, List[int]] = {}
+        for num, content in objects.items():
+            head, tail = PdfFragment.split(content)
+            self.heads[num] = head
+            self.tails[num] = tail
+            self.refs[num] = PdfConcatenator.get_refs(head)
+        root = self.fragment.root
+        pages_num = PdfFragment.get_ref(self.heads[root], b"Pages")
+        self.tree_nums: List[int] = []
+        self.page_nums = PdfConcatenator.get_pages(objects, pages_num, self.tree_nums)
+        if not self.page_nums:
+            raise ValueError("a pdf without pages can not be linearized")
+        # pages must not pull in other pages e.g. via /Parent or links
+        self.stop = set(self.page_nums) | set(self.tree_nums) | {root}
+
+    def get_page_objects(self, page_num: int) -> List[int]:
+        """
+        get the given page object and all objects it needs in breadth first order
+
+        Args:
+            page_num (int): the number of the page object
+        """
+        page_objects = [page_num]
+        visited = {page_num}
+        for num in page_objects:
+            for ref in self.refs.get(num, []):
+                if ref in visited or ref in self.stop or ref not in self.heads:
+                    continue
+                visited.add(ref)
+                page_objects.append(ref)
+        return page_objects
+
+    def get_parts(self) -> dict:
+        """
+        assign my objects to the parts of a linearized file
+
+        Returns:
+            dict: the object numbers by part:
+            4 - catalog and page tree, 6 - first page, 7 - list of the
+            private objects of each other page, 8 - shared objects, 9 - others
+        """
+        users = defaultdict(set)
+        page_objects = []
+        for index, page_num in enumerate(self.page_nums):
+            objects = self.get_page_objects(page_num)
+            page_objects.append(objects)
+            for num in objects[1:]:
+                users[num].add(index)
+        part4 = [self.fragment.root] + self.tree_nums
+        part6 = page_objects[0]
+        part7 = []
+        for index, objects in enumerate(page_objects[1:], start=1):
+            private = [objects[0]]
+            private += [num for num in objects[1:] if users[num] == {index}]
+            part7.append(private)
+        placed = set(part4) | set(part6) | {num for group in part7 for num in group}
+        part8 = []
+        for objects in page_objects[1:]:
+            for num in objects[1:]:
+                if num not in placed:
+                    part8.append(num)
+                    placed.add(num)
+        part9 = [num for num in self.order if num not in placed]
+        parts = {4: part4, 6: part6, 7: part7, 8: part8, 9: part9}
+        return parts
+
+    def get_hints(
+        self,
+        parts: dict,
+        mapping: Dict[int, int],
+        offsets: Dict[int, int],
+        lengths: Dict[int, int],
+    ) -> Tuple[bytes, int]:
+        """
+        get the page offset and the shared object hint table
+
+        Args:
+            parts (dict): see get_parts
+            mapping (dict): the new object numbers
+            offsets (dict): the offsets of the objects as if there was no hint stream
+            lengths (dict): the lengths of the objects in bytes
+
+        Returns:
+            Tuple[bytes, int]: the hint stream data and the offset of the shared object hint table
+        """
+        shared = parts[6] + parts[8]
+        shared_ids = {num: index for index, num in enumerate(shared)}
+        # all objects of the first page are in the first page section
+        hints = [PageHint(len(parts[6]), sum(lengths[num] for num in parts[6]))]
+        for group in parts[7]:
+            private = set(group)
+            hint = PageHint(len(group), sum(lengths[num] for num in group))
+            hint.shared_ids = [
+                shared_ids[num]
+                for num in self.get_page_objects(group[0])
+                if num not in private
+            ]
+            hints.append(hint)
+        min_objects = min(hint.nobjects for hint in hints)
+        max_objects = max(hint.nobjects for hint in hints)
+        min_length = min(hint.length for hint in hints)
+        max_length = max(hint.length for hint in hints)
+        nbits_objects = (max_objects - min_objects).bit_length()
+        nbits_length = (max_length - min_length).bit_length()
+        nbits_shared = max(len(hint.shared_ids) for hint in hints).bit_length()
+        nbits_id = max(len(shared) - 1, 0).bit_length()
+        writer = BitWriter()
+        # page offset hint table - see Table F.3 and F.4
+        for value, nbits in [
+            (min_objects, 32),
+            (offsets[parts[6][0]], 32),
+            (nbits_objects, 16),
+            (min_length, 32),
+            (nbits_length, 16),
+            # the content streams are not located - they are assumed
+            # to start at the page and to be as long as the page
+            (0, 32),
+            (0, 16),
+            (min_length, 32),
+            (nbits_length, 16),
+            (nbits_shared, 16),
+            (nbits_id, 16),
+            # no fractional positions of shared objects
+            (0, 16),
+            (1, 16),
+        ]:
+            writer.write(value, nbits)
+        for hint in hints:
+            writer.write(hint.nobjects - min_objects, nbits_objects)
+        writer.flush()
+        for hint in hints:
+            writer.write(hint.length - min_length, nbits_length)
+        writer.flush()
+        for hint in hints:
+            writer.write(len(hint.shared_ids), nbits_shared)
+        writer.flush()
+        for hint in hints:
+            for shared_id in hint.shared_ids:
+                writer.write(shared_id, nbits_id)
+        writer.flush()
+        for hint in hints:
+            writer.write(hint.length - min_length, nbits_length)
+        writer.flush()
+        shared_offset = len(writer.data)
+        # shared object hint table - see Table F.5 and F.6
+        group_lengths = [lengths[num] for num in shared]
+        min_group = min(group_lengths)
+        nbits_group = (max(group_lengths) - min_group).bit_length()
+        first_shared = parts[8][0] if parts[8] else None
+        for value, nbits in [
+            (mapping[first_shared] if first_shared else 0, 32),
+            (offsets[first_shared] if first_shared else 0, 32),
+            (len(parts[6]), 32),
+            (len(shared), 32),
+            # a single object per group
+            (0, 16),
+            (min_group, 32),
+            (nbits_group, 16),
+        ]:
+            writer.write(value, nbits)
+        for length in group_lengths:
+            writer.write(length - min_group, nbits_group)
+        writer.flush()
+        # no md5 signatures
+        for _length in group_lengths:
+            writer.write(0, 1)
+        writer.flush()
+        return bytes(writer.data), shared_offset
+
+    def get_object(self, num: int, mapping: Dict[int, int]) -> bytes:
+        """
+        get the given object renumbered with the given mapping
+        """
+        head = PdfConcatenator.renumber(self.heads[num], mapping)
+        obj = b"%d 0 obj\n%s%s\nendobj\n" % (mapping[num], head, self.tails[num])
+        return obj
+
+    def write(self, output: BinaryIO):
+        """
+        write the linearized pdf to the given output
+
+        Args:
+            output (BinaryIO): the stream to write to
+        """
+        parts = self.get_parts()
+        # the main cross reference table has the objects of the other pages
+        # and the first page cross reference table those of the first page section
+        main = [num for group in parts[7] for num in group] + parts[8] + parts[9]
+        main_size = len(main) + 1
+        mapping = {num: new_num for new_num, num in enumerate(main, start=1)}
+        linearized_num = main_size
+        next_num = main_size + 1
+        for num in parts[4]:
+            mapping[num] = next_num
+            next_num += 1
+        hint_num = next_num
+        next_num += 1
+        for num in parts[6]:
+            mapping[num] = next_num
+            next_num += 1
+        size = next_num
+        objects = {num: self.get_object(num, mapping) for num in self.heads}
+        lengths = {num: len(obj) for num, obj in objects.items()}
+
+        version = max(self.fragment.version, "1.2")
+        header = b"%%PDF-%s\n%%\xe2\xe3\xcf\xd3\n" % version.encode()
+
+        def get_linearized(values: dict) -> bytes:
+            # fixed width values - the size must not depend on the offsets
+            obj = b"%d 0 obj\n<< /Linearized 1" % linearized_num
+            for key in ["L", "H", "O", "E", "N", "T"]:
+                if key == "H":
+                    offset, length = values.get(key, (0, 0))
+                    obj += b" /H [ %-10d %-10d ]" % (offset, length)
+                else:
+                    obj += b" /%s %-10d" % (key.encode(), values.get(key, 0))
+            obj += b" >>\nendobj\n"
+            return obj
+
+        trailer = b""
+        if self.fragment.info in mapping:
+            trailer += b" /Info %d 0 R" % mapping[self.fragment.info]
+        id_match = self.id_regex.search(self.fragment.trailer)
+        if id_match:
+            trailer += b" " + id_match.group(0)
+
+        def get_first_xref(offsets: dict, prev: int) -> bytes:
+            xref = b"xref\n%d %d\n" % (main_size, size - main_size)
+            for new_num in range(main_size, size):
+                xref += b"%010d 00000 n \n" % offsets.get(new_num, 0)
+            xref += b"trailer\n<< /Size %d /Root %d 0 R%s /Prev %-10d >>\n" % (
+                size,
+                mapping[self.fragment.root],
+                trailer,
+                prev,
+            )
+            xref += b"startxref\n0\n%%EOF\n"
+            return xref
+
+        # the offsets of the hint tables are calculated as if there was no hint stream
+        first_xref_offset = len(header) + len(get_linearized({}))
+        position = first_xref_offset + len(get_first_xref({}, 0))
+        offsets = {}
+        sequence = parts[4] + parts[6] + [num for group in parts[7] for num in group]
+        sequence += parts[8] + parts[9]
+        for num in sequence:
+            offsets[num] = position
+            position += lengths[num]
+        hints, shared_offset = self.get_hints(parts, mapping, offsets, lengths)
+        hint_obj = (
+            b"%d 0 obj\n<< /S %d /Length %d >>\nstream\n"
+            % (hint_num, shared_offset, len(hints))
+            + hints
+            + b"\nendstream\nendobj\n"
+        )
+        hint_offset = offsets[parts[6][0]]
+        hint_length = len(hint_obj)
+        # the real offsets
+        new_offsets = {}
+        for num in sequence:
+            if num not in parts[4]:
+                offsets[num] += hint_length
+            new_offsets[mapping[num]] = offsets[num]
+        new_offsets[linearized_num] = len(header)
+        new_offsets[hint_num] = hint_offset
+        last = parts[6][-1]
+        main_xref_offset = position + hint_length
+        main_xref = b"xref\n0 %d\n0000000000 65535 f \n" % main_size
+        for new_num in range(1, main_size):
+            main_xref += b"%010d 00000 n \n" % new_offsets[new_num]
+        main_xref += b"trailer\n<< /Size %d >>\nstartxref\n%d\n%%%%EOF\n" % (
+            main_size,
+            first_xref_offset,
+        )
+        values = {
+            "L": main_xref_offset + len(main_xref),
+            "H": (hint_offset, hint_length),
+            "O": mapping[self.page_nums[0]],
+            "E": offsets[last] + lengths[last],
+            "N": len(self.page_nums),
+            # the white space before the first entry of the main cross reference table
+            "T": main_xref_offset + len(b"xref\n0 %d" % main_size),
+        }
+        output.write(header)
+        output.write(get_linearized(values))
+        output.write(get_first_xref(new_offsets, main_xref_offset))
+        for num in parts[4]:
+            output.write(objects[num])
+        output.write(hint_obj)
+        for num in sequence[len(parts[4]) :]:
+            output.write(objects[num])
+        output.write(main_xref)
+
+    @classmethod
+    def linearize_file(cls, path: str):
+        """
+        linearize the given pdf file in place
+
+        Args:
+            path (str): the path of the pdf file
+        """
+        with open(path, "rb") as pdf_file:
+            data = pdf_file.read()
+        linearizer = cls(data)
+        tmp_path = f"{path}.linearized"
+        with open(tmp_path, "wb") as output:
+            linearizer.write(output)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def get_parameters(cls, data: bytes) -> Optional[Dict[str, int]]:
+        """
+        get the linearization parameters from the start of the given pdf
+
+        Args:
+            data (bytes): the first bytes of the pdf - 1024 are enough
+
+        Returns:
+            dict: e.g. {"L": file length, "E": end of the first page ...}
+            or None if the pdf is not linearized
+        """
+        parameters = None
+        head = data[:1024]
+        match = cls.linearized_regex.search(head)
+        if match:
+            end = head.find(b">>", match.end())
+            parameters = {
+                key.decode(): int(value)
+                for key, value in cls.parameter_regex.findall(head[match.end() : end])
+            }
+        return parameters
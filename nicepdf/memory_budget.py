@@ -0,0 +1,319 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from pypdf import PageObject
+
+
+@dataclass
+class PageEstimate:
+    """
+    the estimated memory needed to process a page
+    """
+
+    stream_bytes: int  # the encoded content and image streams - kept until written
+    raster_bytes: int  # the decoded size of the largest image - needed while decoding
+
+    # parsing and copying the page objects
+    overhead = 64 * 1024
+
+    def cost(self, decode: bool = False) -> int:
+        """
+        get the estimated bytes for the page
+
+        Args:
+            decode (bool): if True the images of the page are decoded e.g. in the raster image mode
+        """
+        cost = self.overhead + self.stream_bytes
+        if decode:
+            cost += self.raster_bytes
+        return cost
+
+
+class PageMemoryEstimator:
+    """
+    estimates the memory of pages from the lengths of their streams and the
+    dimensions of their images without decoding any stream
+    """
+
+    components = {"/DeviceGray": 1, "/DeviceRGB": 3, "/DeviceCMYK": 4}
+
+    @classmethod
+    def stream_length(cls, stream) -> int:
+        """
+        get the encoded length of the given stream - pypdf drops the
+        /Length of the streams it has read and keeps their encoded data
+        """
+        length = stream.get("/Length")
+        if length is not None:
+            length = int(length.get_object())
+        else:
+            length = len(getattr(stream, "_data", b"") or b"")
+        return length
+
+    @classmethod
+    def raster_size(cls, image) -> int:
+        """
+        get the decoded size of the given image XObject in bytes
+        """
+        color_space = image.get("/ColorSpace")
+        if color_space is not None:
+            color_space = color_space.get_object()
+        if isinstance(color_space, list):
+            # e.g. /ICCBased or /Indexed
+            color_space = color_space[0]
+        components = cls.components.get(color_space, 3)
+        bits = int(image.get("/BitsPerComponent", 8))
+        width = int(image.get("/Width", 0))
+        height = int(image.get("/Height", 0))
+        size = width * height * max(components * bits // 8, 1)
+        return size
+
+    @classmethod
+    def estimate_resources(cls, resources, estimate: PageEstimate, seen: set):
+        """
+        add the image and form XObjects of the given resources to the estimate
+        """
+        if resources is None:
+            return
+        xobjects = resources.get_object().get("/XObject")
+        if xobjects is None:
+            return
+        for reference in xobjects.get_object().values():
+            key = getattr(reference, "idnum", None)
+            if key is not None:
+                # shared XObjects count once per page
+                if key in seen:
+                    continue
+                seen.add(key)
+            xobject = reference.get_object()
+            estimate.stream_bytes += cls.stream_length(xobject)
+            subtype = xobject.get("/Subtype")
+            if subtype == "/Image":
+                estimate.raster_bytes = max(
+                    estimate.raster_bytes, cls.raster_size(xobject)
+                )
+            elif subtype == "/Form":
+                cls.estimate_resources(xobject.get("/Resources"), estimate, seen)
+
+    @classmethod
+    def estimate_page(cls, page: PageObject) -> PageEstimate:
+        """
+        estimate the memory needed to process the given page
+
+        Args:
+            page (PageObject): the page
+
+        Returns:
+            PageEstimate: the estimate
+        """
+        estimate = PageEstimate(stream_bytes=0, raster_bytes=0)
+        contents = page.get("/Contents")
+        if contents is not None:
+            contents = contents.get_object()
+            streams = contents if isinstance(contents, list) else [contents]
+            for stream in streams:
+                estimate.stream_bytes += cls.stream_length(stream.get_object())
+        cls.estimate_resources(page.get("/Resources"), estimate, set())
+        return estimate
+
+
+class MemoryBudget:
+    """
+    a budget for the memory of the worker processes and a probe of the
+    resident memory in use - psutil is used if it is installed
+    """
+
+    def __init__(self, budget: int = None, fraction: float = 0.5):
+        """
+        constructor
+
+        Args:
+            budget (int): the budget in bytes - default: the fraction of the available memory
+            fraction (float): the fraction of the available memory to use by default
+        """
+        if budget is None:
+            budget = int(self.available_memory() * fraction)
+        self.budget = budget
+
+    @classmethod
+    def available_memory(cls) -> int:
+        """
+        get the available memory in bytes - 2 GiB if it can not be determined
+        """
+        try:
+            import psutil
+
+            available = psutil.virtual_memory().available
+        except ImportError:
+            try:
+                available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+            except (AttributeError, ValueError, OSError):
+                available = 2 << 30
+        return available
+
+    def rss(self) -> Optional[int]:
+        """
+        get the resident memory of this process and its children
+
+        Returns:
+            int: the bytes or None if psutil is not installed
+        """
+        try:
+            import psutil
+        except ImportError:
+            return None
+        process = psutil.Process()
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                # the child has finished in the meantime
+                pass
+        return rss
+
+    def chunk(
+        self, items: list, costs: List[int], max_items: int, workers: int
+    ) -> List[list]:
+        """
+        split the given items into chunks of at most max_items whose costs
+        fit into the share of the budget of one worker
+
+        Args:
+            items (list): the items e.g. page numbers
+            costs (list): the estimated bytes of each item
+            max_items (int): the maximum number of items per chunk
+            workers (int): the number of workers sharing the budget
+
+        Returns:
+            List[list]: the chunks in order - an item exceeding the share is a chunk of its own
+        """
+        share = self.budget / max(workers, 1)
+        chunks = []
+        chunk = []
+        chunk_cost = 0
+        for item, cost in zip(items, costs):
+            if chunk and (len(chunk) >= max_items or chunk_cost + cost > share):
+                chunks.append(chunk)
+                chunk = []
+                chunk_cost = 0
+            chunk.append(item)
+            chunk_cost += cost
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+
+class AdaptiveScheduler:
+    """
+    runs tasks with estimated memory costs in a process pool - a task is
+    only admitted while the estimated memory of the running tasks fits into
+    the budget and the concurrency shrinks and grows with the observed resident memory
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        memory_budget: MemoryBudget = None,
+        high_water: float = 0.9,
+        low_water: float = 0.6,
+    ):
+        """
+        constructor
+
+        Args:
+            max_workers (int): the maximum number of worker processes - default: the number of CPUs
+            memory_budget (MemoryBudget): the budget - default: half of the available memory
+            high_water (float): shrink the concurrency above this fraction of the budget
+            low_water (float): grow the concurrency below this fraction of the budget
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max_workers
+        if memory_budget is None:
+            memory_budget = MemoryBudget()
+        self.memory_budget = memory_budget
+        self.high_water = high_water
+        self.low_water = low_water
+        self.limit = max_workers
+        # the concurrency after each completed task
+        self.limits: List[int] = []
+        self.peak_rss = 0
+
+    def admits(self, cost: int, running_cost: int, running: int) -> bool:
+        """
+        check whether a task with the given cost may start
+
+        a single task is always admitted - otherwise a task exceeding the
+        budget would never run
+        """
+        if running == 0:
+            return True
+        admitted = (
+            running < self.limit and running_cost + cost <= self.memory_budget.budget
+        )
+        return admitted
+
+    def adapt(self):
+        """
+        shrink or grow my concurrency limit based on the resident memory
+        """
+        rss = self.memory_budget.rss()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+            budget = self.memory_budget.budget
+            if rss > self.high_water * budget:
+                self.limit = max(1, self.limit - 1)
+            elif rss < self.low_water * budget:
+                self.limit = min(self.max_workers, self.limit + 1)
+        self.limits.append(self.limit)
+
+    def run(
+        self,
+        fn: Callable,
+        tasks: Sequence[tuple],
+        costs: Sequence[int],
+        on_result: Callable[[int, object], None] = None,
+    ) -> list:
+        """
+        run fn for the arguments of each task in a process pool
+
+        Args:
+            fn (Callable): a picklable function
+            tasks (list): the argument tuples
+            costs (list): the estimated bytes of each task
+            on_result (Callable): called with the index and the result of each finished task
+
+        Returns:
+            list: the results in task order
+        """
+        results = [None] * len(tasks)
+        pending = list(range(len(tasks)))
+        running = {}
+        running_cost = 0
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # admit in order so that the results can be used early
+                while pending and self.admits(
+                    costs[pending[0]], running_cost, len(running)
+                ):
+                    index = pending.pop(0)
+                    running[executor.submit(fn, *tasks[index])] = index
+                    running_cost += costs[index]
+                done, _not_done = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    running_cost -= costs[index]
+                    results[index] = future.result()
+                    if on_result is not None:
+                        on_result(index, results[index])
+                    self.adapt()
+        return results
@@ -1,9 +1,16 @@
+import os
 import sys
 from argparse import ArgumentParser
 
 from ngwidgets.cmd import WebserverCmd
 
+from nicepdf.benchmark import Benchmark
+from nicepdf.hot_folder import FolderProfile, HotFolder
+from nicepdf.job_queue import JobQueue, JobWorker
+from nicepdf.pdf_backend import PdfBackends
 from nicepdf.pdftool import PDFTool
+from nicepdf.pipeline import Pipeline
+from nicepdf.text_index import TextIndex
 from nicepdf.webserver import NicePdfWebServer
 
 
@@ -46,6 +53,155 @@ class NicePdfCmd(WebserverCmd):
             action="store_true",
             help="Handle case when pages have been scanned in reverse order starting with the middle pages from the binder.",
         )
+        parser.add_argument(
+            "--compact",
+            action="store_true",
+            help="create each half page just before writing it to reduce the memory needed for large booklets",
+        )
+        parser.add_argument(
+            "--image_mode",
+            choices=PDFTool.image_modes,
+            default="clip",
+            help="how to split pages consisting of a single scanned image [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--gutter",
+            type=float,
+            help="gutter position of scans as fraction of the image width for the raster image mode [default: middle of the page]",
+        )
+        parser.add_argument(
+            "--auto_gutter",
+            action="store_true",
+            help="detect the gutter of each scan for the raster image mode",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="analyze scans to crop black borders, deskew them and center the gutter",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="check a scanned booklet for duplicate and missing sides before splitting it - without --output only check it",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="maximum number of parallel workers - with more than one worker the poster and the un-booklet render and serialize chunks of pages in a process pool [default: a single process - the threads of the raster image mode and the processes of --watch depend on the number of CPUs]",
+        )
+        parser.add_argument(
+            "--memory_budget",
+            type=int,
+            metavar="MB",
+            help="memory for the worker processes in MB - large scans are processed in smaller chunks and fewer at a time [default: half of the available memory]",
+        )
+        parser.add_argument(
+            "--poster",
+            metavar="FORMAT",
+            help="scale each page up to the given poster format e.g. A0, Letter or 600x900mm and tile it on sheets",
+        )
+        parser.add_argument(
+            "--nup",
+            metavar="ROWSxCOLS",
+            help="place ROWSxCOLS pages on each sheet e.g. 2x2",
+        )
+        parser.add_argument(
+            "--pipeline",
+            nargs="+",
+            metavar="STAGE",
+            help=f"process the input in memory with the given stages e.g. split scale:A4 tile:A2 watermark:draft optimize - available stages: {', '.join(Pipeline.stage_names())}",
+        )
+        parser.add_argument(
+            "--sheet",
+            default="A4",
+            help="sheet format for --poster and --nup [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--overlap",
+            type=float,
+            default=0,
+            help="glue margin in mm shared by neighbouring poster tiles [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--margin",
+            type=float,
+            default=0,
+            help="unprintable border of each sheet in mm [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--crop_marks",
+            action="store_true",
+            help="draw marks where the poster tiles are to be cut",
+        )
+        parser.add_argument(
+            "--deterministic",
+            action="store_true",
+            help="write reproducible output with a fixed document id",
+        )
+        parser.add_argument(
+            "--linearize",
+            action="store_true",
+            help="write linearized output so that viewers can show the first page while the rest is loading",
+        )
+        parser.add_argument(
+            "--simplify",
+            action="store_true",
+            help="flatten the nested transformations in the content streams of the split pages so that they render faster",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=int,
+            default=0,
+            metavar="PAGES",
+            help="flush the split pages to chunk files every PAGES pages so that a crashed run can be resumed [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="continue splitting from the last checkpoint of an earlier run with the same input and options",
+        )
+        parser.add_argument(
+            "--backend",
+            choices=PdfBackends.names() + ["auto"],
+            help="the pdf library to split the pages with - auto: the library chosen by --benchmark_backends [default: the standard pypdf implementation]",
+        )
+        parser.add_argument(
+            "--benchmark_backends",
+            action="store_true",
+            help=f"benchmark the installed pdf libraries and save the fastest one for --backend auto in {PdfBackends.choice_path}",
+        )
+        parser.add_argument(
+            "--index_text",
+            action="store_true",
+            help="add the text of the un-booklet result to the full-text index",
+        )
+        parser.add_argument(
+            "--search",
+            metavar="QUERY",
+            help="search the pages of the documents in the full-text index",
+        )
+        parser.add_argument(
+            "--watch",
+            nargs="+",
+            metavar="FOLDER",
+            help=f"convert the pdf files dropped into the given folders with the profile in the {FolderProfile.profile_file} file of each folder",
+        )
+        parser.add_argument(
+            "--worker",
+            action="store_true",
+            help="pull un-booklet and poster jobs from the queue and run them - start workers on more nodes to scale",
+        )
+        parser.add_argument(
+            "--queue",
+            metavar="LOCATION",
+            help="job queue as path of a SQLite database or url of a nicepdf server - with --serve the server hands its jobs to the workers [default for --worker: ~/.nicepdf/jobs.db]",
+        )
+        parser.add_argument(
+            "--queue_token",
+            metavar="TOKEN",
+            default=os.environ.get("NICEPDF_QUEUE_TOKEN"),
+            help="shared secret of the job api - the server only accepts workers sending it [default: $NICEPDF_QUEUE_TOKEN]",
+        )
         return parser
 
     def cmd_main(self, argv: list = None):
@@ -55,9 +211,45 @@ class NicePdfCmd(WebserverCmd):
         exit_code = super().cmd_main(argv)
         if self.args.input and self.args.output:
             tool = PDFTool.from_args(self.args)
-            if tool.args.input:
+            if self.args.index_text:
+                tool.text_index = TextIndex(max_workers=self.args.workers)
+            if self.args.pipeline:
+                pipeline = Pipeline.from_spec(self.args.pipeline, tool)
+                pipeline.run()
+            elif self.args.poster:
+                tool.poster(
+                    tool.sheet_format,
+                    self.args.poster,
+                    overlap=tool.overlap,
+                    margin=tool.margin,
+                    crop_marks=tool.crop_marks,
+                )
+            elif self.args.nup:
+                rows, cols = Pipeline.parse_grid(self.args.nup)
+                tool.n_up(rows, cols, tool.sheet_format, margin=tool.margin)
+            elif tool.args.input:
                 tool.split_booklet_style()
-            return exit_code
+        elif self.args.input and self.args.check:
+            tool = PDFTool.from_args(self.args)
+            tool.verbose = True
+            report = tool.check_booklet()
+            if not report.available or not report.ok:
+                exit_code = 1
+        if self.args.benchmark_backends:
+            Benchmark(verbose=True).fastest_backend()
+        if self.args.search:
+            for hit in TextIndex().search(self.args.search):
+                print(hit)
+        if self.args.watch:
+            hot_folder = HotFolder(self.args.watch, max_workers=self.args.workers)
+            hot_folder.run()
+        if self.args.worker:
+            worker = JobWorker(
+                JobQueue.of(self.args.queue, token=self.args.queue_token),
+                max_workers=self.args.workers,
+            )
+            worker.run()
+        return exit_code
 
 
 def main(argv: list = None):
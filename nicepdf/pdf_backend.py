@@ -0,0 +1,474 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import importlib
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from pypdf import PageObject, PdfReader, PdfWriter, Transformation
+
+from nicepdf.resources import ResourceRegistry
+
+# a rectangle as (x0, y0, x1, y1)
+Rect = Tuple[float, float, float, float]
+
+
+@dataclass
+class PageGeometry:
+    """
+    the geometry of a page as needed to place it
+    """
+
+    left: float  # the lower left corner of the mediabox
+    bottom: float
+    width: float  # the size of the mediabox without the rotation
+    height: float
+    rotation: int  # the /Rotate of the page e.g. 0, 90, 180, 270
+
+    @property
+    def upright_size(self) -> Tuple[float, float]:
+        """
+        the width and height of the page as shown with its rotation
+        """
+        size = (self.width, self.height)
+        if self.rotation % 180:
+            size = (self.height, self.width)
+        return size
+
+    def upright_transformation(self) -> Transformation:
+        """
+        get the transformation that moves the rotation of the page to the
+        content with the lower left corner of the upright page at the origin
+
+        see PageObject.transfer_rotation_to_content
+        """
+        trsf = (
+            Transformation()
+            .translate(-(self.left + self.width / 2), -(self.bottom + self.height / 2))
+            .rotate(-self.rotation)
+        )
+        pt1 = trsf.apply_on((self.left, self.bottom))
+        pt2 = trsf.apply_on((self.left + self.width, self.bottom + self.height))
+        trsf = trsf.translate(-min(pt1[0], pt2[0]), -min(pt1[1], pt2[1]))
+        return trsf
+
+    def unrotated_rect(self, clip: Rect) -> Rect:
+        """
+        get the given part of the upright page in the coordinates of the page without its rotation
+        """
+        a, b, c, d, e, f = self.upright_transformation().ctm
+        det = a * d - b * c
+        xs = []
+        ys = []
+        for x, y in ((clip[0], clip[1]), (clip[2], clip[3])):
+            xs.append((d * (x - e) - c * (y - f)) / det)
+            ys.append((a * (y - f) - b * (x - e)) / det)
+        rect = (min(xs), min(ys), max(xs), max(ys))
+        return rect
+
+    def placement(self, clip: Rect, width: float, height: float) -> Transformation:
+        """
+        get the transformation that shows the given part of the upright
+        page on a page of the given size
+
+        Args:
+            clip (Rect): the part of the upright page
+            width (float): the width of the target page
+            height (float): the height of the target page
+        """
+        x0, y0, x1, y1 = clip
+        trsf = (
+            self.upright_transformation()
+            .translate(-x0, -y0)
+            .scale(width / (x1 - x0), height / (y1 - y0))
+        )
+        return trsf
+
+
+class PdfBackend(ABC):
+    """
+    the operations of a pdf library needed to un-booklet a pdf: open it,
+    get the geometry of its pages, place a clipped and transformed page on
+    a new page and write the result
+
+    the documents are handles of the library - a backend has no state
+    besides caches that are valid for a single target document
+    """
+
+    # the name of the backend e.g. on the command line
+    name = None
+    # the module the backend needs - backends of modules that are not installed are not available
+    module = None
+
+    def __init__(self):
+        self.library = importlib.import_module(self.module)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            importlib.import_module(cls.module)
+            available = True
+        except ImportError:
+            available = False
+        return available
+
+    @property
+    def version(self) -> str:
+        version = str(getattr(self.library, "__version__", ""))
+        return version
+
+    @abstractmethod
+    def open(self, path: str):
+        """
+        open the pdf at the given path
+
+        Returns:
+            the source document
+        """
+
+    @abstractmethod
+    def page_count(self, source) -> int:
+        """
+        get the number of pages of the given source document
+        """
+
+    @abstractmethod
+    def page_geometry(self, source, index: int) -> PageGeometry:
+        """
+        get the geometry of the page with the given index counting from 0
+        """
+
+    @abstractmethod
+    def new_document(self):
+        """
+        create a new empty target document
+        """
+
+    @abstractmethod
+    def place(
+        self, target, source, index: int, clip: Rect, width: float, height: float
+    ):
+        """
+        add a page of the given size to the target showing the given part of a source page
+
+        Args:
+            target: the target document
+            source: the source document
+            index (int): the index of the source page counting from 0
+            clip (Rect): the part of the upright source page - origin at its lower left corner
+            width (float): the width of the new page
+            height (float): the height of the new page
+        """
+
+    @abstractmethod
+    def write(self, target, path: str):
+        """
+        write the given target document to the given path
+        """
+
+    def close(self, source):
+        pass
+
+
+class PypdfBackend(PdfBackend):
+    """
+    the default backend - pure python
+    """
+
+    name = "pypdf"
+    module = "pypdf"
+
+    def open(self, path: str) -> PdfReader:
+        reader = PdfReader(path)
+        return reader
+
+    def page_count(self, source: PdfReader) -> int:
+        return len(source.pages)
+
+    def page_geometry(self, source: PdfReader, index: int) -> PageGeometry:
+        page = source.pages[index]
+        mediabox = page.mediabox
+        geometry = PageGeometry(
+            left=float(mediabox.left),
+            bottom=float(mediabox.bottom),
+            width=float(mediabox.width),
+            height=float(mediabox.height),
+            rotation=page.get("/Rotate", 0),
+        )
+        return geometry
+
+    def new_document(self) -> PdfWriter:
+        return PdfWriter()
+
+    def place(
+        self,
+        target: PdfWriter,
+        source: PdfReader,
+        index: int,
+        clip: Rect,
+        width: float,
+        height: float,
+    ):
+        trsf = self.page_geometry(source, index).placement(clip, width, height)
+        new_page = PageObject.create_blank_page(pdf=None, width=width, height=height)
+        # the rotation of the source page is part of the transformation
+        new_page.merge_transformed_page(source.pages[index], trsf)
+        ResourceRegistry.of(target).add_page(new_page)
+
+    def write(self, target: PdfWriter, path: str):
+        with open(path, "wb") as output_file:
+            target.write(output_file)
+
+
+class PikepdfBackend(PdfBackend):
+    """
+    backend based on qpdf - each source page is copied once as form
+    XObject that is shown by the content streams of the new pages
+    """
+
+    name = "pikepdf"
+    module = "pikepdf"
+
+    def __init__(self):
+        super().__init__()
+        # the form XObjects of the source pages by target and page index
+        self.forms = {}
+
+    def open(self, path: str):
+        pdf = self.library.open(path)
+        return pdf
+
+    def page_count(self, source) -> int:
+        return len(source.pages)
+
+    def page_geometry(self, source, index: int) -> PageGeometry:
+        page = source.pages[index]
+        left, bottom, right, top = (float(value) for value in page.mediabox)
+        geometry = PageGeometry(
+            left=left,
+            bottom=bottom,
+            width=right - left,
+            height=top - bottom,
+            rotation=int(page.obj.get("/Rotate", 0)),
+        )
+        return geometry
+
+    def new_document(self):
+        return self.library.new()
+
+    def get_form(self, target, source, index: int):
+        """
+        get the form XObject of the given source page in the given target
+        """
+        key = (id(target), index)
+        form = self.forms.get(key)
+        if form is None:
+            page = source.pages[index]
+            # the rotation is applied by the placement
+            form = page.as_form_xobject(handle_transformations=False)
+            form = target.copy_foreign(form)
+            self.forms[key] = form
+        return form
+
+    def place(
+        self, target, source, index: int, clip: Rect, width: float, height: float
+    ):
+        pikepdf = self.library
+        form = self.get_form(target, source, index)
+        trsf = self.page_geometry(source, index).placement(clip, width, height)
+        page = target.add_blank_page(page_size=(width, height))
+        name = page.add_resource(form, pikepdf.Name.XObject, prefix="Fx")
+        matrix = " ".join(f"{value:.6f}" for value in trsf.ctm)
+        content = f"q {matrix} cm {name} Do Q".encode()
+        page.obj.Contents = target.make_stream(content)
+
+    def write(self, target, path: str):
+        target.save(path)
+        # the forms are only valid for this target
+        self.forms = {
+            key: form for key, form in self.forms.items() if key[0] != id(target)
+        }
+
+    def close(self, source):
+        source.close()
+
+
+class PymupdfBackend(PdfBackend):
+    """
+    backend based on MuPDF - shows the clipped source pages with show_pdf_page
+    which stores each source page once
+    """
+
+    name = "pymupdf"
+    module = "pymupdf"
+
+    @property
+    def version(self) -> str:
+        return self.library.VersionBind
+
+    def open(self, path: str):
+        document = self.library.open(path)
+        return document
+
+    def page_count(self, source) -> int:
+        return source.page_count
+
+    def page_geometry(self, source, index: int) -> PageGeometry:
+        page = source[index]
+        mediabox = page.mediabox
+        geometry = PageGeometry(
+            left=mediabox.x0,
+            bottom=mediabox.y0,
+            width=mediabox.width,
+            height=mediabox.height,
+            rotation=page.rotation,
+        )
+        return geometry
+
+    def new_document(self):
+        return self.library.open()
+
+    def place(
+        self, target, source, index: int, clip: Rect, width: float, height: float
+    ):
+        pymupdf = self.library
+        geometry = self.page_geometry(source, index)
+        source_page = source[index]
+        # show_pdf_page shows the page without its rotation - the rotation is
+        # removed while the page is shown and applied to the placement instead
+        source_page.set_rotation(0)
+        try:
+            clip_rect = (
+                pymupdf.Rect(geometry.unrotated_rect(clip))
+                * source_page.transformation_matrix
+            )
+            page = target.new_page(width=width, height=height)
+            page.show_pdf_page(
+                page.rect,
+                source,
+                index,
+                keep_proportion=False,
+                rotate=-geometry.rotation,
+                clip=clip_rect,
+            )
+        finally:
+            source_page.set_rotation(geometry.rotation)
+
+    def write(self, target, path: str):
+        target.save(path, deflate=True)
+        target.close()
+
+    def close(self, source):
+        source.close()
+
+
+class PdfBackends:
+    """
+    the registry of the pdf backends
+    """
+
+    backend_classes = [PypdfBackend, PikepdfBackend, PymupdfBackend]
+    default = PypdfBackend.name
+    # the backend chosen by a benchmark for the auto backend
+    choice_path = os.path.join(os.path.expanduser("~"), ".nicepdf", "backend.json")
+
+    @classmethod
+    def names(cls) -> List[str]:
+        names = [backend_class.name for backend_class in cls.backend_classes]
+        return names
+
+    @classmethod
+    def available(cls) -> List[str]:
+        """
+        get the names of the backends whose modules are installed
+        """
+        names = [
+            backend_class.name
+            for backend_class in cls.backend_classes
+            if backend_class.is_available()
+        ]
+        return names
+
+    @classmethod
+    def of(cls, name: str = None) -> PdfBackend:
+        """
+        get the backend with the given name
+
+        Args:
+            name (str): the name of the backend - default: pypdf
+
+        Raises:
+            ValueError: for an unknown or unavailable backend
+        """
+        if name is None:
+            name = cls.default
+        backend_classes = {
+            backend_class.name: backend_class for backend_class in cls.backend_classes
+        }
+        backend_class = backend_classes.get(name)
+        if backend_class is None:
+            raise ValueError(
+                f"unknown backend {name} - available backends: {', '.join(cls.available())}"
+            )
+        if not backend_class.is_available():
+            raise ValueError(
+                f"backend {name} needs {backend_class.module} which is not installed"
+            )
+        backend = backend_class()
+        return backend
+
+    @classmethod
+    def versions(cls) -> Dict[str, str]:
+        """
+        get the versions of the available backends by name
+        """
+        versions = {name: cls.of(name).version for name in cls.available()}
+        return versions
+
+    @classmethod
+    def save_choice(cls, fastest: str, seconds: dict, path: str = None):
+        """
+        save the backend chosen by a benchmark for the auto backend
+
+        Args:
+            fastest (str): the name of the fastest backend
+            seconds (dict): the benchmark seconds by backend name
+            path (str): the path of the json file - default: choice_path
+        """
+        if path is None:
+            path = cls.choice_path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        choice = {"versions": cls.versions(), "seconds": seconds, "fastest": fastest}
+        with open(path, "w") as json_file:
+            json.dump(choice, json_file, indent=2)
+
+    @classmethod
+    def chosen(cls, path: str = None) -> str:
+        """
+        get the backend saved by save_choice - the benchmark is not run here
+
+        Args:
+            path (str): the path of the json file - default: choice_path
+
+        Returns:
+            str: the name of the chosen backend or None if there is no choice
+            for the installed versions of the backends
+        """
+        if path is None:
+            path = cls.choice_path
+        name = None
+        if os.path.exists(path):
+            with open(path, "r") as json_file:
+                choice = json.load(json_file)
+            if choice.get("versions") == cls.versions():
+                name = choice.get("fastest")
+        return name
@@ -0,0 +1,367 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+
+@dataclass
+class PdfFragment:
+    """
+    the objects of a standalone pdf with a classic xref table
+    as written by pypdf - the objects are kept as raw bytes
+    """
+
+    data: bytes
+    version: str = "1.3"
+    root: int = None  # object number of the catalog
+    info: int = None  # object number of the document information
+    trailer: bytes = b""  # the raw trailer dictionary
+    # the byte offset of each object by object number
+    offsets: Dict[int, int] = field(default_factory=dict)
+
+    header_regex = re.compile(rb"%PDF-(\d\.\d)")
+    startxref_regex = re.compile(rb"startxref\s+(\d+)")
+    subsection_regex = re.compile(rb"(\d+)\s+(\d+)\s*$")
+    entry_regex = re.compile(rb"(\d{10})\s+(\d{5})\s+([nf])")
+    obj_regex = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\s*")
+    endobj_regex = re.compile(rb"\s*endobj\s*$")
+    stream_regex = re.compile(rb">>\s*stream(\r\n|\n)")
+
+    @classmethod
+    def ref_regex(cls, key: bytes) -> re.Pattern:
+        regex = re.compile(rb"/" + key + rb"\s+(\d+)\s+\d+\s+R")
+        return regex
+
+    @classmethod
+    def parse(cls, data: bytes) -> "PdfFragment":
+        """
+        parse the xref table and the trailer of the given pdf
+
+        Args:
+            data (bytes): the pdf
+
+        Returns:
+            PdfFragment: the fragment
+
+        Raises:
+            ValueError: if the pdf has no classic xref table e.g. an xref stream
+        """
+        fragment = cls(data=data)
+        match = cls.header_regex.match(data)
+        if match:
+            fragment.version = match.group(1).decode()
+        matches = list(cls.startxref_regex.finditer(data, max(0, len(data) - 1024)))
+        if not matches:
+            raise ValueError("startxref missing")
+        xref_offset = int(matches[-1].group(1))
+        if not data.startswith(b"xref", xref_offset):
+            raise ValueError("only classic xref tables are supported")
+        trailer_offset = data.find(b"trailer", xref_offset)
+        if trailer_offset < 0:
+            raise ValueError("trailer missing")
+        lines = data[xref_offset + 4 : trailer_offset].splitlines()
+        num = 0
+        for line in lines:
+            entry = cls.entry_regex.match(line)
+            if entry:
+                if entry.group(3) == b"n":
+                    fragment.offsets[num] = int(entry.group(1))
+                num += 1
+                continue
+            subsection = cls.subsection_regex.match(line.strip())
+            if subsection:
+                num = int(subsection.group(1))
+        trailer = data[trailer_offset : matches[-1].start()]
+        if b"/Encrypt" in trailer:
+            raise ValueError("encrypted pdfs are not supported")
+        fragment.trailer = trailer
+        fragment.root = cls.get_ref(trailer, b"Root")
+        fragment.info = cls.get_ref(trailer, b"Info")
+        # the end of the last object is the start of the xref table
+        fragment.offsets[None] = xref_offset
+        return fragment
+
+    @classmethod
+    def get_ref(cls, head: bytes, key: bytes) -> Optional[int]:
+        match = cls.ref_regex(key).search(head)
+        num = int(match.group(1)) if match else None
+        return num
+
+    def objects(self) -> Dict[int, bytes]:
+        """
+        get the raw content of my objects between obj and endobj
+
+        Returns:
+            Dict[int, bytes]: the content by object number
+        """
+        ordered = sorted(self.offsets.items(), key=lambda item: item[1])
+        objects = {}
+        for (num, start), (_next_num, end) in zip(ordered, ordered[1:]):
+            if num is None:
+                continue
+            match = self.obj_regex.match(self.data, start)
+            if not match:
+                raise ValueError(f"object {num} not found at {start}")
+            content = self.data[match.end() : end]
+            endobj = self.endobj_regex.search(content)
+            if endobj:
+                content = content[: endobj.start()]
+            objects[num] = content
+        return objects
+
+    @classmethod
+    def split(cls, content: bytes) -> Tuple[bytes, bytes]:
+        """
+        split the content of an object into the head and the raw stream data
+        - only the head may contain references
+        """
+        match = cls.stream_regex.search(content)
+        if match:
+            head, tail = content[: match.end()], content[match.end() :]
+        else:
+            head, tail = content, b""
+        return head, tail
+
+
+class PdfConcatenator:
+    """
+    concatenates the pages of standalone pdf fragments e.g. chunks that
+    have been serialized in parallel - the objects are renumbered and the
+    xref table is rebuilt without parsing any content stream
+    """
+
+    # an indirect reference outside of literal strings
+    ref_regex = re.compile(rb"(?<![\d.])(\d+)\s+(\d+)\s+R(?![A-Za-z])")
+    kids_regex = re.compile(rb"/Kids\s*\[([^\]]*)\]")
+    pages_type_regex = re.compile(rb"/Type\s*/Pages(?![A-Za-z])")
+
+    def __init__(self):
+        """
+        constructor
+        """
+        # 1: catalog 2: root of the page tree
+        self.next_num = 3
+        self.page_nums: List[int] = []
+        self.info_num = None
+        self.version = "1.3"
+        # object numbers of objects without references by content
+        self.leaves: Dict[str, int] = {}
+        self.xref: Dict[int, int] = {}
+        self.output = None
+        self.position = 0
+
+    @classmethod
+    def split_strings(cls, head: bytes) -> List[Tuple[bool, bytes]]:
+        """
+        split the given object head into literal strings and the rest
+
+        Returns:
+            list: (is_string, segment) tuples
+        """
+        if b"(" not in head:
+            return [(False, head)]
+        segments = []
+        start = 0
+        i = 0
+        length = len(head)
+        while i < length:
+            if head[i] == 0x28:  # (
+                if i > start:
+                    segments.append((False, head[start:i]))
+                depth = 0
+                j = i
+                while j < length:
+                    c = head[j]
+                    if c == 0x5C:  # backslash
+                        j += 2
+                        continue
+                    if c == 0x28:
+                        depth += 1
+                    elif c == 0x29:
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    j += 1
+                segments.append((True, head[i : j + 1]))
+                i = start = j + 1
+            else:
+                i += 1
+        if start < length:
+            segments.append((False, head[start:]))
+        return segments
+
+    @classmethod
+    def get_refs(cls, head: bytes) -> List[int]:
+        """
+        get the object numbers referenced by the given object head
+        """
+        refs = []
+        for is_string, segment in cls.split_strings(head):
+            if not is_string:
+                refs += [
+                    int(match.group(1)) for match in cls.ref_regex.finditer(segment)
+                ]
+        return refs
+
+    @classmethod
+    def renumber(cls, head: bytes, mapping: Dict[int, int]) -> bytes:
+        """
+        renumber the references of the given object head
+        """
+
+        def replace(match) -> bytes:
+            num = mapping.get(int(match.group(1)))
+            # a reference to a missing object is a reference to null
+            ref = b"null" if num is None else b"%d 0 R" % num
+            return ref
+
+        parts = []
+        for is_string, segment in cls.split_strings(head):
+            if not is_string:
+                segment = cls.ref_regex.sub(replace, segment)
+            parts.append(segment)
+        renumbered = b"".join(parts)
+        return renumbered
+
+    @classmethod
+    def get_pages(
+        cls, objects: Dict[int, bytes], num: int, tree_nums: List[int]
+    ) -> List[int]:
+        """
+        get the page objects below the given node of a page tree
+
+        Args:
+            objects (dict): the objects of the fragment
+            num (int): the number of the page tree node
+            tree_nums (list): collects the numbers of the inner nodes
+
+        Returns:
+            List[int]: the numbers of the page objects in order
+        """
+        head, _tail = PdfFragment.split(objects[num])
+        if not cls.pages_type_regex.search(head):
+            return [num]
+        tree_nums.append(num)
+        pages = []
+        kids = cls.kids_regex.search(head)
+        if kids:
+            for kid in cls.get_refs(kids.group(1)):
+                if kid not in tree_nums:
+                    pages += cls.get_pages(objects, kid, tree_nums)
+        return pages
+
+    def write_bytes(self, data: bytes):
+        self.output.write(data)
+        self.position += len(data)
+
+    def write_object(self, num: int, content: bytes):
+        self.xref[num] = self.position
+        self.write_bytes(b"%d 0 obj\n" % num)
+        self.write_bytes(content)
+        self.write_bytes(b"\nendobj\n")
+
+    def add(self, data: bytes):
+        """
+        add the pages of the given pdf
+
+        Args:
+            data (bytes): a standalone pdf e.g. written by pypdf
+        """
+        fragment = PdfFragment.parse(data)
+        objects = fragment.objects()
+        catalog_head, _tail = PdfFragment.split(objects[fragment.root])
+        pages_num = PdfFragment.get_ref(catalog_head, b"Pages")
+        tree_nums = []
+        page_nums = self.get_pages(objects, pages_num, tree_nums)
+        page_set = set(page_nums)
+        # all page tree nodes are replaced by the single root of the output
+        mapping = {num: 2 for num in tree_nums}
+        mapping[fragment.root] = 1
+        dropped = set(tree_nums) | {fragment.root}
+        if fragment.info is not None and self.info_num is not None:
+            dropped.add(fragment.info)
+        heads = {}
+        for num, content in objects.items():
+            if num in dropped:
+                continue
+            head, tail = PdfFragment.split(content)
+            heads[num] = (head, tail)
+            if not self.get_refs(head) and num not in page_set:
+                # objects without references are shared by content e.g. fonts and images
+                key = hashlib.md5(content).hexdigest()
+                leaf_num = self.leaves.get(key)
+                if leaf_num is not None:
+                    mapping[num] = leaf_num
+                    del heads[num]
+                    continue
+                self.leaves[key] = self.next_num
+            mapping[num] = self.next_num
+            self.next_num += 1
+        if fragment.info is not None and fragment.info in mapping:
+            self.info_num = mapping[fragment.info]
+        for num, (head, tail) in heads.items():
+            self.write_object(mapping[num], self.renumber(head, mapping) + tail)
+        self.page_nums += [mapping[num] for num in page_nums]
+
+    def write(
+        self,
+        fragments: List[Union[bytes, str]],
+        output: BinaryIO,
+        document_id: bytes = None,
+    ):
+        """
+        concatenate the given fragments to the given output
+
+        Args:
+            fragments (list): the pdfs as bytes or as file paths
+            output (BinaryIO): the stream to write to
+            document_id (bytes): the optional document id for the trailer
+        """
+        self.output = output
+        self.position = 0
+        for fragment in fragments:
+            if isinstance(fragment, str):
+                with open(fragment, "rb") as fragment_file:
+                    header = fragment_file.read(16)
+            else:
+                header = fragment[:16]
+            match = PdfFragment.header_regex.match(header)
+            if match:
+                self.version = max(self.version, match.group(1).decode())
+        self.write_bytes(b"%%PDF-%s\n%%\xe2\xe3\xcf\xd3\n" % self.version.encode())
+        for fragment in fragments:
+            if isinstance(fragment, str):
+                # only one fragment is read into memory at a time
+                with open(fragment, "rb") as fragment_file:
+                    fragment = fragment_file.read()
+            self.add(fragment)
+        kids = b" ".join(b"%d 0 R" % num for num in self.page_nums)
+        self.write_object(
+            2,
+            b"<< /Type /Pages /Count %d /Kids [ %s ] >>" % (len(self.page_nums), kids),
+        )
+        self.write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref_offset = self.position
+        size = self.next_num
+        self.write_bytes(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for num in range(1, size):
+            offset = self.xref.get(num)
+            if offset is None:
+                self.write_bytes(b"0000000000 00000 f \n")
+            else:
+                self.write_bytes(b"%010d 00000 n \n" % offset)
+        trailer = b"/Size %d /Root 1 0 R" % size
+        if self.info_num is not None:
+            trailer += b" /Info %d 0 R" % self.info_num
+        if document_id is not None:
+            hex_id = document_id.hex().encode()
+            trailer += b" /ID [ <%s> <%s> ]" % (hex_id, hex_id)
+        self.write_bytes(
+            b"trailer\n<< %s >>\nstartxref\n%d\n%%%%EOF\n" % (trailer, xref_offset)
+        )
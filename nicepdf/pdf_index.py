@@ -0,0 +1,349 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import html
+import math
+import os
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pypdf import PdfReader
+from reportlab.lib import pagesizes
+
+from nicepdf.pdf_probe import PageInfo, PdfProbe
+from nicepdf.pdftool import DoublePage
+
+
+@dataclass
+class DocumentInfo:
+    """
+    the structure of a pdf document as stored in the PdfIndex
+    """
+
+    path: str
+    file_hash: str
+    mtime: float
+    size: int
+    pages: List[PageInfo] = field(default_factory=list)
+    # (left, right) page numbers by double page index and from_binder flag
+    booklet: Dict[bool, List[Tuple[int, int]]] = field(default_factory=dict)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def classify(self) -> str:
+        """
+        guess what kind of document I am
+
+        Returns:
+            str: booklet for landscape double pages of A-series proportions,
+            poster for pages larger than A3 that need tiling to be printed
+            and document otherwise
+        """
+        if not self.pages:
+            return "document"
+        a3_long_side = max(pagesizes.A3)
+        if any(max(p.width, p.height) > a3_long_side * 1.05 for p in self.pages):
+            return "poster"
+        for p in self.pages:
+            ratio = max(p.width, p.height) / min(p.width, p.height)
+            if not p.is_landscape or abs(ratio - math.sqrt(2)) > 0.05:
+                return "document"
+        return "booklet"
+
+    def booklet_mapping(self, from_binder: bool = False) -> List[Tuple[int, int]]:
+        """
+        get the left and right half page numbers of my pages when read as a booklet
+        """
+        if from_binder not in self.booklet:
+            total_pages = self.page_count * 2
+            self.booklet[from_binder] = [
+                DoublePage.calculate_booklet_page_numbers(
+                    index, total_pages, from_binder
+                )
+                for index in range(self.page_count)
+            ]
+        mapping = self.booklet[from_binder]
+        return mapping
+
+    def as_html(self, from_binder: bool = False) -> str:
+        """
+        get an html table of my structure
+        """
+        mapping = self.booklet_mapping(from_binder)
+        name = html.escape(os.path.basename(self.path))
+        markup = f"<b>{name}</b>: {self.page_count} pages<br>"
+        markup += "<table><tr><th>#</th><th>size</th><th>rot</th><th>booklet</th></tr>"
+        for page_info, (left, right) in zip(self.pages, mapping):
+            markup += (
+                f"<tr><td>{page_info.index+1}</td>"
+                f"<td>{page_info.width:.0f}x{page_info.height:.0f}</td>"
+                f"<td>{page_info.rotation}</td>"
+                f"<td>{left}-{right}</td></tr>"
+            )
+        markup += "</table>"
+        return markup
+
+
+class PdfIndex:
+    """
+    persistent SQLite index of pdf document structures keyed by path, mtime and
+    file hash so that known documents can be shown without parsing them again
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS document (
+        path TEXT PRIMARY KEY,
+        file_hash TEXT NOT NULL,
+        mtime REAL NOT NULL,
+        size INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS page (
+        file_hash TEXT NOT NULL,
+        page_index INTEGER NOT NULL,
+        width REAL,
+        height REAL,
+        rotation INTEGER,
+        mediabox TEXT,
+        cropbox TEXT,
+        content_hash TEXT,
+        PRIMARY KEY (file_hash, page_index)
+    );
+    CREATE TABLE IF NOT EXISTS booklet (
+        file_hash TEXT NOT NULL,
+        from_binder INTEGER NOT NULL,
+        page_index INTEGER NOT NULL,
+        left_num INTEGER,
+        right_num INTEGER,
+        PRIMARY KEY (file_hash, from_binder, page_index)
+    );
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        constructor
+
+        Args:
+            db_path (str): the path of the SQLite database - default: ~/.nicepdf/index.db
+        """
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".nicepdf", "index.db")
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        with self.connect() as connection:
+            connection.executescript(self.schema)
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        connect to my database - the transaction is committed and the
+        connection is closed afterwards
+        """
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as connection:
+            with connection:
+                yield connection
+
+    @classmethod
+    def file_hash(cls, path: str) -> str:
+        """
+        get the sha256 hash of the content of the given file
+        """
+        sha = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    @classmethod
+    def parse(cls, path: str, file_hash: str = None) -> DocumentInfo:
+        """
+        parse the given pdf file
+
+        Args:
+            path (str): the path of the pdf file
+            file_hash (str): the hash of the file if already known
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        if file_hash is None:
+            file_hash = cls.file_hash(path)
+        doc_info = DocumentInfo(
+            path=path, file_hash=file_hash, mtime=stat.st_mtime, size=stat.st_size
+        )
+        reader = PdfReader(path)
+        for index, page in enumerate(reader.pages):
+            contents = page.get_contents()
+            data = contents.get_data() if contents is not None else b""
+            page_info = PageInfo(
+                index=index,
+                width=float(page.mediabox.width),
+                height=float(page.mediabox.height),
+                rotation=page.get("/Rotate", 0),
+                mediabox=PdfProbe.box(page.mediabox),
+                cropbox=PdfProbe.box(page.cropbox),
+                content_hash=hashlib.sha1(data).hexdigest(),
+            )
+            doc_info.pages.append(page_info)
+        for from_binder in [False, True]:
+            doc_info.booklet_mapping(from_binder)
+        return doc_info
+
+    def lookup(self, path: str) -> Optional[DocumentInfo]:
+        """
+        lookup the given path without parsing or hashing the file
+
+        Returns:
+            DocumentInfo: the info if the path is known with the current mtime and size otherwise None
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT file_hash, mtime, size FROM document WHERE path=?", (path,)
+            ).fetchone()
+            if row is None:
+                return None
+            file_hash, mtime, size = row
+            if mtime != stat.st_mtime or size != stat.st_size:
+                return None
+            doc_info = self.load(connection, path, file_hash, mtime, size)
+        return doc_info
+
+    def load(
+        self,
+        connection: sqlite3.Connection,
+        path: str,
+        file_hash: str,
+        mtime: float,
+        size: int,
+    ) -> Optional[DocumentInfo]:
+        """
+        load the document info for the given file hash
+        """
+        rows = connection.execute(
+            "SELECT page_index, width, height, rotation, mediabox, cropbox, content_hash "
+            "FROM page WHERE file_hash=? ORDER BY page_index",
+            (file_hash,),
+        ).fetchall()
+        if not rows:
+            return None
+        doc_info = DocumentInfo(path=path, file_hash=file_hash, mtime=mtime, size=size)
+        for index, width, height, rotation, mediabox, cropbox, content_hash in rows:
+            page_info = PageInfo(
+                index=index,
+                width=width,
+                height=height,
+                rotation=rotation,
+                mediabox=tuple(float(v) for v in mediabox.split()),
+                cropbox=tuple(float(v) for v in cropbox.split()),
+                content_hash=content_hash,
+            )
+            doc_info.pages.append(page_info)
+        for from_binder, left, right in connection.execute(
+            "SELECT from_binder, left_num, right_num FROM booklet "
+            "WHERE file_hash=? ORDER BY from_binder, page_index",
+            (file_hash,),
+        ):
+            doc_info.booklet.setdefault(bool(from_binder), []).append((left, right))
+        return doc_info
+
+    def store(self, doc_info: DocumentInfo):
+        """
+        store the given document info
+        """
+        to_text = lambda box: " ".join(repr(v) for v in box)
+        with self.lock, self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO document(path, file_hash, mtime, size) VALUES (?,?,?,?)",
+                (doc_info.path, doc_info.file_hash, doc_info.mtime, doc_info.size),
+            )
+            connection.execute(
+                "DELETE FROM page WHERE file_hash=?", (doc_info.file_hash,)
+            )
+            connection.executemany(
+                "INSERT INTO page VALUES (?,?,?,?,?,?,?,?)",
+                [
+                    (
+                        doc_info.file_hash,
+                        p.index,
+                        p.width,
+                        p.height,
+                        p.rotation,
+                        to_text(p.mediabox),
+                        to_text(p.cropbox),
+                        p.content_hash,
+                    )
+                    for p in doc_info.pages
+                ],
+            )
+            connection.execute(
+                "DELETE FROM booklet WHERE file_hash=?", (doc_info.file_hash,)
+            )
+            connection.executemany(
+                "INSERT INTO booklet VALUES (?,?,?,?,?)",
+                [
+                    (doc_info.file_hash, int(from_binder), index, left, right)
+                    for from_binder, mapping in doc_info.booklet.items()
+                    for index, (left, right) in enumerate(mapping)
+                ],
+            )
+
+    def probe(self, path: str) -> DocumentInfo:
+        """
+        get the page count and geometry of the given pdf file fast - from the index
+        if the file is known otherwise from its page tree without hashing the file
+
+        Args:
+            path (str): the path of the pdf file
+
+        Returns:
+            DocumentInfo: the structure of the document - without hashes if not indexed yet
+        """
+        doc_info = self.lookup(path)
+        if doc_info is None:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            reader = PdfReader(path)
+            doc_info = DocumentInfo(
+                path=path,
+                file_hash=None,
+                mtime=stat.st_mtime,
+                size=stat.st_size,
+                pages=PdfProbe.pages(reader),
+            )
+        return doc_info
+
+    def get(self, path: str) -> DocumentInfo:
+        """
+        get the document info for the given path - from the index if the file
+        is known by path and mtime or by its content hash, otherwise by parsing it
+
+        Args:
+            path (str): the path of the pdf file
+
+        Returns:
+            DocumentInfo: the structure of the document
+        """
+        doc_info = self.lookup(path)
+        if doc_info is None:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            file_hash = self.file_hash(path)
+            with self.connect() as connection:
+                doc_info = self.load(
+                    connection, path, file_hash, stat.st_mtime, stat.st_size
+                )
+            if doc_info is None:
+                doc_info = self.parse(path, file_hash)
+            # (re)register the path e.g. for a touched, copied or moved file
+            self.store(doc_info)
+        return doc_info
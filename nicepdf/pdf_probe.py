@@ -0,0 +1,110 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from pypdf import PdfReader
+
+
+@dataclass
+class PageInfo:
+    """
+    geometry and content hash of a single page
+    """
+
+    index: int  # counting from 0
+    width: float  # of the mediabox
+    height: float
+    rotation: int  # e.g. 0,90,180,270
+    mediabox: Tuple[float, float, float, float]
+    cropbox: Tuple[float, float, float, float]
+    content_hash: str = None
+
+    @property
+    def is_landscape(self) -> bool:
+        """
+        is the page shown in landscape orientation
+        """
+        landscape = self.width > self.height
+        if self.rotation % 180 == 90:
+            landscape = not landscape
+        return landscape
+
+
+class PdfProbe:
+    """
+    reads the page count and the page geometry directly from the
+    page tree of a reader - without flattening it into PageObjects
+    """
+
+    # page attributes that may be inherited from the page tree nodes
+    inheritable = ("/MediaBox", "/CropBox", "/Rotate")
+
+    @classmethod
+    def page_count(cls, reader: PdfReader) -> int:
+        """
+        get the number of pages from the /Count of the root of the page tree
+
+        Args:
+            reader (PdfReader): the reader - the pages are not accessed
+
+        Returns:
+            int: the number of pages
+        """
+        try:
+            count = int(reader.root_object["/Pages"]["/Count"])
+        except (KeyError, TypeError, ValueError):
+            # broken page tree - let pypdf count the pages
+            count = len(reader.pages)
+        return count
+
+    @classmethod
+    def box(cls, rectangle) -> Tuple[float, float, float, float]:
+        box = tuple(float(value) for value in rectangle)
+        return box
+
+    @classmethod
+    def pages(cls, reader: PdfReader) -> List[PageInfo]:
+        """
+        get the geometry of all pages by walking the page tree
+
+        Args:
+            reader (PdfReader): the reader
+
+        Returns:
+            List[PageInfo]: the page infos without content hashes
+        """
+        page_infos = []
+        root = reader.root_object["/Pages"].get_object()
+        # depth first with the inherited attributes of each node
+        stack = [(root, {})]
+        visited = set()
+        while stack:
+            node, inherited = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            attributes = dict(inherited)
+            for key in cls.inheritable:
+                if key in node:
+                    attributes[key] = node[key]
+            if "/Kids" in node:
+                for kid in reversed(node["/Kids"]):
+                    stack.append((kid.get_object(), attributes))
+                continue
+            mediabox = cls.box(attributes.get("/MediaBox", (0, 0, 612, 792)))
+            cropbox = cls.box(attributes.get("/CropBox", mediabox))
+            page_info = PageInfo(
+                index=len(page_infos),
+                width=abs(mediabox[2] - mediabox[0]),
+                height=abs(mediabox[3] - mediabox[1]),
+                rotation=int(attributes.get("/Rotate", 0)) % 360,
+                mediabox=mediabox,
+                cropbox=cropbox,
+            )
+            page_infos.append(page_info)
+        return page_infos
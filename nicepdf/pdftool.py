@@ -4,19 +4,38 @@ Created on 2023-09-07
 @author: wf
 """
 
+import hashlib
 import math
 import os
 import random
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy
 from dataclasses import dataclass
 from io import BytesIO
+from typing import List, Optional, Union
 
 from ngwidgets.progress import Progressbar, TqdmProgressbar
 from pypdf import PageObject, PdfReader, PdfWriter, Transformation
+from pypdf.generic import ArrayObject, ByteStringObject
 from reportlab.lib import colors, pagesizes
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
 
+from nicepdf.checkpoint import Checkpoint
+from nicepdf.content_simplifier import ContentSimplifier
+from nicepdf.debug_collector import DebugCollector
+from nicepdf.image_page import ImagePage
+from nicepdf.linearize import Linearizer
+from nicepdf.memory_budget import AdaptiveScheduler, MemoryBudget, PageMemoryEstimator
+from nicepdf.pdf_backend import PdfBackend, PdfBackends
+from nicepdf.pdf_concat import PdfConcatenator
+from nicepdf.pdf_probe import PdfProbe
+from nicepdf.progress import ProgressBus
+from nicepdf.resources import ResourceRegistry
+from nicepdf.scan_analysis import PageAnalysis, ScanAnalyzer
+from nicepdf.sheet_check import SheetChecker, SheetReport
+from nicepdf.tiling import PaperFormat, Tiler
+
 
 class Watermark:
     """
@@ -52,7 +71,7 @@ class Watermark:
         rotation = page.get("/Rotate", 0)  # Fetching the rotation from the page
 
         packet = BytesIO()
-        can = canvas.Canvas(packet, pagesize=(page_width, page_height))
+        can = canvas.Canvas(packet, pagesize=(page_width, page_height), invariant=1)
 
         text_width = can.stringWidth(message, font, font_size)
         text_height = font_size  # Assuming font_size roughly corresponds to height
@@ -116,6 +135,142 @@ class HalfPage:
         return watermarked_page
 
 
+class HalfPageRef:
+    """
+    a compact reference to a half page in a booklet
+
+    only the index of the double page in the reader is kept - the content
+    of the half page is created on demand by render and may be released
+    as soon as it has been written
+    """
+
+    __slots__ = ("page_num", "page_index", "is_left")
+
+    def __init__(self, page_num: int, page_index: int, is_left: bool):
+        """
+        constructor
+
+        Args:
+            page_num (int): index of the half page starting from one
+            page_index (int): index of the double page counting from 0
+            is_left (bool): True if this is the left half of the double page
+        """
+        self.page_num = page_num
+        self.page_index = page_index
+        self.is_left = is_left
+
+    def __repr__(self):
+        return f"HalfPageRef({self.page_num}, {self.page_index}, {self.is_left})"
+
+    def __str__(self):
+        side = "left" if self.is_left else "right"
+        text = f"Halfpage {self.page_num} Page {self.page_index} {side}"
+        return text
+
+    @classmethod
+    def get_refs(cls, double_page_count: int, from_binder: bool = False) -> dict:
+        """
+        get the references to the half pages of a booklet
+
+        Args:
+            double_page_count (int): the number of double pages of the booklet
+            from_binder (bool): Indicates whether the booklet was scanned from a binder.
+
+        Returns:
+            dict: HalfPageRef instances by page number
+        """
+        total_pages = double_page_count * 2
+        refs = {}
+        for index in range(double_page_count):
+            left_num, right_num = DoublePage.calculate_booklet_page_numbers(
+                index, total_pages, from_binder
+            )
+            refs[left_num] = cls(left_num, index, is_left=True)
+            refs[right_num] = cls(right_num, index, is_left=False)
+        return refs
+
+    def take_raster_half(self, raster_halves: dict) -> Optional[PageObject]:
+        """
+        take my half page from the given physically split double pages - the
+        other half is kept until its reference takes it
+
+        Args:
+            raster_halves (dict): tuples of left and right half pages by page index
+
+        Returns:
+            PageObject: my half page or None if my double page could not be split
+        """
+        halves = list(raster_halves.get(self.page_index, (None, None)))
+        side = 0 if self.is_left else 1
+        half_page = halves[side]
+        halves[side] = None
+        raster_halves[self.page_index] = tuple(halves)
+        return half_page
+
+    def render(
+        self,
+        pages,
+        image_mode: str = "merge",
+        gutter: float = None,
+        auto_gutter: bool = False,
+        analysis: PageAnalysis = None,
+    ) -> PageObject:
+        """
+        create the half page from the double page of the given booklet pages
+
+        the rotation and the translation are applied in a single merge
+
+        Args:
+            pages: the double pages of the booklet e.g. reader.pages
+            image_mode (str): see PDFTool.image_modes
+            gutter (float): the gutter position for the raster mode as fraction of the width
+            auto_gutter (bool): if True detect the gutter in raster mode
+            analysis (PageAnalysis): the optional scan analysis of the double page
+        """
+        page = pages[self.page_index]
+        a4_height, a4_width = pagesizes.A4  # Landscape A4
+        tx = 0 if self.is_left else -a4_width / 2
+        image_page = None
+        if image_mode != "merge" or analysis:
+            image_page = ImagePage.detect(page)
+        transformation = None
+        if image_page and analysis:
+            transformation = analysis.get_transformation(
+                image_page.get_area(), a4_width, a4_height
+            )
+        half_page = None
+        if image_page and image_mode == "raster":
+            if analysis:
+                gutter = analysis.gutter
+                auto_gutter = False
+            try:
+                left_half, right_half = image_page.split_raster(
+                    a4_width, a4_height, gutter=gutter, auto_gutter=auto_gutter
+                )
+                half_page = left_half if self.is_left else right_half
+            except ValueError as ex:
+                print(f"page {self.page_index}: {ex} - clipping the image instead")
+        if half_page is None and image_page and image_mode != "merge":
+            # clip mode or an image that could not be split physically
+            half_page = image_page.copy_page(
+                width=a4_width / 2,
+                height=a4_height,
+                tx=tx,
+                ty=0,
+                transformation=transformation,
+            )
+        elif half_page is None:
+            half_page = DoublePage.copy_page(
+                page=page,
+                width=a4_width / 2,
+                height=a4_height,
+                tx=tx,
+                ty=0,
+                transformation=transformation,
+            )
+        return half_page
+
+
 @dataclass
 class DoublePage:
     """
@@ -140,7 +295,13 @@ class DoublePage:
 
     @classmethod
     def copy_page(
-        cls, page: PageObject, width: float, height: float, tx: float = 0, ty: float = 0
+        cls,
+        page: PageObject,
+        width: float,
+        height: float,
+        tx: float = 0,
+        ty: float = 0,
+        transformation: Transformation = None,
     ) -> PageObject:
         """
         Create a copy of the given page, applying rotation and translation adjustments if needed.
@@ -154,6 +315,7 @@ class DoublePage:
             height: The height of the new page.
             tx: The horizontal translation applied to the original page.
             ty: The vertical translation applied to the original page.
+            transformation: An optional transformation applied before the translation e.g. to deskew and crop a scan.
 
         Returns:
             A new PageObject with the original page's content, adjusted for rotation and translation.
@@ -166,11 +328,14 @@ class DoublePage:
         new_page = PageObject.create_blank_page(pdf=None, width=width, height=height)
         # Get the rotation of the original page
         rotated_page = copy(page)
+        # detach the copy - otherwise the transformation replaces the
+        # content of the original page in its reader
+        rotated_page.indirect_reference = None
         # see https://github.com/py-pdf/pypdf/issues/2340
         rotated_page.transfer_rotation_to_content()
-        rotated_page.add_transformation(
-            Transformation().rotate(0).translate(tx=tx, ty=ty)
-        )
+        if transformation is None:
+            transformation = Transformation().rotate(0)
+        rotated_page.add_transformation(transformation.translate(tx=tx, ty=ty))
         new_page.merge_page(rotated_page)
 
         return new_page
@@ -221,8 +386,29 @@ class DoublePage:
 
     @classmethod
     def from_page(
-        cls, page, index, total_pages, from_binder: bool = False, debug_path: str = None
+        cls,
+        page,
+        index,
+        total_pages,
+        from_binder: bool = False,
+        debug_collector: DebugCollector = None,
+        image_mode: str = "merge",
+        halves: tuple = None,
+        analysis: PageAnalysis = None,
     ):
+        """
+        create a double page from the given page of a booklet
+
+        Args:
+            page: the page to split
+            index: the index of the page counting from 0
+            total_pages: the total number of half pages of the booklet
+            from_binder (bool): Indicates whether the booklet was scanned from a binder.
+            debug_collector (DebugCollector): the collector of the debug pages
+            image_mode (str): how to split single image pages - see PDFTool.image_modes
+            halves (tuple): the left and right half page if already split e.g. in raster mode
+            analysis (PageAnalysis): the optional scan analysis to deskew, crop and center the gutter
+        """
         # Get the rotation of the original page
         rotation = page.get("/Rotate", 0)
         width = page.mediabox.width
@@ -230,36 +416,77 @@ class DoublePage:
         a4_height, a4_width = pagesizes.A4  # Landscape A4
         if height > width and rotation == 0:
             print(f"Rotation missing for page {index}")
-        rotated_page = cls.copy_page(
-            page=page, width=a4_width, height=a4_height, tx=0, ty=0
-        )
-
-        # Create two new blank pages with half the width of the original
+        image_page = None
+        if image_mode != "merge" or analysis:
+            image_page = ImagePage.detect(page)
+        transformation = None
+        if image_page and analysis:
+            transformation = analysis.get_transformation(
+                image_page.get_area(), a4_width, a4_height
+            )
+        if image_page and image_mode != "merge":
+            # single image page e.g. a scan - place the image clipped
+            # instead of merging the content streams
+            rotated_page = image_page.copy_page(
+                width=a4_width, height=a4_height, transformation=transformation
+            )
+            if not halves and image_mode == "raster":
+                gutter = analysis.gutter if analysis else None
+                try:
+                    halves = image_page.split_raster(a4_width, a4_height, gutter=gutter)
+                except ValueError as ex:
+                    print(f"page {index}: {ex} - clipping the image instead")
+            if halves:
+                left_half, right_half = halves
+            else:
+                left_half = image_page.copy_page(
+                    width=a4_width / 2, height=a4_height, transformation=transformation
+                )
+                right_half = image_page.copy_page(
+                    width=a4_width / 2,
+                    height=a4_height,
+                    tx=-a4_width / 2,
+                    transformation=transformation,
+                )
+        else:
+            rotated_page = cls.copy_page(
+                page=page,
+                width=a4_width,
+                height=a4_height,
+                tx=0,
+                ty=0,
+                transformation=transformation,
+            )
 
-        # Crop page for left half
-        left_half = cls.copy_page(
-            page=rotated_page, width=a4_width / 2, height=a4_height, tx=0, ty=0
-        )
-        # Adjusted translation for right half (shift to the left by half of the original page's width)
-        right_half = cls.copy_page(
-            page=rotated_page,
-            width=a4_width / 2,
-            height=a4_height,
-            tx=-a4_width / 2,
-            ty=0,
-        )
+            # Create two new blank pages with half the width of the original
 
-        if debug_path:
-            cls.save_page(rotated_page, debug_path)
-            cls.save_page(left_half, debug_path.replace(".pdf", "-left.pdf"))
-            cls.save_page(right_half, debug_path.replace(".pdf", "-right.pdf"))
+            # Crop page for left half
+            left_half = cls.copy_page(
+                page=rotated_page, width=a4_width / 2, height=a4_height, tx=0, ty=0
+            )
+            # Adjusted translation for right half (shift to the left by half of the original page's width)
+            right_half = cls.copy_page(
+                page=rotated_page,
+                width=a4_width / 2,
+                height=a4_height,
+                tx=-a4_width / 2,
+                ty=0,
+            )
 
         # Calculate booklet page numbers
         left_num, right_num = cls.calculate_booklet_page_numbers(
             index, total_pages, from_binder
         )
-        if debug_path:
-            print(f"{index:3}:{left_num:3}-{right_num:3} {rotation:3}")
+        if debug_collector:
+            debug_collector.add(
+                index,
+                left_num,
+                right_num,
+                rotation,
+                rotated_page,
+                left_half,
+                right_half,
+            )
 
         # Create HalfPage instances for each half
         left = HalfPage(page_num=left_num, page=left_half)
@@ -308,12 +535,19 @@ class PdfFile:
     reader: PdfReader = None
     double_pages: list = None
     pages: dict = None
+    auto_open: bool = True  # open a reader for an existing file
 
     def __post_init__(self):
         """
         set my reader
         """
-        self.open()
+        self.file_obj = None
+        # the CachedDocument my reader is shared with - None: my own reader
+        self.shared_document = None
+        # collects the debug pages of read_booklet
+        self.debug_collector = None
+        if self.auto_open:
+            self.open()
 
     def open(self):
         if self.filename and os.path.exists(self.filename):
@@ -322,6 +556,18 @@ class PdfFile:
         else:
             self.file_obj = None
 
+    @classmethod
+    def of_shared(cls, document) -> "PdfFile":
+        """
+        get a pdf file using the reader of the given shared document
+
+        Args:
+            document (CachedDocument): the parsed document e.g. from the DocumentCache of the webserver
+        """
+        pdf_file = cls(document.path, reader=document.reader, auto_open=False)
+        pdf_file.shared_document = document
+        return pdf_file
+
     def save(self, writer):
         with open(self.filename, "wb") as output_file:
             writer.write(output_file)
@@ -331,7 +577,15 @@ class PdfFile:
             self.file_obj.close()
 
     def read_booklet(
-        self, from_binder: bool = False, progress_bar=None, debug: bool = False
+        self,
+        from_binder: bool = False,
+        progress_bar=None,
+        debug: bool = False,
+        image_mode: str = "merge",
+        gutter: float = None,
+        auto_gutter: bool = False,
+        max_workers: int = None,
+        analyzer: ScanAnalyzer = None,
     ) -> None:
         """
         Reads minimum input as a booklet.
@@ -339,7 +593,12 @@ class PdfFile:
         Args:
             from_binder (bool): Indicates whether the booklet was scanned from a binder. Defaults to False - outer cover page scanned first.
             progress_bar (Optional[ProgressBar]): Tracks the reading progress of the booklet. Replace 'TypeOfProgressBar' with the actual type you're using for the progress bar.
-            debug (bool): If True, the method will run in debug mode providing additional logging information. Defaults to False.
+            debug (bool): If True, the method will run in debug mode collecting the rotated and split pages in a debug pdf with a json trace - see DebugCollector. Defaults to False.
+            image_mode (str): how to split single image pages - see PDFTool.image_modes. Defaults to 'merge'.
+            gutter (float): the gutter position for the raster mode as fraction of the image width. Defaults to the middle of the page.
+            auto_gutter (bool): if True detect the gutter of each scan in raster mode. Defaults to False.
+            max_workers (int): the number of threads for the image codec work in raster mode. Defaults to the ThreadPoolExecutor default.
+            analyzer (ScanAnalyzer): if set analyze scans to deskew, crop them and find the gutter. Defaults to None.
 
         """
         self.double_pages = []
@@ -348,30 +607,201 @@ class PdfFile:
             # Change the description of the progress bar
             progress_bar.set_description("Splitting pages")
 
-        debug_path = None
+        analyses = self.analyze_scans(analyzer) if analyzer else {}
+        raster_halves = {}
+        if image_mode == "raster":
+            raster_halves = self.split_raster(
+                gutter, auto_gutter, max_workers, analyses=analyses
+            )
+
+        self.debug_collector = None
+        if debug:
+            self.debug_collector = DebugCollector.for_input(self.filename)
         for i in range(double_page_count):
             page = self.reader.pages[i]
-            if debug:
-                # Extract the base filename without extension
-                base_filename = os.path.basename(self.filename)
-                base_filename_without_ext = os.path.splitext(base_filename)[0]
-
-                # Create the debug path
-                debug_path = f"/tmp/{base_filename_without_ext}_{i}_debug.pdf"
+            halves = raster_halves.pop(i, None)
+            page_image_mode = image_mode
+            if image_mode == "raster" and halves is None:
+                # the image could not be split physically
+                page_image_mode = "clip"
             double_page = DoublePage.from_page(
                 page,
                 i,
                 double_page_count * 2,
                 from_binder=from_binder,
-                debug_path=debug_path,
+                debug_collector=self.debug_collector,
+                image_mode=page_image_mode,
+                halves=halves,
+                analysis=analyses.get(i),
             )
             self.double_pages.append(double_page)
             if progress_bar:
                 # Update the progress bar
                 progress_bar.update(1)
+        if self.debug_collector:
+            # written in the background while the half pages are written
+            self.debug_collector.close()
 
         return self.double_pages
 
+    def get_image_pages(self, page_indices: set = None) -> dict:
+        """
+        get my single image pages e.g. scans
+
+        Args:
+            page_indices (set): the indices of the pages to check - default: all pages
+
+        Returns:
+            dict: ImagePage instances by page index
+        """
+        if self.shared_document is not None:
+            # detected once for all pages and shared by the sessions
+            all_image_pages = self.shared_document.derive(
+                ("image_pages",), lambda: self.get_image_pages_of_reader()
+            )
+            image_pages = {
+                i: image_page
+                for i, image_page in all_image_pages.items()
+                if page_indices is None or i in page_indices
+            }
+        else:
+            image_pages = self.get_image_pages_of_reader(page_indices)
+        return image_pages
+
+    def get_image_pages_of_reader(self, page_indices: set = None) -> dict:
+        """
+        detect the single image pages of my reader - see get_image_pages
+        """
+        image_pages = {}
+        for i, page in enumerate(self.reader.pages):
+            if page_indices is not None and i not in page_indices:
+                continue
+            image_page = ImagePage.detect(page)
+            if image_page:
+                image_pages[i] = image_page
+        return image_pages
+
+    def analyze_scans(self, analyzer: ScanAnalyzer, page_indices: set = None) -> dict:
+        """
+        analyze my single image pages with the given analyzer
+
+        Args:
+            analyzer (ScanAnalyzer): the analyzer to use
+            page_indices (set): the indices of the pages to analyze - default: all pages
+
+        Returns:
+            dict: PageAnalysis results by page index
+        """
+        if self.shared_document is not None:
+            # analyzed once for all pages and shared by the sessions
+            image_pages = self.get_image_pages()
+            all_analyses = self.shared_document.derive(
+                ("scan_analyses", analyzer.version, analyzer.max_size),
+                lambda: analyzer.analyze(image_pages),
+            )
+            analyses = {
+                i: analysis
+                for i, analysis in all_analyses.items()
+                if page_indices is None or i in page_indices
+            }
+        else:
+            analyses = analyzer.analyze(self.get_image_pages(page_indices))
+        return analyses
+
+    def split_raster(
+        self,
+        gutter: float = None,
+        auto_gutter: bool = False,
+        max_workers: int = None,
+        analyses: dict = None,
+        page_indices: set = None,
+    ) -> dict:
+        """
+        physically split the images of my single image pages in a thread pool
+
+        Args:
+            gutter (float): the gutter position as fraction of the image width
+            auto_gutter (bool): if True detect the gutter of each scan
+            max_workers (int): the maximum number of threads
+            analyses (dict): optional PageAnalysis results by page index with the gutter to use
+            page_indices (set): the indices of the pages to split - default: all pages
+
+        Returns:
+            dict: tuples of left and right half pages by page index - pages
+            whose image can not be split physically are missing
+        """
+        image_pages = self.get_image_pages(page_indices)
+        raster_halves = self.split_image_pages(
+            image_pages, gutter, auto_gutter, max_workers, analyses
+        )
+        return raster_halves
+
+    @classmethod
+    def split_image_pages(
+        cls,
+        image_pages: dict,
+        gutter: float = None,
+        auto_gutter: bool = False,
+        max_workers: int = None,
+        analyses: dict = None,
+    ) -> dict:
+        """
+        physically split the images of the given single image pages in a thread pool
+
+        Args:
+            image_pages (dict): ImagePage instances by page index
+            gutter (float): the gutter position as fraction of the image width
+            auto_gutter (bool): if True detect the gutter of each scan
+            max_workers (int): the maximum number of threads
+            analyses (dict): optional PageAnalysis results by page index with the gutter to use
+
+        Returns:
+            dict: see split_raster
+        """
+        a4_height, a4_width = pagesizes.A4  # Landscape A4
+        analyses = analyses or {}
+        # the reader is not thread safe - load the images upfront
+        for image_page in image_pages.values():
+            image_page.prefetch()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for i, image_page in image_pages.items():
+                analysis = analyses.get(i)
+                futures[i] = executor.submit(
+                    image_page.split_raster,
+                    a4_width,
+                    a4_height,
+                    gutter=analysis.gutter if analysis else gutter,
+                    auto_gutter=auto_gutter and not analysis,
+                )
+            raster_halves = {}
+            for i, future in futures.items():
+                try:
+                    raster_halves[i] = future.result()
+                except ValueError as ex:
+                    print(f"page {i}: {ex} - clipping the image instead")
+        return raster_halves
+
+    def half_page_refs(self, from_binder: bool = False) -> dict:
+        """
+        get compact references to my half pages without creating any page content
+
+        Args:
+            from_binder (bool): Indicates whether the booklet was scanned from a binder.
+
+        Returns:
+            dict: HalfPageRef instances by page number
+        """
+        page_count = len(self.reader.pages)
+        if self.shared_document is not None:
+            refs = self.shared_document.derive(
+                ("half_page_refs", from_binder),
+                lambda: HalfPageRef.get_refs(page_count, from_binder),
+            )
+        else:
+            refs = HalfPageRef.get_refs(page_count, from_binder)
+        return refs
+
     def add_half_page(self, double_page: DoublePage, half_page: HalfPage):
         """
         add the given half page that is part of the given double_page
@@ -454,7 +884,7 @@ class PdfFile:
 
         a4_landscape = pagesizes.landscape(pagesizes.A4)
 
-        c = canvas.Canvas(buffer, pagesize=a4_landscape)
+        c = canvas.Canvas(buffer, pagesize=a4_landscape, invariant=1)
 
         # Drawing the two centered rectangles side-by-side
         self.draw_double_page_with_margin(c, *a4_landscape, inner_margin)
@@ -483,10 +913,60 @@ class PdfFile:
         buffer.seek(0)
         return PdfReader(buffer)
 
+    def create_scanned_double_page_with_numbers(
+        self, left_page_number, right_page_number, dpi: int = 100
+    ):
+        """Generate a double PDF page showing a single image with the given page numbers - like a scan."""
+        # PIL is available as a dependency of reportlab
+        from PIL import Image, ImageDraw, ImageFont
+        from reportlab.lib.utils import ImageReader
+
+        a4_landscape = pagesizes.landscape(pagesizes.A4)
+        width = round(a4_landscape[0] / 72 * dpi)
+        height = round(a4_landscape[1] / 72 * dpi)
+        image = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        margin = round(5 * mm / 72 * dpi)
+        font = ImageFont.load_default(size=height // 3)
+        for i, page_number in enumerate([left_page_number, right_page_number]):
+            x0 = i * width // 2
+            draw.rectangle(
+                (x0 + margin, margin, x0 + width // 2 - margin, height - margin),
+                outline=0,
+                width=3,
+            )
+            draw.text(
+                (x0 + width // 4, height // 2),
+                str(page_number),
+                fill=0,
+                font=font,
+                anchor="mm",
+            )
+        image_buffer = BytesIO()
+        image.save(image_buffer, "JPEG", quality=75)
+        image_buffer.seek(0)
+
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=a4_landscape, invariant=1)
+        c.drawImage(ImageReader(image_buffer), 0, 0, *a4_landscape)
+        c.showPage()
+        c.save()
+
+        buffer.seek(0)
+        return PdfReader(buffer)
+
     def create_example_booklet(
-        self, double_pages=2, with_random_rotation: bool = False
+        self,
+        double_pages=2,
+        with_random_rotation: bool = False,
+        as_scan: bool = False,
+        seed: int = None,
     ):
-        """Creates a dummy booklet pdf with the specified number of double pages."""
+        """Creates a dummy booklet pdf with the specified number of double pages - optionally as image only scan.
+
+        the random rotations are reproducible if a seed is given
+        """
+        rng = random.Random(seed)
         writer = PdfWriter()
         double_pages = self.create_double_pages(double_pages)
 
@@ -494,17 +974,64 @@ class PdfFile:
             # Create an empty double page of 'A4 landscape' size
             left = double_page.left
             right = double_page.right
-            reader = self.create_double_page_with_numbers(left.page_num, right.page_num)
+            if as_scan:
+                reader = self.create_scanned_double_page_with_numbers(
+                    left.page_num, right.page_num
+                )
+            else:
+                reader = self.create_double_page_with_numbers(
+                    left.page_num, right.page_num
+                )
             rotated_page = reader.pages[0]
             # If random rotation is enabled, rotate the page randomly
             if with_random_rotation:
-                angle = random.choice([0, 90, 180, 270])
+                angle = rng.choice([0, 90, 180, 270])
                 rotated_page = rotated_page.rotate(angle)
             double_page.page = rotated_page
             writer.add_page(double_page.page)
         self.save(writer)
 
 
+class LazyPdfWriter:
+    """
+    the writer of a pdf that has already been written to the given path
+
+    the pdf is only read back on first use since parsing a large output
+    would undo the speed-up of writing it in parallel
+    """
+
+    def __init__(self, path: str):
+        """
+        constructor
+
+        Args:
+            path (str): the path of the written pdf
+        """
+        self.path = path
+        self._writer = None
+
+    @property
+    def writer(self) -> PdfWriter:
+        """
+        get the writer - read from my path on first access
+        """
+        if self._writer is None:
+            self._writer = PdfWriter(clone_from=self.path)
+        return self._writer
+
+    def is_loaded(self) -> bool:
+        """
+        check whether the pdf has been read back already
+        """
+        return self._writer is not None
+
+    def __getattr__(self, name: str):
+        # delegate e.g. pages and write to the loaded writer
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.writer, name)
+
+
 class PDFTool:
     """
     A class to work on PDFs
@@ -517,7 +1044,19 @@ class PDFTool:
         output_file (str): The path to the output split PDF file.
     """
 
-    def __init__(self, input_file: str, output_file: str, debug: bool = False) -> None:
+    # how to split pages that consist of a single image e.g. scans
+    # merge: merge the content streams like for any other page
+    # clip: reuse the image XObject with a clipping transformation
+    # raster: decode the image, split it at the gutter and re-encode the halves
+    image_modes = ["merge", "clip", "raster"]
+
+    def __init__(
+        self,
+        input_file: str,
+        output_file: str,
+        debug: bool = False,
+        shared_document=None,
+    ) -> None:
         """
         Initializes the PDFTool with input and output file paths and optional debugging.
 
@@ -525,25 +1064,61 @@ class PDFTool:
             input_file (str): Path to the input PDF file.
             output_file (str): Path to the output PDF file.
             debug (bool): Whether to enable debugging watermarks. Default is False.
+            shared_document (CachedDocument): the already parsed input e.g. from a DocumentCache
         """
-        self.input_file = PdfFile(input_file)
-        self.output_file = PdfFile(output_file)
+        if shared_document is not None:
+            self.input_file = PdfFile.of_shared(shared_document)
+        else:
+            self.input_file = PdfFile(input_file)
+        # the output is only written - there is no need to read it
+        self.output_file = PdfFile(output_file, auto_open=False)
         self.debug = debug
         self.args = None
         self.verbose = False
         self.from_binder = False
+        self.compact = False
+        self.image_mode = "clip"
+        self.gutter = None
+        self.auto_gutter = False
+        self.max_workers = None
+        self.analyze = False
+        # check the scanned sides for duplicates and missing sides before splitting
+        self.check_sheets = False
+        self.sheet_report = None
+        # write reproducible output with fixed document ids
+        self.deterministic = False
+        # write linearized output for fast web view
+        self.linearize = False
+        # flatten the nested content streams of the half pages
+        self.simplify = False
+        self.simplifier = ContentSimplifier()
+        # the TextIndex to add the text of the un-booklet result to - None: no indexing
+        self.text_index = None
+        # poster and n-up options
+        self.sheet_format = "A4"
+        self.overlap = 0
+        self.margin = 0
+        self.crop_marks = False
+        # number of poster tiles per shard of the process pool
+        self.poster_shard_tiles = 64
+        # number of half pages per fragment of the process pool
+        self.fragment_pages = 50
+        # the MemoryBudget of the process pool - default: half of the available memory
+        self.memory_budget = None
+        self.scheduler = None
+        # number of half pages per checkpoint chunk - 0: no checkpoints
+        self.checkpoint_interval = 0
+        # continue from the last checkpoint of an earlier run
+        self.resume = False
+        # the name of the PdfBackend to un-booklet with - auto: the fastest
+        # available backend, None: the standard implementation with all options
+        self.backend = None
         self.page_sizes=PDFTool.get_pagesizes()
         
     @classmethod
     def get_pagesizes(cls):
-        # Define the page sizes in points (1 point = 1/72 inch)
-        page_sizes = {
-            'A0': pagesizes.A0,
-            'A1': pagesizes.A1,
-            'A2': pagesizes.A2,
-            'A3': pagesizes.A3,
-            'A4': pagesizes.A4
-        }
+        # the page sizes in points (1 point = 1/72 inch)
+        page_sizes = PaperFormat.get_pagesizes()
         return page_sizes
 
     def get_total_steps(self) -> int:
@@ -556,81 +1131,182 @@ class PDFTool:
         50 x writing left pages
         50 x writing right pages
         """
-        total_steps = 3 * len(self.input_file.reader.pages)
+        total_steps = 3 * PdfProbe.page_count(self.input_file.reader)
         return total_steps
 
-    def poster(self, source_format: str = "A4", target_format: str = "A3", progress_bar: Progressbar = None) -> PdfWriter:
+    def poster(
+        self,
+        source_format: str = "A4",
+        target_format: str = "A3",
+        progress_bar: Progressbar = None,
+        overlap: float = 0,
+        margin: float = 0,
+        crop_marks: bool = False,
+    ) -> Union[PdfWriter, LazyPdfWriter]:
         """
-        Convert to poster by scaling up pages from a smaller format to a larger format.
-        
+        Convert to poster by scaling up each page to the target format and
+        tiling it on sheets of the source format.
+
         Args:
-            source_format (str): The source page format (e.g., 'A4', 'A3', 'A2'). Default is 'A4'.
-            target_format (str): The target page format (e.g., 'A3', 'A2', 'A1', 'A0'). Default is 'A3'.
+            source_format (str): The format of the sheets to print on e.g. 'A4', 'Letter' or '210x297mm'. Default is 'A4'.
+            target_format (str): The poster format e.g. 'A3', 'A0' or '600x900mm'. Default is 'A3'.
             progress_bar (Progressbar): Progress bar to track progress.
+            overlap (float): the glue margin shared by neighbouring tiles in points
+            margin (float): the unprintable border of each sheet in points
+            crop_marks (bool): if True draw marks where the tiles are to be cut
 
         Returns:
-            PdfWriter: The PDF writer object with the transformed pages.
+            PdfWriter: The PDF writer object with the tiles - a LazyPdfWriter of the
+            output if the tiles have been concatenated from fragments of worker processes
         """
-        if source_format not in self.page_sizes or target_format not in self.page_sizes:
-            raise ValueError("Unsupported source or target format. Supported formats are: A0, A1, A2, A3, A4.")
-        
-        source_width, source_height = self.page_sizes[source_format]
-        target_width, target_height = self.page_sizes[target_format]
-        
-        if source_width >= target_width or source_height >= target_height:
-            raise ValueError("Source format must be smaller than target format.")
-        
-        writer = PdfWriter()
+        target_width, target_height = PaperFormat.get_size(target_format)
+        tiler = Tiler(
+            source_format, overlap=overlap, margin=margin, crop_marks=crop_marks
+        )
         reader = self.input_file.reader
-        
-        horizontal_splits = math.ceil(target_width / source_width) - 1
-        vertical_splits = math.ceil(target_height / source_height) - 1
-
-        total_steps = len(reader.pages) * horizontal_splits * vertical_splits
-        
+        # the grids are shared by all pages of the same geometry
+        grids = [
+            tiler.get_grid(page, target_width, target_height) for page in reader.pages
+        ]
         if progress_bar is not None:
-            progress_bar.total = total_steps
+            progress_bar = ProgressBus.of(progress_bar)
+            progress_bar.total = sum(len(grid.tiles) for grid in grids)
             progress_bar.reset()
-        
-        for page_num in range(len(reader.pages)):
-            page = reader.pages[page_num]
-            self.split_and_scale_page(writer, page, source_width, source_height, target_width, target_height, horizontal_splits, vertical_splits, progress_bar)
-        
-        with open(self.output_file.filename, "wb") as output_file:
-            writer.write(output_file)
+            progress_bar.set_description("tiling pages")
+
+        operation = (
+            f"poster {source_format} {target_format} {overlap} {margin} {crop_marks}"
+        )
+        shards = self.get_poster_shards(grids)
+        if self.use_process_pool() and len(shards) > 1:
+            fragments = self.poster_fragments(
+                tiler, grids, shards, target_width, target_height, progress_bar
+            )
+            self.write_concatenated(fragments, operation)
+            writer = LazyPdfWriter(self.output_file.filename)
+        else:
+            writer = PdfWriter()
+            for page, grid in zip(reader.pages, grids):
+                for sheet in tiler.poster_sheets(page, writer, grid):
+                    writer.add_page(sheet)
+                    if progress_bar is not None:
+                        progress_bar.update(1)
+            self.write_output(writer, operation)
 
         self.input_file.close()
+        if progress_bar is not None:
+            progress_bar.close()
         return writer
 
-    def split_and_scale_page(self, writer: PdfWriter, page: PageObject, source_width: float, source_height: float, target_width: float, target_height: float, horizontal_splits: int, vertical_splits: int, progress_bar: Progressbar = None) -> None:
+    def get_poster_shards(self, grids: list) -> List[List[int]]:
         """
-        Split a single page and scale it up to the target format.
+        split the pages into shards of consecutive pages with about
+        poster_shard_tiles tiles each - all tiles of a page stay in the same shard
+        so that they share the form XObject of the page
 
         Args:
-            writer (PdfWriter): The PDF writer object.
-            page (PageObject): The page to be split and scaled.
-            source_width (float): The width of the source format.
-            source_height (float): The height of the source format.
-            target_width (float): The width of the target format.
-            target_height (float): The height of the target format.
-            horizontal_splits (int): The number of horizontal splits.
-            vertical_splits (int): The number of vertical splits.
+            grids (list): the TileGrid of each page
+
+        Returns:
+            List[List[int]]: the page indices of each shard
+        """
+        shards = []
+        shard = []
+        tiles = 0
+        for index, grid in enumerate(grids):
+            shard.append(index)
+            tiles += len(grid.tiles)
+            if tiles >= self.poster_shard_tiles:
+                shards.append(shard)
+                shard = []
+                tiles = 0
+        if shard:
+            shards.append(shard)
+        return shards
+
+    def poster_fragments(
+        self,
+        tiler: Tiler,
+        grids: list,
+        shards: List[List[int]],
+        poster_width: float,
+        poster_height: float,
+        progress_bar: Progressbar = None,
+    ) -> List[bytes]:
+        """
+        tile the shards of pages in a process pool
+
+        Args:
+            tiler (Tiler): the tiler to use in the worker processes
+            grids (list): the TileGrid of each page
+            shards (list): the page indices of each shard see get_poster_shards
+            poster_width (float): the width of the poster
+            poster_height (float): the height of the poster
             progress_bar (Progressbar): Progress bar to track progress.
+
+        Returns:
+            List[bytes]: a standalone pdf with the sheets of each shard in page order
         """
-        for row in range(vertical_splits):
-            for col in range(horizontal_splits):
-                new_page = PageObject.create_blank_page(width=source_width, height=source_height)
-                lower_left_x = col * source_width
-                lower_left_y = target_height - (row + 1) * source_height
-                new_page.merge_translated_page(page, -lower_left_x, -lower_left_y)
-                
-                scaled_page = PageObject.create_blank_page(width=target_width, height=target_height)
-                scaled_page.merge_transformed_page(new_page, Transformation().scale(target_width / source_width, target_height / source_height))
-                
-                writer.add_page(scaled_page)
-
-                if progress_bar is not None:
-                    progress_bar.update(1)
+        scheduler = self.get_scheduler()
+        estimates = self.estimate_pages()
+        tasks = [
+            (self.input_file.filename, shard, poster_width, poster_height)
+            for shard in shards
+        ]
+        # each tile is a copy of its page
+        costs = [
+            sum(estimates[i].cost() * len(grids[i].tiles) for i in shard)
+            for shard in shards
+        ]
+
+        def on_result(index: int, _fragment: bytes):
+            if progress_bar is not None:
+                tiles = sum(len(grids[i].tiles) for i in shards[index])
+                progress_bar.update(tiles)
+
+        fragments = scheduler.run(tiler.poster_shard, tasks, costs, on_result)
+        return fragments
+
+    def n_up(
+        self,
+        rows: int = 1,
+        cols: int = 2,
+        sheet_format: str = "A4",
+        margin: float = 0,
+        progress_bar: Progressbar = None,
+    ) -> PdfWriter:
+        """
+        place rows x cols pages on each sheet of the given format
+
+        Args:
+            rows (int): the number of rows per sheet
+            cols (int): the number of columns per sheet
+            sheet_format (str): the format of the sheets e.g. 'A4'
+            margin (float): the unprintable border of each sheet in points
+            progress_bar (Progressbar): Progress bar to track progress.
+
+        Returns:
+            PdfWriter: The PDF writer object with the sheets.
+        """
+        tiler = Tiler(sheet_format, margin=margin)
+        writer = PdfWriter()
+        pages = list(self.input_file.reader.pages)
+        sheets = tiler.n_up(pages, writer, rows, cols)
+        if progress_bar is not None:
+            progress_bar = ProgressBus.of(progress_bar)
+            progress_bar.total = len(sheets)
+            progress_bar.reset()
+        for sheet in sheets:
+            writer.add_page(sheet)
+            if progress_bar is not None:
+                progress_bar.update(1)
+
+        self.write_output(writer, f"n_up {rows} {cols} {sheet_format} {margin}")
+
+        self.input_file.close()
+        if progress_bar is not None:
+            progress_bar.close()
+        return writer
 
     def split_booklet_style(self, progress_bar: Progressbar = None) -> None:
         """
@@ -653,12 +1329,251 @@ class PDFTool:
             progress_bar = TqdmProgressbar(
                 total=total_steps, desc="Processing all pages", unit="step"
             )
-        self.progress_bar = progress_bar
+        # the per page updates are coalesced by the bus
+        self.progress_bar = ProgressBus.of(progress_bar)
+        if self.check_sheets:
+            self.progress_bar.set_description("checking sheets")
+            self.check_booklet()
+
+        checkpoint = None
+        if self.checkpoint_interval or self.resume:
+            checkpoint = self.get_checkpoint()
+        try:
+            self.write_unbooklet(checkpoint)
+        finally:
+            if checkpoint:
+                checkpoint.release()
+
+        self.input_file.close()
+        if self.input_file.debug_collector:
+            self.input_file.debug_collector.wait()
+            if self.verbose:
+                print(f"debug pages at {self.input_file.debug_collector.pdf_path}")
+        if self.text_index is not None:
+            self.progress_bar.set_description("indexing text")
+            self.text_index.index_document(self.output_file.filename)
+        self.progress_bar.close()
+
+    def write_unbooklet(self, checkpoint: Checkpoint = None):
+        """
+        write my half pages to my output
+
+        Args:
+            checkpoint (Checkpoint): the locked checkpoint to continue if any
+        """
+        fragments = None
+        writer = None
+        if checkpoint:
+            fragments = self.write_checkpointed(checkpoint)
+        elif self.use_process_pool():
+            fragments = self.write_fragments()
+        elif self.use_backend():
+            self.write_with_backend(self.get_backend())
+        elif self.compact:
+            writer = self.write_compact()
+        else:
+            writer = self.write_half_pages()
+
+        if self.verbose:
+            print(f"\nOutput at {self.output_file.filename}")
+            if self.simplify:
+                print(f"simplified content streams: {self.simplifier.stats}")
+
+        if fragments is not None:
+            self.write_concatenated(fragments, "unbooklet")
+        elif writer is not None:
+            self.write_output(writer, "unbooklet")
+        if checkpoint:
+            checkpoint.cleanup()
+
+    def check_booklet(self) -> SheetReport:
+        """
+        check my input for duplicate and missing scanned sides - the
+        issues are shown since they would shift the numbers of all later pages
+
+        Returns:
+            SheetReport: the report of the check
+        """
+        checker = SheetChecker()
+        self.sheet_report = checker.check(self.input_file.filename, self.from_binder)
+        if self.verbose or not self.sheet_report.available:
+            print(self.sheet_report)
+        else:
+            for issue in self.sheet_report.issues:
+                print(issue)
+        return self.sheet_report
+
+    def get_document_id(self, operation: str) -> bytes:
+        """
+        get a document id that only depends on my input and the given operation
+
+        Args:
+            operation (str): the description of the operation including its parameters
+
+        Returns:
+            bytes: the md5 digest to use as document id
+        """
+        md5 = hashlib.md5()
+        with open(self.input_file.filename, "rb") as input_file:
+            for chunk in iter(lambda: input_file.read(1 << 20), b""):
+                md5.update(chunk)
+        options = (
+            operation,
+            self.debug,
+            self.from_binder,
+            self.compact,
+            self.image_mode,
+            self.gutter,
+            self.auto_gutter,
+            self.analyze,
+            self.simplify,
+            self.backend,
+        )
+        md5.update(repr(options).encode())
+        document_id = md5.digest()
+        return document_id
+
+    def write_output(self, writer: PdfWriter, operation: str):
+        """
+        write the given writer to my output file
+
+        Args:
+            writer (PdfWriter): the writer with the result
+            operation (str): the description of the operation e.g. for the document id
+        """
+        if self.deterministic:
+            # a fixed id instead of none - the rest of the output is reproducible anyway
+            document_id = ByteStringObject(self.get_document_id(operation))
+            writer._ID = ArrayObject([document_id, document_id])
+        with open(self.output_file.filename, "wb") as output_file:
+            writer.write(output_file)
+        if self.linearize:
+            Linearizer.linearize_file(self.output_file.filename)
+
+    def write_concatenated(self, fragments: list, operation: str):
+        """
+        concatenate the given standalone pdf fragments to my output file
+
+        Args:
+            fragments (list): the pdfs as bytes or file paths in page order
+            operation (str): the description of the operation e.g. for the document id
+        """
+        document_id = None
+        if self.deterministic:
+            document_id = self.get_document_id(operation)
+        with open(self.output_file.filename, "wb") as output_file:
+            PdfConcatenator().write(fragments, output_file, document_id)
+        if self.linearize:
+            Linearizer.linearize_file(self.output_file.filename)
+
+    def use_process_pool(self) -> bool:
+        """
+        check whether the work is to be distributed to worker processes
+
+        the process pool is opt-in with more than one worker - reproducible
+        output must not depend on the number of workers
+        """
+        use_pool = (self.max_workers or 1) > 1 and not self.deterministic
+        return use_pool
+
+    def use_backend(self) -> bool:
+        """
+        check whether the half pages are to be placed with a PdfBackend
+
+        the backends only clip and transform the pages - the options that
+        need pypdf page objects use the standard implementation
+        """
+        use = self.backend is not None and not (
+            self.debug
+            or self.analyze
+            or self.simplify
+            or self.deterministic
+            or self.image_mode == "raster"
+            or self.gutter is not None
+            or self.auto_gutter
+        )
+        if self.backend is not None and not use and self.verbose:
+            print(
+                f"the {self.backend} backend does not support the options - using pypdf"
+            )
+        return use
+
+    def get_backend(self) -> PdfBackend:
+        """
+        get the PdfBackend for my backend name - auto selects the
+        backend chosen by the backend benchmark see Benchmark.fastest_backend
+        """
+        name = self.backend
+        if name == "auto":
+            name = PdfBackends.chosen()
+            if name is None and self.verbose:
+                print(
+                    "no backend chosen for the installed libraries - run --benchmark_backends"
+                )
+        backend = PdfBackends.of(name)
+        return backend
+
+    def write_with_backend(self, backend: PdfBackend):
+        """
+        place the reordered half pages with the given backend and write them to my output file
+
+        Args:
+            backend (PdfBackend): the backend to use
+        """
+        self.progress_bar.set_description(f"splitting pages with {backend}")
+        source = backend.open(self.input_file.filename)
+        try:
+            refs = HalfPageRef.get_refs(backend.page_count(source), self.from_binder)
+            target = backend.new_document()
+            a4_height, a4_width = pagesizes.A4  # Landscape A4
+            # Scale factor between A5 and A4
+            scale_factor = math.sqrt(2)
+            for page_num in sorted(refs):
+                ref = refs[page_num]
+                x0 = 0 if ref.is_left else a4_width / 2
+                backend.place(
+                    target,
+                    source,
+                    ref.page_index,
+                    clip=(x0, 0, x0 + a4_width / 2, a4_height),
+                    width=a4_width / 2 * scale_factor,
+                    height=a4_height * scale_factor,
+                )
+                self.progress_bar.update(1)
+            self.progress_bar.set_description("writing pages")
+            backend.write(target, self.output_file.filename)
+            self.progress_bar.update(len(refs) // 2)
+        finally:
+            backend.close(source)
+        if self.linearize:
+            Linearizer.linearize_file(self.output_file.filename)
+
+    def get_analyzer(self) -> ScanAnalyzer:
+        """
+        get the scan analyzer to use
 
+        Returns:
+            ScanAnalyzer: the analyzer or None if scans are not to be analyzed
+        """
+        analyzer = None
+        if self.analyze:
+            analyzer = ScanAnalyzer(max_workers=self.max_workers)
+        return analyzer
+
+    def write_half_pages(self) -> PdfWriter:
+        """
+        read all double pages of the booklet and add the reordered
+        half pages to a new writer
+        """
         self.input_file.read_booklet(
             from_binder=self.from_binder,
             progress_bar=self.progress_bar,
             debug=self.debug,
+            image_mode=self.image_mode,
+            gutter=self.gutter,
+            auto_gutter=self.auto_gutter,
+            max_workers=self.max_workers,
+            analyzer=self.get_analyzer(),
         )
         # Change the description
         self.progress_bar.set_description("reordering pages")
@@ -677,17 +1592,295 @@ class PDFTool:
             else:
                 page = half_page.page
             page.scale_by(scale_factor)
-            writer.add_page(page)
+            if self.simplify:
+                self.simplifier.simplify_page(page)
+            ResourceRegistry.of(writer).add_page(page)
             # Update the progress bar
             self.progress_bar.update(1)
+        return writer
 
-        if self.verbose:
-            print(f"\nOutput at {self.output_file.filename}")
+    def split_raster_refs(
+        self, refs: List[HalfPageRef], analyses: dict, raster_halves: dict = None
+    ) -> dict:
+        """
+        physically split the double pages of the given half page references
+        in a thread pool in raster mode - double pages that are already in the
+        given raster halves are not split again - see HalfPageRef.take_raster_half
 
-        with open(self.output_file.filename, "wb") as output_file:
-            writer.write(output_file)
+        Args:
+            refs (list): the references to the half pages to render next
+            analyses (dict): PageAnalysis results by page index
+            raster_halves (dict): the double pages split so far
 
-        self.input_file.close()
+        Returns:
+            dict: tuples of left and right half pages by page index - None if not in raster mode
+        """
+        if self.image_mode != "raster":
+            return None
+        if raster_halves is None:
+            raster_halves = {}
+        page_indices = {
+            ref.page_index for ref in refs if ref.page_index not in raster_halves
+        }
+        if page_indices:
+            split_halves = self.input_file.split_raster(
+                self.gutter,
+                self.auto_gutter,
+                self.max_workers,
+                analyses,
+                page_indices=page_indices,
+            )
+            for page_index in page_indices:
+                # (None, None) for pages that are no scans or can not be split
+                raster_halves[page_index] = split_halves.get(page_index, (None, None))
+        return raster_halves
+
+    def render_half_page(
+        self, ref: HalfPageRef, analyses: dict, raster_halves: dict = None
+    ) -> PageObject:
+        """
+        render the given half page reference and scale it from A5 to A4
+
+        Args:
+            ref (HalfPageRef): the reference to the half page
+            analyses (dict): PageAnalysis results by page index
+            raster_halves (dict): the physically split double pages see split_raster_refs
+
+        Returns:
+            PageObject: the scaled half page
+        """
+        page = None
+        image_mode = self.image_mode
+        if raster_halves is not None:
+            page = ref.take_raster_half(raster_halves)
+            if page is None:
+                # not a scan or its image can not be split physically
+                image_mode = "clip"
+        if page is None:
+            page = ref.render(
+                self.input_file.reader.pages,
+                image_mode=image_mode,
+                gutter=self.gutter,
+                auto_gutter=self.auto_gutter,
+                analysis=analyses.get(ref.page_index),
+            )
+        if self.debug:
+            page = Watermark.get_watermarked_page(page, str(ref))
+        # Scale factor between A5 and A4
+        page.scale_by(math.sqrt(2))
+        if self.simplify:
+            self.simplifier.simplify_page(page)
+        return page
+
+    def write_compact(self) -> PdfWriter:
+        """
+        add the reordered half pages to a new writer using compact
+        HalfPageRef references - no HalfPage and DoublePage graphs with
+        back-references to the double pages are built, but every rendered
+        page stays in the writer until it is written - see write_checkpointed
+        for flushing chunks of pages
+        """
+        refs = self.input_file.half_page_refs(from_binder=self.from_binder)
+        analyzer = self.get_analyzer()
+        analyses = self.input_file.analyze_scans(analyzer) if analyzer else {}
+        raster_halves = self.split_raster_refs(list(refs.values()), analyses)
+        writer = PdfWriter()
+        self.progress_bar.set_description("writing pages")
+        for i, page_num in enumerate(sorted(refs.keys())):
+            page = self.render_half_page(refs[page_num], analyses, raster_halves)
+            ResourceRegistry.of(writer).add_page(page)
+            # extraction and writing are done in one go - 3 steps per 2 half pages
+            self.progress_bar.update(2 if i % 2 == 0 else 1)
+        return writer
+
+    def get_fragment_options(self) -> dict:
+        """
+        get the options for rendering half pages in a worker process
+        """
+        options = {
+            "debug": self.debug,
+            "from_binder": self.from_binder,
+            "image_mode": self.image_mode,
+            "gutter": self.gutter,
+            "auto_gutter": self.auto_gutter,
+            "simplify": self.simplify,
+        }
+        return options
+
+    @classmethod
+    def write_fragment(
+        cls, input_path: str, page_nums: List[int], options: dict, analyses: dict
+    ) -> bytes:
+        """
+        render the given half pages of the given booklet and serialize
+        them as a standalone pdf - runs in a worker process
+
+        Args:
+            input_path (str): the path of the booklet
+            page_nums (list): the numbers of the half pages to render
+            options (dict): the options see get_fragment_options
+            analyses (dict): PageAnalysis results by page index
+
+        Returns:
+            bytes: the pdf with the half pages
+        """
+        options = dict(options)
+        tool = cls(input_path, None, debug=options.pop("debug"))
+        for name, value in options.items():
+            setattr(tool, name, value)
+        refs = tool.input_file.half_page_refs(from_binder=tool.from_binder)
+        raster_halves = tool.split_raster_refs(
+            [refs[page_num] for page_num in page_nums], analyses
+        )
+        writer = PdfWriter()
+        for page_num in page_nums:
+            page = tool.render_half_page(refs[page_num], analyses, raster_halves)
+            ResourceRegistry.of(writer).add_page(page)
+        buffer = BytesIO()
+        writer.write(buffer)
+        tool.input_file.close()
+        return buffer.getvalue()
+
+    def write_fragments(self) -> List[bytes]:
+        """
+        render and serialize chunks of fragment_pages half pages in a process pool
+
+        Returns:
+            List[bytes]: a standalone pdf for each chunk in page order
+        """
+        refs = self.input_file.half_page_refs(from_binder=self.from_binder)
+        page_nums = sorted(refs.keys())
+        analyzer = self.get_analyzer()
+        analyses = self.input_file.analyze_scans(analyzer) if analyzer else {}
+        options = self.get_fragment_options()
+        scheduler = self.get_scheduler()
+        estimates = self.estimate_pages()
+        decode = self.image_mode == "raster"
+        page_costs = {
+            page_num: estimates[ref.page_index].cost(decode)
+            for page_num, ref in refs.items()
+        }
+        # smaller chunks for large pages so that the chunks fit into the budget
+        chunks = scheduler.memory_budget.chunk(
+            page_nums,
+            [page_costs[page_num] for page_num in page_nums],
+            self.fragment_pages,
+            scheduler.max_workers,
+        )
+        tasks = []
+        costs = []
+        starts = []
+        start = 0
+        for chunk in chunks:
+            page_indices = {refs[page_num].page_index for page_num in chunk}
+            chunk_analyses = {
+                page_index: analysis
+                for page_index, analysis in analyses.items()
+                if page_index in page_indices
+            }
+            tasks.append((self.input_file.filename, chunk, options, chunk_analyses))
+            costs.append(sum(page_costs[page_num] for page_num in chunk))
+            starts.append(start)
+            start += len(chunk)
+
+        def on_result(index: int, _fragment: bytes):
+            start = starts[index]
+            steps = sum(
+                2 if i % 2 == 0 else 1 for i in range(start, start + len(chunks[index]))
+            )
+            self.progress_bar.update(steps)
+
+        self.progress_bar.set_description("writing pages")
+        fragments = scheduler.run(PDFTool.write_fragment, tasks, costs, on_result)
+        return fragments
+
+    def estimate_pages(self) -> list:
+        """
+        estimate the memory needed for each page of my input
+
+        Returns:
+            List[PageEstimate]: the estimate of each page
+        """
+        estimates = [
+            PageMemoryEstimator.estimate_page(page)
+            for page in self.input_file.reader.pages
+        ]
+        return estimates
+
+    def get_scheduler(self) -> AdaptiveScheduler:
+        """
+        get the scheduler for the process pool of my max_workers and memory budget
+        """
+        memory_budget = self.memory_budget or MemoryBudget()
+        self.scheduler = AdaptiveScheduler(self.max_workers, memory_budget)
+        return self.scheduler
+
+    def get_checkpoint(self) -> Checkpoint:
+        """
+        get the checkpoint for un-bookleting my input to my output
+
+        with resume the chunks of an earlier run with the same input
+        and options are kept - otherwise they are removed
+
+        Returns:
+            Checkpoint: the locked checkpoint - release it when the job ends - or
+            None if another running job uses the checkpoint of my output
+        """
+        total = 2 * PdfProbe.page_count(self.input_file.reader)
+        job_id = self.get_document_id("unbooklet checkpoint").hex()
+        interval = self.checkpoint_interval or Checkpoint.default_interval
+        checkpoint = Checkpoint(self.output_file.filename, job_id, total, interval)
+        if not checkpoint.acquire():
+            if self.verbose:
+                print(f"{checkpoint.checkpoint_dir} is in use - not checkpointing")
+            return None
+        if self.resume and checkpoint.load():
+            if self.verbose:
+                print(f"resuming after {checkpoint.done} of {total} pages")
+        else:
+            checkpoint.reset()
+        return checkpoint
+
+    def write_checkpointed(self, checkpoint: Checkpoint) -> List[str]:
+        """
+        render the half pages that are not in a chunk of the given checkpoint yet
+        like write_compact and flush them to chunk files
+
+        Args:
+            checkpoint (Checkpoint): the checkpoint to continue
+
+        Returns:
+            List[str]: the paths of all chunk files in page order
+        """
+        refs = self.input_file.half_page_refs(from_binder=self.from_binder)
+        page_nums = sorted(refs.keys())
+        done = checkpoint.done
+        # the steps of the pages of the earlier run
+        self.progress_bar.update(sum(2 if i % 2 == 0 else 1 for i in range(done)))
+        remaining = page_nums[done:]
+        analyzer = self.get_analyzer()
+        analyses = {}
+        if analyzer and remaining:
+            page_indices = {refs[page_num].page_index for page_num in remaining}
+            analyses = self.input_file.analyze_scans(analyzer, page_indices)
+        raster_halves = None
+        self.progress_bar.set_description("writing pages")
+        interval = checkpoint.interval
+        for start in range(0, len(remaining), interval):
+            chunk = remaining[start : start + interval]
+            # split the scans of this chunk only - the other halves wait in memory
+            raster_halves = self.split_raster_refs(
+                [refs[page_num] for page_num in chunk], analyses, raster_halves
+            )
+            writer = PdfWriter()
+            for i, page_num in enumerate(chunk, start=done + start):
+                page = self.render_half_page(refs[page_num], analyses, raster_halves)
+                ResourceRegistry.of(writer).add_page(page)
+                self.progress_bar.update(2 if i % 2 == 0 else 1)
+            checkpoint.add_chunk(writer)
+        self.progress_bar.set_description("concatenating chunks")
+        chunk_paths = checkpoint.get_chunk_paths()
+        return chunk_paths
 
     @classmethod
     def from_args(cls, args):
@@ -698,4 +1891,23 @@ class PDFTool:
         tool.args = args
         tool.verbose = args.verbose
         tool.from_binder = args.from_binder
+        tool.compact = args.compact
+        tool.image_mode = args.image_mode
+        tool.gutter = args.gutter
+        tool.auto_gutter = args.auto_gutter
+        tool.max_workers = args.workers
+        if args.memory_budget:
+            tool.memory_budget = MemoryBudget(budget=args.memory_budget << 20)
+        tool.analyze = args.analyze
+        tool.check_sheets = args.check
+        tool.sheet_format = args.sheet
+        tool.overlap = args.overlap * mm
+        tool.margin = args.margin * mm
+        tool.crop_marks = args.crop_marks
+        tool.deterministic = args.deterministic
+        tool.linearize = args.linearize
+        tool.simplify = args.simplify
+        tool.checkpoint_interval = args.checkpoint
+        tool.resume = args.resume
+        tool.backend = args.backend
         return tool
@@ -0,0 +1,403 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import math
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, List, Tuple
+
+from ngwidgets.progress import Progressbar
+from pypdf import PageObject, PdfWriter
+from pypdf.generic import RectangleObject
+
+from nicepdf.content_simplifier import ContentSimplifier
+from nicepdf.image_page import ImagePage
+from nicepdf.pdf_probe import PdfProbe
+from nicepdf.pdftool import HalfPageRef, PdfFile, PDFTool, Watermark
+from nicepdf.progress import ProgressBus
+from nicepdf.resources import ResourceRegistry
+from nicepdf.tiling import PaperFormat, TileGrid, Tiler
+
+
+class Stage(ABC):
+    """
+    a stage of a pipeline - gets pages from the previous stage
+    and hands its pages on to the next stage without writing them
+    """
+
+    # the name of the stage in pipeline specifications
+    name = None
+
+    def __init__(self, tool: PDFTool):
+        """
+        constructor
+
+        Args:
+            tool (PDFTool): the tool with the options e.g. from the command line
+        """
+        self.tool = tool
+        # the specification of the stage with its arguments
+        self.spec = self.name
+
+    def __str__(self):
+        return self.spec
+
+    @abstractmethod
+    def process(
+        self, pages: Iterable[PageObject], writer: PdfWriter
+    ) -> Iterator[PageObject]:
+        """
+        process the given pages
+
+        Args:
+            pages (Iterable): the pages of the previous stage
+            writer (PdfWriter): the writer the resulting pages will be added to
+
+        Returns:
+            Iterator[PageObject]: my pages
+        """
+
+    def finish(self, writer: PdfWriter):
+        """
+        called after all pages have been added to the given writer
+        """
+        pass
+
+
+class SplitStage(Stage):
+    """
+    un-booklet: split the double pages and reorder the half pages
+    """
+
+    name = "split"
+
+    def process(self, pages, writer):
+        # the half pages need random access to the double pages
+        pages = list(pages)
+        refs = HalfPageRef.get_refs(len(pages), from_binder=self.tool.from_binder)
+        analyses = {}
+        analyzer = self.tool.get_analyzer()
+        raster = self.tool.image_mode == "raster"
+        image_pages = {}
+        if analyzer or raster:
+            for i, page in enumerate(pages):
+                image_page = ImagePage.detect(page)
+                if image_page:
+                    image_pages[i] = image_page
+        if analyzer:
+            analyses = analyzer.analyze(image_pages)
+        raster_halves = {}
+        if raster:
+            # split each scan once for both of its half pages
+            raster_halves = PdfFile.split_image_pages(
+                image_pages,
+                self.tool.gutter,
+                self.tool.auto_gutter,
+                self.tool.max_workers,
+                analyses,
+            )
+        # Scale factor between A5 and A4
+        scale_factor = math.sqrt(2)
+        for page_num in sorted(refs.keys()):
+            ref = refs[page_num]
+            page = ref.take_raster_half(raster_halves) if raster else None
+            if page is None:
+                page = ref.render(
+                    pages,
+                    image_mode="clip" if raster else self.tool.image_mode,
+                    gutter=self.tool.gutter,
+                    auto_gutter=self.tool.auto_gutter,
+                    analysis=analyses.get(ref.page_index),
+                )
+            page.scale_by(scale_factor)
+            yield page
+
+
+class ReorderStage(Stage):
+    """
+    reorder or select pages e.g. reverse or 1,3,5-7
+    """
+
+    name = "reorder"
+
+    def __init__(self, tool: PDFTool, order: str = "reverse"):
+        super().__init__(tool)
+        self.order = order
+
+    def get_indices(self, page_count: int) -> List[int]:
+        """
+        get the indices of the pages to hand on for the given page count
+        """
+        if self.order == "reverse":
+            indices = list(reversed(range(page_count)))
+        else:
+            indices = []
+            for part in self.order.split(","):
+                first, _, last = part.partition("-")
+                first = int(first)
+                last = int(last) if last else first
+                step = 1 if last >= first else -1
+                indices.extend(range(first - 1, last - 1 + step, step))
+        return indices
+
+    def process(self, pages, writer):
+        pages = list(pages)
+        for index in self.get_indices(len(pages)):
+            if not 0 <= index < len(pages):
+                raise ValueError(
+                    f"page {index+1} of {self.order} is not in 1-{len(pages)}"
+                )
+            yield pages[index]
+
+
+class ScaleStage(Stage):
+    """
+    scale each page to fit a paper format - oriented like the page
+    """
+
+    name = "scale"
+
+    def __init__(self, tool: PDFTool, paper_format: str = "A4"):
+        super().__init__(tool)
+        self.width, self.height = sorted(PaperFormat.get_size(paper_format))
+
+    def process(self, pages, writer):
+        for page in pages:
+            rotation = page.get("/Rotate", 0) % 360
+            mediabox = tuple(float(v) for v in page.mediabox)
+            width, height = TileGrid.get_page_size(mediabox, rotation)
+            target_width, target_height = self.width, self.height
+            if width > height:
+                target_width, target_height = target_height, target_width
+            if rotation % 180 == 90:
+                # the mediabox is not rotated
+                width, height = height, width
+                target_width, target_height = target_height, target_width
+            factor = min(target_width / width, target_height / height)
+            page.scale_by(factor)
+            # center the scaled content on the full paper size
+            box = page.mediabox
+            dx = (target_width - float(box.width)) / 2
+            dy = (target_height - float(box.height)) / 2
+            page.mediabox = RectangleObject(
+                [box.left - dx, box.bottom - dy, box.right + dx, box.top + dy]
+            )
+            page.cropbox = page.mediabox
+            yield page
+
+
+class TileStage(Stage):
+    """
+    tile each page as a poster on sheets
+    """
+
+    name = "tile"
+
+    def __init__(self, tool: PDFTool, poster_format: str = "A3"):
+        super().__init__(tool)
+        self.poster_width, self.poster_height = PaperFormat.get_size(poster_format)
+        self.tiler = Tiler(
+            tool.sheet_format,
+            overlap=tool.overlap,
+            margin=tool.margin,
+            crop_marks=tool.crop_marks,
+        )
+
+    def process(self, pages, writer):
+        for page in pages:
+            grid = self.tiler.get_grid(page, self.poster_width, self.poster_height)
+            yield from self.tiler.poster_sheets(page, writer, grid)
+
+
+class NupStage(Stage):
+    """
+    place rows x cols pages on each sheet
+    """
+
+    name = "nup"
+
+    def __init__(self, tool: PDFTool, grid: str = "1x2"):
+        super().__init__(tool)
+        self.rows, self.cols = Pipeline.parse_grid(grid)
+        self.tiler = Tiler(tool.sheet_format, margin=tool.margin)
+
+    def process(self, pages, writer):
+        per_sheet = self.rows * self.cols
+        batch = []
+        for page in pages:
+            batch.append(page)
+            if len(batch) == per_sheet:
+                yield from self.tiler.n_up(batch, writer, self.rows, self.cols)
+                batch = []
+        if batch:
+            yield from self.tiler.n_up(batch, writer, self.rows, self.cols)
+
+
+class WatermarkStage(Stage):
+    """
+    add a text watermark to each page
+    """
+
+    name = "watermark"
+
+    def __init__(self, tool: PDFTool, message: str = "nicepdf"):
+        super().__init__(tool)
+        self.message = message
+
+    def process(self, pages, writer):
+        for page in pages:
+            yield Watermark.get_watermarked_page(page, self.message)
+
+
+class SimplifyStage(Stage):
+    """
+    flatten the nested transformations of the content streams
+    """
+
+    name = "simplify"
+
+    def __init__(self, tool: PDFTool):
+        super().__init__(tool)
+        self.simplifier = ContentSimplifier()
+
+    def process(self, pages, writer):
+        for page in pages:
+            yield self.simplifier.simplify_page(page)
+
+
+class OptimizeStage(Stage):
+    """
+    compress the content streams and share identical objects
+    """
+
+    name = "optimize"
+
+    def process(self, pages, writer):
+        yield from pages
+
+    def finish(self, writer):
+        for page in writer.pages:
+            page.compress_content_streams()
+        writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+
+
+class Pipeline:
+    """
+    a chain of stages that processes the pages of the input of a PDFTool
+    in memory - the input is read and the output is written once
+    """
+
+    stage_classes = [
+        SplitStage,
+        ReorderStage,
+        ScaleStage,
+        TileStage,
+        NupStage,
+        WatermarkStage,
+        SimplifyStage,
+        OptimizeStage,
+    ]
+
+    def __init__(self, tool: PDFTool, stages: List[Stage]):
+        """
+        constructor
+
+        Args:
+            tool (PDFTool): the tool with the input and output file
+            stages (list): the stages to apply in this order
+        """
+        self.tool = tool
+        self.stages = stages
+
+    def __str__(self):
+        text = " ".join(str(stage) for stage in self.stages)
+        return text
+
+    @classmethod
+    def stage_names(cls) -> List[str]:
+        names = [stage_class.name for stage_class in cls.stage_classes]
+        return names
+
+    @classmethod
+    def parse_grid(cls, grid: str) -> Tuple[int, int]:
+        """
+        parse a grid specification like 2x3 to rows and columns
+        """
+        rows, cols = (int(value) for value in grid.lower().split("x"))
+        return rows, cols
+
+    @classmethod
+    def from_spec(cls, spec, tool: PDFTool) -> "Pipeline":
+        """
+        create a pipeline from the given specification
+
+        Args:
+            spec: a list of stage specifications or a whitespace separated string
+                of them - each stage is given by its name followed by
+                optional arguments separated by colons e.g. tile:A2
+            tool (PDFTool): the tool with the input, output and options
+
+        Returns:
+            Pipeline: the pipeline
+
+        Raises:
+            ValueError: for an unknown stage
+        """
+        if isinstance(spec, str):
+            spec = spec.split()
+        stage_classes = {
+            stage_class.name: stage_class for stage_class in cls.stage_classes
+        }
+        stages = []
+        for stage_spec in spec:
+            name, *args = stage_spec.split(":")
+            stage_class = stage_classes.get(name)
+            if stage_class is None:
+                raise ValueError(
+                    f"unknown stage {name} - available stages: {', '.join(stage_classes)}"
+                )
+            stage = stage_class(tool, *args)
+            stage.spec = stage_spec
+            stages.append(stage)
+        pipeline = cls(tool, stages)
+        return pipeline
+
+    def run(self, progress_bar: Progressbar = None) -> PdfWriter:
+        """
+        run my stages on the pages of the input and write the output
+
+        Args:
+            progress_bar (Progressbar): Progress bar to track the input pages read
+
+        Returns:
+            PdfWriter: the writer of the output
+        """
+        reader = self.tool.input_file.reader
+        if progress_bar is not None:
+            progress_bar = ProgressBus.of(progress_bar)
+            progress_bar.total = PdfProbe.page_count(reader)
+            progress_bar.reset()
+            progress_bar.set_description(str(self))
+
+        def source():
+            for page in reader.pages:
+                yield page
+                if progress_bar is not None:
+                    progress_bar.update(1)
+
+        writer = PdfWriter()
+        pages = source()
+        for stage in self.stages:
+            pages = stage.process(pages, writer)
+        for page in pages:
+            ResourceRegistry.of(writer).add_page(page)
+        for stage in self.stages:
+            stage.finish(writer)
+
+        self.tool.write_output(writer, f"pipeline {self}")
+        self.tool.input_file.close()
+        if progress_bar is not None:
+            progress_bar.close()
+        return writer
@@ -0,0 +1,257 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+from ngwidgets.progress import Progressbar
+
+
+@dataclass
+class ProgressEvent:
+    """
+    the state of a job at the time of a progress event
+    """
+
+    stage: str  # e.g. "writing pages"
+    done: int  # the number of steps done
+    total: int  # the number of steps of the job
+    unit: str = "step"
+    elapsed: float = 0.0  # seconds since the last reset
+    final: bool = False  # True for the last event of a job
+
+    @property
+    def rate(self) -> float:
+        """
+        the number of steps per second
+        """
+        rate = self.done / self.elapsed if self.elapsed > 0 else 0.0
+        return rate
+
+    @property
+    def eta(self) -> Optional[float]:
+        """
+        the estimated number of seconds until the job is done
+        - None as long as there is no rate to estimate from
+        """
+        eta = None
+        if self.rate > 0 and self.total:
+            eta = max(0, self.total - self.done) / self.rate
+        return eta
+
+    def as_dict(self) -> dict:
+        record = asdict(self)
+        record["rate"] = self.rate
+        record["eta"] = self.eta
+        return record
+
+    def __str__(self):
+        text = f"{self.stage} {self.done}/{self.total} {self.unit}"
+        if self.eta is not None and not self.final:
+            text += f" ETA {self.eta:.0f} s"
+        return text
+
+
+class ProgressConsumer:
+    """
+    receives the coalesced events of a ProgressBus
+    """
+
+    def on_progress(self, event: ProgressEvent):
+        """
+        handle the given event
+
+        Args:
+            event (ProgressEvent): the current state of the job
+        """
+        pass
+
+
+class ProgressbarConsumer(ProgressConsumer):
+    """
+    shows the events in a progress bar e.g. a TqdmProgressbar or a NiceguiProgressbar
+    """
+
+    def __init__(self, progress_bar: Progressbar, show_eta: bool = False):
+        """
+        constructor
+
+        Args:
+            progress_bar (Progressbar): the progress bar to update
+            show_eta (bool): if True add the ETA to the description
+            e.g. for progress bars that do not estimate it themselves
+        """
+        self.progress_bar = progress_bar
+        self.show_eta = show_eta
+        self.desc = None
+
+    def on_progress(self, event: ProgressEvent):
+        if event.total != self.progress_bar.total:
+            self.progress_bar.total = event.total
+        if event.done < self.progress_bar.value:
+            self.progress_bar.reset()
+        desc = str(event) if self.show_eta else event.stage
+        if desc != self.desc:
+            self.desc = desc
+            self.progress_bar.set_description(desc)
+        if self.progress_bar.total and event.done != self.progress_bar.value:
+            self.progress_bar.update_value(event.done)
+
+
+class LogConsumer(ProgressConsumer):
+    """
+    logs the events
+    """
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        """
+        constructor
+
+        Args:
+            logger (logging.Logger): the logger to use - default: the logger of this module
+            level (int): the log level of the events
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def on_progress(self, event: ProgressEvent):
+        self.logger.log(self.level, "%s", event)
+
+
+class JobProgress(ProgressConsumer):
+    """
+    keeps the latest event of a job e.g. to be polled by a job API
+    """
+
+    def __init__(self):
+        self.event: Optional[ProgressEvent] = None
+
+    def on_progress(self, event: ProgressEvent):
+        self.event = event
+
+    def as_dict(self) -> dict:
+        record = self.event.as_dict() if self.event else {}
+        return record
+
+
+class ProgressBus(Progressbar):
+    """
+    a progress bar that workers publish cheap counter updates to
+
+    the updates are coalesced and fanned out to the consumers at most
+    once per interval - stage changes, resets and the end of the job
+    are always published. Worker threads may update concurrently; results
+    of worker processes are published by the parent as they complete.
+    """
+
+    def __init__(
+        self,
+        total: int = 0,
+        desc: str = "",
+        unit: str = "step",
+        interval: float = 0.2,
+        consumers: List[ProgressConsumer] = None,
+    ):
+        """
+        constructor
+
+        Args:
+            total (int): the number of steps of the job
+            desc (str): the initial stage
+            unit (str): the unit of the steps
+            interval (float): the minimum number of seconds between two published events
+            consumers (list): the consumers to publish to
+        """
+        self.lock = threading.RLock()
+        self.interval = interval
+        self.consumers = list(consumers or [])
+        self.start = time.monotonic()
+        self.published = None  # time of the last published event
+        self.events = 0
+        super().__init__(total, 0, desc, unit)
+
+    @classmethod
+    def of(cls, progress_bar: Progressbar) -> "ProgressBus":
+        """
+        get a bus for the given progress bar
+
+        Args:
+            progress_bar (Progressbar): a bus or a plain progress bar to publish to
+
+        Returns:
+            ProgressBus: the given bus or a new bus with the progress bar as consumer
+        """
+        if isinstance(progress_bar, ProgressBus):
+            return progress_bar
+        bus = cls(
+            progress_bar.total,
+            progress_bar.desc,
+            progress_bar.unit,
+            consumers=[ProgressbarConsumer(progress_bar)],
+        )
+        return bus
+
+    def subscribe(self, consumer: ProgressConsumer):
+        with self.lock:
+            self.consumers.append(consumer)
+
+    def publish(self, final: bool = False):
+        """
+        publish the current state to all consumers
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.published = now
+            self.events += 1
+            event = ProgressEvent(
+                stage=self.desc,
+                done=self.value,
+                total=self.total,
+                unit=self.unit,
+                elapsed=now - self.start,
+                final=final,
+            )
+            for consumer in self.consumers:
+                consumer.on_progress(event)
+
+    def update_total(self):
+        self.publish()
+
+    def reset(self):
+        with self.lock:
+            self.value = 0
+            self.start = time.monotonic()
+            self.publish()
+
+    def set_description(self, desc: str):
+        with self.lock:
+            if desc != self.desc:
+                self.desc = desc
+                self.publish()
+
+    def update(self, step: int = 1):
+        with self.lock:
+            self.update_value(self.value + step)
+
+    def update_value(self, new_value: int):
+        with self.lock:
+            self.value = new_value
+            if self.total and self.value >= self.total:
+                self.publish()
+            elif (
+                self.published is None
+                or time.monotonic() - self.published >= self.interval
+            ):
+                self.publish()
+
+    def close(self):
+        """
+        publish the final state
+        """
+        self.publish(final=True)
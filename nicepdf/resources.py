@@ -0,0 +1,193 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import weakref
+from copy import copy
+from typing import Dict, Tuple
+
+from pypdf import PageObject, PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    PdfObject,
+    StreamObject,
+)
+
+
+class ResourceRegistry:
+    """
+    interns the resources of the pages of a writer by content
+
+    merging pages creates a new resource dictionary for each output page -
+    the same font or image that is used by many pages of the input
+    (or is created again for every page e.g. by a watermark) would be
+    written once per page. The registry keeps a single object per content
+    and lets all pages of the writer reference it.
+    """
+
+    # the resource categories with named objects
+    categories = (
+        "/Font",
+        "/XObject",
+        "/ExtGState",
+        "/ColorSpace",
+        "/Pattern",
+        "/Shading",
+    )
+
+    # the registry of each writer
+    registries = weakref.WeakKeyDictionary()
+
+    def __init__(self, writer: PdfWriter):
+        """
+        constructor
+
+        Args:
+            writer (PdfWriter): the writer to register the resources in
+        """
+        self.writer = writer
+        # the writer objects by content key
+        self.objects: Dict[str, IndirectObject] = {}
+        # the content keys of indirect source objects by pdf id and object number
+        self.keys: Dict[Tuple[int, int, int], Tuple[weakref.ref, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def of(cls, writer: PdfWriter) -> "ResourceRegistry":
+        """
+        get the registry of the given writer
+
+        Args:
+            writer (PdfWriter): the writer
+
+        Returns:
+            ResourceRegistry: the registry - created on first use
+        """
+        registry = cls.registries.get(writer)
+        if registry is None:
+            registry = cls(writer)
+            cls.registries[writer] = registry
+        return registry
+
+    def get_key(self, obj: PdfObject, visiting: set = None) -> str:
+        """
+        get the content key of the given object - indirect objects
+        are resolved so that copies of the same content get the same key
+
+        Args:
+            obj (PdfObject): the object
+            visiting (set): the indirect objects on the current path to detect cycles
+
+        Returns:
+            str: the hex digest of the content
+        """
+        if visiting is None:
+            visiting = set()
+        if isinstance(obj, IndirectObject):
+            source_key = (id(obj.pdf), obj.idnum, obj.generation)
+            cached = self.keys.get(source_key)
+            # the id of a released pdf may be reused
+            if cached and cached[0]() is obj.pdf:
+                return cached[1]
+            if source_key in visiting:
+                # a reference cycle - keep the object distinct
+                return f"cycle {source_key}"
+            visiting.add(source_key)
+            key = self.get_key(obj.get_object(), visiting)
+            visiting.discard(source_key)
+            self.keys[source_key] = (weakref.ref(obj.pdf), key)
+            return key
+        md5 = hashlib.md5()
+        if isinstance(obj, StreamObject):
+            md5.update(b"stream")
+            md5.update(obj._data)
+        if isinstance(obj, DictionaryObject):
+            md5.update(b"<<")
+            for name in sorted(obj.keys()):
+                if name == "/Length":
+                    continue
+                md5.update(name.encode())
+                md5.update(self.get_key(obj.raw_get(name), visiting).encode())
+        elif isinstance(obj, ArrayObject):
+            md5.update(b"[")
+            for item in obj:
+                md5.update(self.get_key(item, visiting).encode())
+                md5.update(b",")
+        else:
+            md5.update(f"{type(obj).__name__}:{obj!r}".encode())
+        key = md5.hexdigest()
+        return key
+
+    def intern(self, obj: PdfObject) -> PdfObject:
+        """
+        get the writer object with the content of the given object
+
+        Args:
+            obj (PdfObject): the resource object e.g. a font
+
+        Returns:
+            PdfObject: the reference to the single writer object with this content
+            or the given object if it is a simple direct object e.g. a name
+        """
+        if not isinstance(obj, (IndirectObject, DictionaryObject, ArrayObject)):
+            return obj
+        key = self.get_key(obj)
+        ref = self.objects.get(key)
+        if ref is None:
+            self.misses += 1
+            if isinstance(obj, IndirectObject):
+                # objects that are already in my writer are kept
+                ref = obj.clone(self.writer)
+            else:
+                ref = self.writer._add_object(obj.clone(self.writer))
+            self.objects[key] = ref
+        else:
+            self.hits += 1
+        return ref
+
+    def intern_resources(self, resources: PdfObject) -> DictionaryObject:
+        """
+        get a copy of the given resource dictionary that references interned objects
+
+        Args:
+            resources (PdfObject): the resource dictionary - may be indirect
+
+        Returns:
+            DictionaryObject: the new resource dictionary
+        """
+        interned = DictionaryObject()
+        for category, value in resources.get_object().items():
+            named = value.get_object()
+            if category in self.categories and isinstance(named, DictionaryObject):
+                value = DictionaryObject(
+                    {
+                        NameObject(name): self.intern(named.raw_get(name))
+                        for name in named.keys()
+                    }
+                )
+            interned[NameObject(category)] = value
+        return interned
+
+    def add_page(self, page: PageObject) -> PageObject:
+        """
+        add the given page to my writer with interned resources
+
+        Args:
+            page (PageObject): the page to add - the page itself is not modified
+
+        Returns:
+            PageObject: the page added to the writer
+        """
+        resources = page.get("/Resources")
+        if resources is not None:
+            page = copy(page)
+            page[NameObject("/Resources")] = self.intern_resources(resources)
+        added_page = self.writer.add_page(page)
+        return added_page
@@ -0,0 +1,309 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+
+from pypdf import Transformation
+
+from nicepdf.image_page import ImagePage
+
+
+@dataclass
+class PageAnalysis:
+    """
+    the result of the image analysis of a scanned double page
+
+    all positions are fractions of the upright image - x from the left, y from the top
+    """
+
+    page_hash: str
+    bbox: Tuple[float, float, float, float]  # content box left, top, right, bottom
+    skew: float  # clockwise skew of the content in degrees
+    gutter: float  # position of the gutter as fraction of the image width
+
+    def get_transformation(
+        self, area: Tuple[float, float, float, float], width: float, height: float
+    ) -> Transformation:
+        """
+        get the transformation that deskews the scan, crops it to its content box
+        and moves the gutter to the middle of a double page of the given size
+
+        Args:
+            area (tuple): the page area x0, y0, x1, y1 covered by the image - see ImagePage.get_area
+            width (float): the width of the double page
+            height (float): the height of the double page
+
+        Returns:
+            Transformation: the transformation to apply after the rotation of the page
+        """
+        x0, y0, x1, y1 = area
+        image_width = x1 - x0
+        image_height = y1 - y0
+        left, top, right, bottom = self.bbox
+        # the content box in page coordinates
+        box_x0 = x0 + left * image_width
+        box_x1 = x0 + right * image_width
+        box_y0 = y1 - bottom * image_height
+        box_y1 = y1 - top * image_height
+        center_x = (box_x0 + box_x1) / 2
+        center_y = (box_y0 + box_y1) / 2
+        scale = min(width / (box_x1 - box_x0), height / (box_y1 - box_y0))
+        trsf = (
+            Transformation()
+            .translate(-center_x, -center_y)
+            .rotate(self.skew)
+            .scale(scale, scale)
+        )
+        gutter_x, _gutter_y = trsf.apply_on((x0 + self.gutter * image_width, center_y))
+        trsf = trsf.translate(width / 2 - gutter_x, height / 2)
+        return trsf
+
+
+class ScanAnalyzer:
+    """
+    analyzes downsampled rasters of scanned double pages to find
+    the content bounding box, the skew angle and the gutter
+
+    the analysis runs in a process pool and the results are cached by page hash
+    """
+
+    # increase when the analysis changes to invalidate cached results
+    version = 1
+
+    def __init__(
+        self, cache_dir: str = None, max_workers: int = None, max_size: int = 512
+    ):
+        """
+        constructor
+
+        Args:
+            cache_dir (str): the directory for cached results - default: ~/.nicepdf/analysis
+            max_workers (int): the maximum number of worker processes
+            max_size (int): the maximum width/height of the downsampled raster
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".nicepdf", "analysis")
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.max_size = max_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def page_hash(self, source: tuple, ctm: tuple) -> str:
+        """
+        get the hash of the given raster source as shown with the given matrix
+        """
+        sha = hashlib.sha256()
+        sha.update(f"{self.version}:{self.max_size}:{ctm}:{source[:-1]}".encode())
+        sha.update(source[-1])
+        page_hash = sha.hexdigest()
+        return page_hash
+
+    def get_cache_path(self, page_hash: str) -> str:
+        cache_path = os.path.join(self.cache_dir, f"{page_hash}.json")
+        return cache_path
+
+    def load(self, page_hash: str) -> Optional[PageAnalysis]:
+        """
+        load the cached analysis for the given page hash
+
+        Returns:
+            PageAnalysis: the analysis or None if it is not cached
+        """
+        cache_path = self.get_cache_path(page_hash)
+        if not os.path.exists(cache_path):
+            return None
+        with open(cache_path, "r") as json_file:
+            record = json.load(json_file)
+        record["bbox"] = tuple(record["bbox"])
+        analysis = PageAnalysis(**record)
+        return analysis
+
+    def store(self, analysis: PageAnalysis):
+        """
+        store the given analysis in my cache
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = self.get_cache_path(analysis.page_hash)
+        tmp_path = f"{cache_path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as json_file:
+            json.dump(asdict(analysis), json_file)
+        os.replace(tmp_path, cache_path)
+
+    def analyze(self, image_pages: Dict[int, ImagePage]) -> Dict[int, PageAnalysis]:
+        """
+        analyze the given image pages
+
+        Args:
+            image_pages (dict): ImagePage instances by page index
+
+        Returns:
+            dict: PageAnalysis results by page index
+        """
+        analyses = {}
+        pending = {}
+        for index, image_page in image_pages.items():
+            source = image_page.get_raster_source()
+            ctm = image_page.placement().ctm
+            page_hash = self.page_hash(source, ctm)
+            analysis = self.load(page_hash)
+            if analysis:
+                analyses[index] = analysis
+            else:
+                pending[index] = (page_hash, source, ctm)
+        self.cache_hits = len(analyses)
+        self.cache_misses = len(pending)
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {}
+                for index, (page_hash, source, ctm) in pending.items():
+                    futures[index] = (
+                        page_hash,
+                        executor.submit(
+                            ScanAnalyzer.analyze_raster, source, ctm, self.max_size
+                        ),
+                    )
+                for index, (page_hash, future) in futures.items():
+                    bbox, skew, gutter = future.result()
+                    analysis = PageAnalysis(
+                        page_hash=page_hash, bbox=bbox, skew=skew, gutter=gutter
+                    )
+                    self.store(analysis)
+                    analyses[index] = analysis
+        return analyses
+
+    @classmethod
+    def get_pixels(cls, source: tuple, ctm: tuple, max_size: int = 512):
+        """
+        get the downsampled upright gray raster of the given raster source
+
+        Returns:
+            numpy.ndarray: the gray values as float32 array - rows from the top
+        """
+        import numpy as np
+
+        image = ImagePage.image_from_raster_source(source)
+        image = image.convert("L")
+        image.thumbnail((max_size, max_size))
+        image = ImagePage.orient_image(image, ctm)
+        pixels = np.asarray(image, dtype=np.float32)
+        return pixels
+
+    @classmethod
+    def analyze_raster(cls, source: tuple, ctm: tuple, max_size: int = 512) -> tuple:
+        """
+        analyze the given raster source - runs in a worker process
+
+        Args:
+            source (tuple): see ImagePage.get_raster_source
+            ctm (tuple): the placement matrix of the image on the page
+            max_size (int): the maximum width/height of the downsampled raster
+
+        Returns:
+            tuple: bbox, skew, gutter - see PageAnalysis
+        """
+        from PIL import Image
+
+        pixels = cls.get_pixels(source, ctm, max_size)
+        bbox = cls.detect_content_box(pixels)
+        skew = cls.detect_skew(pixels, bbox)
+        height, width = pixels.shape
+        left, top, right, bottom = bbox
+        region = pixels[
+            round(top * height) : round(bottom * height),
+            round(left * width) : round(right * width),
+        ]
+        region_gutter = ImagePage.detect_gutter(Image.fromarray(region.astype("uint8")))
+        gutter = left + region_gutter * (right - left)
+        return bbox, skew, gutter
+
+    @classmethod
+    def detect_content_box(cls, pixels, threshold: float = 64) -> tuple:
+        """
+        detect the content box inside the dark borders of a scan
+
+        Args:
+            pixels (numpy.ndarray): the gray raster
+            threshold (float): rows/columns with a lower mean gray value are border
+
+        Returns:
+            tuple: left, top, right, bottom as fractions of the width/height
+        """
+        import numpy as np
+
+        height, width = pixels.shape
+        fractions = []
+        for axis, size in [(0, width), (1, height)]:
+            light = pixels.mean(axis=axis) >= threshold
+            if not light.any():
+                fractions.append((0.0, 1.0))
+                continue
+            start = int(np.argmax(light))
+            end = size - int(np.argmax(light[::-1]))
+            fractions.append((start / size, end / size))
+        (left, right), (top, bottom) = fractions
+        bbox = (left, top, right, bottom)
+        return bbox
+
+    @classmethod
+    def detect_skew(
+        cls,
+        pixels,
+        bbox: tuple,
+        max_angle: float = 5.0,
+        steps: int = 41,
+        max_samples: int = 20000,
+    ) -> float:
+        """
+        detect the skew of the dark content (text lines) inside the given box
+        by maximizing the sharpness of the row projection profile over all
+        candidate angles at once
+
+        Args:
+            pixels (numpy.ndarray): the gray raster
+            bbox (tuple): the content box see detect_content_box
+            max_angle (float): the maximum skew angle in degrees to check
+            steps (int): the number of candidate angles
+            max_samples (int): the maximum number of dark pixels to use
+
+        Returns:
+            float: the clockwise skew in degrees
+        """
+        import numpy as np
+
+        height, width = pixels.shape
+        left, top, right, bottom = bbox
+        region = pixels[
+            round(top * height) : round(bottom * height),
+            round(left * width) : round(right * width),
+        ]
+        ys, xs = np.nonzero(region < 128)
+        if len(xs) < 50:
+            return 0.0
+        if len(xs) > max_samples:
+            choice = np.random.default_rng(0).choice(
+                len(xs), max_samples, replace=False
+            )
+            ys, xs = ys[choice], xs[choice]
+        angles = np.radians(np.linspace(-max_angle, max_angle, steps))
+        projections = (
+            ys[None, :] * np.cos(angles)[:, None]
+            - xs[None, :] * np.sin(angles)[:, None]
+        )
+        bins = np.floor(projections - projections.min()).astype(np.int64)
+        bin_count = int(bins.max()) + 1
+        offsets = np.arange(steps, dtype=np.int64)[:, None] * bin_count
+        histograms = np.bincount(
+            (bins + offsets).ravel(), minlength=steps * bin_count
+        ).reshape(steps, bin_count)
+        scores = (histograms.astype(np.float64) ** 2).sum(axis=1)
+        skew = float(np.degrees(angles[int(np.argmax(scores))]))
+        return skew
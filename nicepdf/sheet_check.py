@@ -0,0 +1,328 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from pypdf import PdfReader
+
+from nicepdf.image_page import ImagePage
+
+
+@dataclass
+class SheetIssue:
+    """
+    a problem of the scanned sides of a booklet
+    """
+
+    kind: str  # "count" or "duplicate"
+    page_indices: Tuple[int, ...]  # the indices of the scanned sides counting from 0
+    message: str
+    distance: Optional[int] = None  # the hamming distance of duplicate hashes
+
+    def __str__(self):
+        return f"{self.kind}: {self.message}"
+
+
+@dataclass
+class SheetReport:
+    """
+    the result of the pre-flight check of a scanned booklet
+    """
+
+    side_count: int  # the number of scanned double pages
+    available: bool = True  # False if the check needs numpy which is not installed
+    hashes: Dict[int, int] = field(default_factory=dict)  # by page index
+    blank: List[int] = field(default_factory=list)  # indices of blank sides
+    issues: List[SheetIssue] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def __str__(self):
+        if not self.available:
+            text = (
+                f"{self.side_count} scanned sides - check unavailable: "
+                "install the scan extra (numpy)"
+            )
+            return text
+        lines = [
+            f"{self.side_count} scanned sides {len(self.hashes)} hashed {len(self.blank)} blank"
+        ]
+        lines.extend(str(issue) for issue in self.issues)
+        if self.ok:
+            lines.append("no duplicate or missing sides found")
+        text = "\n".join(lines)
+        return text
+
+
+class SheetChecker:
+    """
+    pre-flight check of a scanned booklet for double-fed and skipped sheets
+
+    each double page is reduced to a difference hash of a small gray raster -
+    near duplicates are found with a banded hash index and the number of
+    sides is checked against the booklet page numbering before any page is split
+
+    the hash only tells pages apart by their layout and larger details - the
+    default distance finds re-encoded and slightly changed rescans of a side
+    """
+
+    def __init__(
+        self,
+        hash_size: int = 16,
+        max_distance: int = None,
+        max_size: int = 128,
+        contrast: float = 0.1,
+        blank_threshold: float = 3.0,
+    ):
+        """
+        constructor
+
+        Args:
+            hash_size (int): the raster is reduced to hash_size x hash_size blocks
+            max_distance (int): the maximum hamming distance of near duplicates - default: 1/128 of the bits
+            max_size (int): the maximum width/height of the raster to hash
+            contrast (float): the minimum difference of neighbouring blocks in standard deviations of the raster
+            blank_threshold (float): sides with a lower standard deviation of the gray values are blank
+        """
+        self.hash_size = hash_size
+        if max_distance is None:
+            max_distance = self.bit_count(hash_size) // 128
+        self.max_distance = max_distance
+        self.max_size = max_size
+        self.contrast = contrast
+        self.blank_threshold = blank_threshold
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        check whether numpy is installed - it is part of the optional scan extra
+        """
+        try:
+            import numpy  # noqa: F401
+
+            available = True
+        except ImportError:
+            available = False
+        return available
+
+    @classmethod
+    def bit_count(cls, hash_size: int) -> int:
+        """
+        get the number of bits of a hash of the given size
+        """
+        return 2 * hash_size * hash_size
+
+    def get_scan_pixels(self, image_page: ImagePage):
+        """
+        get the downsampled upright gray raster of the given scanned page
+        - JPEG scans are decoded at a reduced scale
+        """
+        import numpy as np
+
+        source = image_page.get_raster_source()
+        image = ImagePage.image_from_raster_source(source)
+        image.draft("L", (self.max_size, self.max_size))
+        image = image.convert("L")
+        image.thumbnail((self.max_size, self.max_size))
+        image = ImagePage.orient_image(image, image_page.placement().ctm)
+        pixels = np.asarray(image, dtype=np.float32)
+        return pixels
+
+    def get_rendered_pixels(self, path: str) -> Dict[int, object]:
+        """
+        render the pages of the given pdf file with pymupdf if it is installed
+
+        Returns:
+            dict: the gray rasters by page index - empty if pymupdf is not available
+        """
+        import numpy as np
+
+        try:
+            import pymupdf
+        except ImportError:
+            return {}
+        rasters = {}
+        with pymupdf.open(path) as document:
+            for index, page in enumerate(document):
+                zoom = self.max_size / max(page.rect.width, page.rect.height)
+                pixmap = page.get_pixmap(
+                    matrix=pymupdf.Matrix(zoom, zoom), colorspace=pymupdf.csGRAY
+                )
+                pixels = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(
+                    pixmap.height, pixmap.width
+                )
+                rasters[index] = pixels.astype(np.float32)
+        return rasters
+
+    @classmethod
+    def block_means(cls, pixels, rows: int, cols: int):
+        """
+        reduce the given raster to rows x cols block means
+        """
+        import numpy as np
+
+        height, width = pixels.shape
+        row_starts = np.linspace(0, height, rows + 1).astype(np.int64)[:-1]
+        col_starts = np.linspace(0, width, cols + 1).astype(np.int64)[:-1]
+        sums = np.add.reduceat(
+            np.add.reduceat(pixels, row_starts, axis=0), col_starts, axis=1
+        )
+        counts = np.outer(
+            np.diff(np.append(row_starts, height)),
+            np.diff(np.append(col_starts, width)),
+        )
+        means = sums / counts
+        return means
+
+    def difference_hash(self, pixels) -> int:
+        """
+        get the difference hash of the given gray raster - two bits per
+        block telling whether it is clearly brighter or darker than its left
+        neighbour so that noise in plain areas does not change the hash
+
+        Args:
+            pixels (numpy.ndarray): the gray raster
+
+        Returns:
+            int: the hash with bit_count(hash_size) bits
+        """
+        import numpy as np
+
+        size = self.hash_size
+        # independent of the brightness and contrast of the scan
+        pixels = (pixels - pixels.mean()) / max(float(pixels.std()), 1e-6)
+        means = self.block_means(pixels, size, size + 1)
+        differences = means[:, 1:] - means[:, :-1]
+        bits = np.concatenate(
+            [
+                (differences > self.contrast).ravel(),
+                (differences < -self.contrast).ravel(),
+            ]
+        )
+        page_hash = int.from_bytes(np.packbits(bits).tobytes(), "big")
+        return page_hash
+
+    def find_near_duplicates(
+        self, hashes: Dict[int, int]
+    ) -> List[Tuple[int, int, int]]:
+        """
+        find the pairs of hashes within my maximum hamming distance
+
+        the bits are split into max_distance + 1 bands - near duplicates
+        agree in at least one band so only hashes sharing a band bucket are compared
+
+        Args:
+            hashes (dict): the hashes by page index
+
+        Returns:
+            list: (first index, second index, distance) tuples sorted by index
+        """
+        bit_count = self.bit_count(self.hash_size)
+        band_count = min(self.max_distance + 1, bit_count)
+        bounds = [bit_count * band // band_count for band in range(band_count + 1)]
+        buckets: Dict[tuple, List[int]] = {}
+        for index, page_hash in hashes.items():
+            for band in range(band_count):
+                width = bounds[band + 1] - bounds[band]
+                key = (band, (page_hash >> bounds[band]) & ((1 << width) - 1))
+                buckets.setdefault(key, []).append(index)
+        pairs = {}
+        for indices in buckets.values():
+            for i, first in enumerate(indices):
+                for second in indices[i + 1 :]:
+                    if (first, second) in pairs:
+                        continue
+                    distance = bin(hashes[first] ^ hashes[second]).count("1")
+                    if distance <= self.max_distance:
+                        pairs[(first, second)] = distance
+        near_duplicates = sorted(
+            (first, second, distance) for (first, second), distance in pairs.items()
+        )
+        return near_duplicates
+
+    def get_pixels(self, path: str, reader: PdfReader) -> Dict[int, object]:
+        """
+        get the gray rasters of the double pages of the given pdf file
+        - scans are downsampled directly, other pages are rendered if possible
+        """
+        rasters = {}
+        rendered = None
+        for index, page in enumerate(reader.pages):
+            image_page = ImagePage.detect(page)
+            pixels = None
+            if image_page is not None:
+                try:
+                    pixels = self.get_scan_pixels(image_page)
+                except Exception:
+                    # e.g. not axis aligned or an image pypdf can not decode
+                    pixels = None
+            if pixels is None:
+                if rendered is None:
+                    rendered = self.get_rendered_pixels(path)
+                pixels = rendered.get(index)
+            if pixels is not None:
+                rasters[index] = pixels
+        return rasters
+
+    @classmethod
+    def describe(cls, index: int, total_pages: int, from_binder: bool) -> str:
+        """
+        describe the scanned side with the given index by its expected page numbers
+        """
+        from nicepdf.pdftool import DoublePage
+
+        left_num, right_num = DoublePage.calculate_booklet_page_numbers(
+            index, total_pages, from_binder
+        )
+        text = f"double page {index} (pages {left_num}-{right_num})"
+        return text
+
+    def check(self, path: str, from_binder: bool = False) -> SheetReport:
+        """
+        check the scanned booklet at the given path
+
+        Args:
+            path (str): the path of the booklet pdf
+            from_binder (bool): Indicates whether the booklet was scanned from a binder.
+
+        Returns:
+            SheetReport: the hashes and the issues found - not available if numpy is missing
+        """
+        reader = PdfReader(path)
+        side_count = len(reader.pages)
+        report = SheetReport(side_count=side_count)
+        if not self.is_available():
+            report.available = False
+            return report
+        for index, pixels in self.get_pixels(path, reader).items():
+            if pixels.std() < self.blank_threshold:
+                report.blank.append(index)
+            else:
+                report.hashes[index] = self.difference_hash(pixels)
+        total_pages = side_count * 2
+        duplicates = set()
+        for first, second, distance in self.find_near_duplicates(report.hashes):
+            duplicates.add(second)
+            message = (
+                f"{self.describe(second, total_pages, from_binder)} looks like a duplicate of "
+                f"{self.describe(first, total_pages, from_binder)} - distance {distance}"
+            )
+            report.issues.append(
+                SheetIssue("duplicate", (first, second), message, distance)
+            )
+        if side_count % 2 == 1:
+            # each sheet has a front and a back side
+            message = (
+                f"{side_count} scanned sides - a sheet has two sides so a side "
+                "is missing or has been scanned twice and the page numbers after it are wrong"
+            )
+            if duplicates and (side_count - len(duplicates)) % 2 == 0:
+                message += f" - without the duplicates there are {side_count - len(duplicates)} sides"
+            report.issues.insert(0, SheetIssue("count", (), message))
+        return report
@@ -0,0 +1,322 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import html
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pypdf import PdfReader
+
+from nicepdf.pdf_index import PdfIndex
+from nicepdf.pdf_probe import PdfProbe
+
+
+@dataclass
+class SearchHit:
+    """
+    a page that matches a search
+    """
+
+    path: str
+    file_hash: str
+    page_num: int  # counting from 1
+    label: str  # the logical page number e.g. from the page labels
+    snippet: str  # the matches are marked by SearchHit.start and SearchHit.end
+    rank: float  # bm25 - lower is better
+
+    start = "\x02"
+    end = "\x03"
+
+    def as_html(self) -> str:
+        """
+        get my snippet as html with the matches in bold
+        """
+        text = html.escape(self.snippet)
+        text = text.replace(self.start, "<b>").replace(self.end, "</b>")
+        markup = f"<b>{self.label}</b>: {text}"
+        return markup
+
+    def __str__(self):
+        snippet = self.snippet.replace(self.start, "[").replace(self.end, "]")
+        text = f"{os.path.basename(self.path)} p. {self.label}: {snippet}"
+        return text
+
+
+class TextIndex:
+    """
+    SQLite FTS5 full-text index of the pages of processed documents keyed by
+    file hash and page number - the text is extracted in a process pool
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS text_document (
+        doc_id INTEGER PRIMARY KEY,
+        file_hash TEXT UNIQUE NOT NULL,
+        page_count INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS text_path (
+        path TEXT PRIMARY KEY,
+        file_hash TEXT NOT NULL,
+        mtime REAL NOT NULL,
+        size INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS text_path_hash ON text_path (file_hash);
+    CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5(
+        text, label UNINDEXED, tokenize='unicode61 remove_diacritics 2'
+    );
+    """
+
+    # the rowid of a page is doc_id << page_bits | page_num so that the
+    # pages of a document are a rowid range
+    page_bits = 20
+
+    def __init__(
+        self, db_path: str = None, max_workers: int = None, chunk_pages: int = 50
+    ):
+        """
+        constructor
+
+        Args:
+            db_path (str): the path of the SQLite database - default: ~/.nicepdf/text.db
+            max_workers (int): the number of processes for the text extraction
+            chunk_pages (int): the number of pages extracted by a process at a time
+        """
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".nicepdf", "text.db")
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.chunk_pages = chunk_pages
+        self.lock = threading.Lock()
+        with self.connect() as connection:
+            connection.executescript(self.schema)
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        connect to my database - the transaction is committed and the
+        connection is closed afterwards
+        """
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as connection:
+            with connection:
+                yield connection
+
+    @classmethod
+    def extract_texts(cls, path: str, first: int, count: int) -> List[Tuple[str, str]]:
+        """
+        extract the text of the given pages - runs in a worker process
+
+        Args:
+            path (str): the path of the pdf file
+            first (int): the index of the first page
+            count (int): the number of pages
+
+        Returns:
+            list: the (label, text) of each page
+        """
+        reader = PdfReader(path)
+        labels = reader.page_labels
+        pages = []
+        for index in range(first, first + count):
+            text = cls.extract_visible_text(reader.pages[index])
+            pages.append((labels[index], text))
+        return pages
+
+    @classmethod
+    def extract_visible_text(cls, page, tolerance: float = 1.0) -> str:
+        """
+        extract the text of the given page that starts within its crop box
+        - a half page of an un-booklet still contains the whole double page
+        and only shows its own half
+
+        Args:
+            page (PageObject): the page
+            tolerance (float): the tolerance of the crop box in points
+
+        Returns:
+            str: the visible text
+        """
+        box = page.cropbox
+        left, bottom = box.left - tolerance, box.bottom - tolerance
+        right, top = box.right + tolerance, box.top + tolerance
+        parts = []
+
+        def visitor(text, cm, tm, _font_dict, _font_size):
+            x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+            y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            if left <= x <= right and bottom <= y <= top:
+                parts.append(text)
+
+        page.extract_text(visitor_text=visitor)
+        text = "".join(parts)
+        return text
+
+    def extract(self, path: str, page_count: int) -> List[Tuple[str, str]]:
+        """
+        extract the text of all pages of the given pdf file in chunks
+
+        Returns:
+            list: the (label, text) of each page
+        """
+        size = self.chunk_pages
+        firsts = list(range(0, page_count, size))
+        counts = [min(size, page_count - first) for first in firsts]
+        paths = [path] * len(firsts)
+        if len(firsts) > 1 and self.max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                chunks = list(executor.map(self.extract_texts, paths, firsts, counts))
+        else:
+            chunks = list(map(self.extract_texts, paths, firsts, counts))
+        pages = [page for chunk in chunks for page in chunk]
+        return pages
+
+    def get_doc_id(self, connection: sqlite3.Connection, file_hash: str) -> int:
+        row = connection.execute(
+            "SELECT doc_id FROM text_document WHERE file_hash=?", (file_hash,)
+        ).fetchone()
+        doc_id = row[0] if row else None
+        return doc_id
+
+    def lookup(self, path: str) -> Optional[str]:
+        """
+        get the file hash of the given path if it is indexed with its current mtime and size
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT file_hash, mtime, size FROM text_path WHERE path=?", (path,)
+            ).fetchone()
+        file_hash = None
+        if row and row[1] == stat.st_mtime and row[2] == stat.st_size:
+            file_hash = row[0]
+        return file_hash
+
+    def store(self, path: str, file_hash: str, pages: List[Tuple[str, str]] = None):
+        """
+        store the pages of the document with the given hash and register the path
+
+        Args:
+            path (str): the path of the pdf file
+            file_hash (str): the hash of its content
+            pages (list): the (label, text) of each page - None if already indexed
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self.lock, self.connect() as connection:
+            if pages is not None and self.get_doc_id(connection, file_hash) is None:
+                cursor = connection.execute(
+                    "INSERT INTO text_document (file_hash, page_count) VALUES (?,?)",
+                    (file_hash, len(pages)),
+                )
+                base = cursor.lastrowid << self.page_bits
+                connection.executemany(
+                    "INSERT INTO page_text (rowid, text, label) VALUES (?,?,?)",
+                    [
+                        (base | page_num, text, label)
+                        for page_num, (label, text) in enumerate(pages, start=1)
+                    ],
+                )
+            connection.execute(
+                "INSERT OR REPLACE INTO text_path (path, file_hash, mtime, size) VALUES (?,?,?,?)",
+                (path, file_hash, stat.st_mtime, stat.st_size),
+            )
+
+    def index_document(self, path: str) -> str:
+        """
+        index the text of the pages of the given pdf file - files that are
+        known by path or content are not extracted again
+
+        Args:
+            path (str): the path of the pdf file e.g. the result of an un-booklet
+
+        Returns:
+            str: the file hash of the document
+        """
+        file_hash = self.lookup(path)
+        if file_hash is None:
+            file_hash = PdfIndex.file_hash(path)
+            with self.connect() as connection:
+                known = self.get_doc_id(connection, file_hash) is not None
+            pages = None
+            if not known:
+                page_count = PdfProbe.page_count(PdfReader(path))
+                pages = self.extract(path, page_count)
+            self.store(path, file_hash, pages)
+        return file_hash
+
+    @classmethod
+    def to_match(cls, query: str) -> str:
+        """
+        get an FTS5 match expression for the words of the given query
+        - all words have to match and the last word may be a prefix
+        """
+        words = re.findall(r"\w+", query)
+        terms = [f'"{word}"' for word in words]
+        if terms:
+            terms[-1] += "*"
+        match = " ".join(terms)
+        return match
+
+    def search(self, query: str, path: str = None, limit: int = 50) -> List[SearchHit]:
+        """
+        search the pages of the indexed documents
+
+        Args:
+            query (str): the words to search for
+            path (str): if set only search the pages of the document at this path
+            limit (int): the maximum number of hits
+
+        Returns:
+            List[SearchHit]: the hits - the best first
+        """
+        match = self.to_match(query)
+        if not match:
+            return []
+        hits = []
+        with self.connect() as connection:
+            sql = (
+                "SELECT rowid, label, snippet(page_text, 0, ?, ?, '…', 12), rank "
+                "FROM page_text WHERE page_text MATCH ?"
+            )
+            params = [SearchHit.start, SearchHit.end, match]
+            if path is not None:
+                file_hash = self.lookup(path) if os.path.exists(path) else None
+                doc_id = file_hash and self.get_doc_id(connection, file_hash)
+                if not doc_id:
+                    return []
+                sql += " AND rowid BETWEEN ? AND ?"
+                params += [doc_id << self.page_bits, (doc_id + 1) << self.page_bits]
+            sql += " ORDER BY rank LIMIT ?"
+            params.append(limit)
+            rows = connection.execute(sql, params).fetchall()
+            documents: Dict[int, Tuple[str, str]] = {}
+            for rowid, label, snippet, rank in rows:
+                doc_id = rowid >> self.page_bits
+                if doc_id not in documents:
+                    documents[doc_id] = connection.execute(
+                        "SELECT d.file_hash, p.path FROM text_document d "
+                        "LEFT JOIN text_path p ON p.file_hash=d.file_hash "
+                        "WHERE d.doc_id=? LIMIT 1",
+                        (doc_id,),
+                    ).fetchone()
+                file_hash, doc_path = documents[doc_id]
+                hit = SearchHit(
+                    path=path or doc_path,
+                    file_hash=file_hash,
+                    page_num=rowid & ((1 << self.page_bits) - 1),
+                    label=label,
+                    snippet=snippet,
+                    rank=rank,
+                )
+                hits.append(hit)
+        return hits
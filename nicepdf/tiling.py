@@ -0,0 +1,476 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Dict, List, Tuple
+
+from pypdf import PageObject, PdfReader, PdfWriter, Transformation
+from pypdf.generic import (
+    ArrayObject,
+    ContentStream,
+    DecodedStreamObject,
+    DictionaryObject,
+    FloatObject,
+    NameObject,
+    RectangleObject,
+)
+from reportlab.lib import pagesizes
+from reportlab.lib.units import cm, inch, mm
+
+from nicepdf.resources import ResourceRegistry
+
+
+class PaperFormat:
+    """
+    named and custom paper formats
+    """
+
+    # the formats offered for selection
+    names = ["A0", "A1", "A2", "A3", "A4", "A5", "Letter", "Legal", "Tabloid"]
+
+    units = {"pt": 1, "mm": mm, "cm": cm, "in": inch}
+
+    @classmethod
+    def get_pagesizes(cls) -> Dict[str, Tuple[float, float]]:
+        """
+        get the portrait sizes of my named formats in points
+        """
+        page_sizes = {name: cls.get_size(name) for name in cls.names}
+        return page_sizes
+
+    @classmethod
+    def get_size(cls, paper_format: str) -> Tuple[float, float]:
+        """
+        get the size of the given paper format in points (1 point = 1/72 inch)
+
+        Args:
+            paper_format (str): a name like A4, B5 or Letter or a custom
+                size like 600x900mm, 24x36in or 595x842 (points)
+
+        Returns:
+            Tuple[float, float]: width and height
+
+        Raises:
+            ValueError: if the format is unknown
+        """
+        name = paper_format.strip().upper().replace(" ", "_")
+        size = getattr(pagesizes, name, None)
+        if isinstance(size, tuple):
+            return size
+        match = re.fullmatch(
+            r"\s*([\d.]+)\s*[x×]\s*([\d.]+)\s*(pt|mm|cm|in)?\s*",
+            paper_format,
+            re.IGNORECASE,
+        )
+        if match is None:
+            raise ValueError(
+                f"Unsupported paper format {paper_format} - use a name like A4 or Letter or a size like 600x900mm"
+            )
+        width, height, unit = match.groups()
+        factor = cls.units[(unit or "pt").lower()]
+        size = (float(width) * factor, float(height) * factor)
+        return size
+
+
+@dataclass
+class Tile:
+    """
+    a single sheet of a tiled poster
+    """
+
+    row: int  # counting from the top
+    col: int  # counting from the left
+    # the transformation from the page content to the sheet
+    matrix: Transformation
+    # the cut box x0, y0, x1, y1 on the sheet
+    cut_box: Tuple[float, float, float, float]
+
+
+@dataclass
+class TileGrid:
+    """
+    the grid of sheets needed to print a page of a given geometry
+    scaled to a poster size
+
+    the grid only depends on the geometry and is computed once
+    for all pages of the same size and rotation
+    """
+
+    mediabox: Tuple[float, float, float, float]
+    rotation: int
+    poster_width: float
+    poster_height: float
+    sheet_width: float
+    sheet_height: float
+    overlap: float = 0  # glue margin shared by neighbouring tiles
+    margin: float = 0  # unprintable border of each sheet
+    rows: int = 0
+    cols: int = 0
+    tiles: List[Tile] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.tile()
+
+    @classmethod
+    def count(
+        cls,
+        length: float,
+        tile_length: float,
+        overlap: float,
+        tolerance: float = 2 * mm,
+    ) -> int:
+        """
+        get the number of tiles of the given length with the given overlap
+        needed to cover the given length
+
+        slivers below the tolerance are dropped e.g. A0 is 841 x 1189 mm
+        but four by four A4 sheets cover 840 x 1188 mm
+        """
+        step = tile_length - overlap
+        if step <= 0:
+            raise ValueError(
+                f"overlap {overlap:.1f}pt must be smaller than the printable tile size {tile_length:.1f}pt"
+            )
+        tiles = max(1, math.ceil((length - overlap - tolerance) / step))
+        return tiles
+
+    @classmethod
+    def get_upright(
+        cls, mediabox: Tuple[float, float, float, float], rotation: int
+    ) -> Transformation:
+        """
+        get the transformation that moves the content of a page with the given
+        mediabox and rotation to an upright page with its lower left corner at the origin
+        """
+        x0, y0, x1, y1 = mediabox
+        trsf = (
+            Transformation().translate(-(x0 + x1) / 2, -(y0 + y1) / 2).rotate(-rotation)
+        )
+        width, height = cls.get_page_size(mediabox, rotation)
+        trsf = trsf.translate(width / 2, height / 2)
+        return trsf
+
+    @classmethod
+    def get_page_size(
+        cls, mediabox: Tuple[float, float, float, float], rotation: int
+    ) -> Tuple[float, float]:
+        """
+        get the size of a page with the given mediabox and rotation as shown
+        """
+        x0, y0, x1, y1 = mediabox
+        width, height = abs(x1 - x0), abs(y1 - y0)
+        if rotation % 180 == 90:
+            width, height = height, width
+        return width, height
+
+    def tile(self):
+        """
+        compute my tiles
+        """
+        width, height = self.get_page_size(self.mediabox, self.rotation)
+        # orient the poster like the page
+        poster_width, poster_height = sorted((self.poster_width, self.poster_height))
+        if width > height:
+            poster_width, poster_height = poster_height, poster_width
+        scale = min(poster_width / width, poster_height / height)
+        scaled_width = width * scale
+        scaled_height = height * scale
+        tile_width = self.sheet_width - 2 * self.margin
+        tile_height = self.sheet_height - 2 * self.margin
+        self.cols = self.count(scaled_width, tile_width, self.overlap)
+        self.rows = self.count(scaled_height, tile_height, self.overlap)
+        step_x = tile_width - self.overlap
+        step_y = tile_height - self.overlap
+        # center the poster on the grid
+        offset_x = (self.cols * step_x + self.overlap - scaled_width) / 2
+        offset_y = (self.rows * step_y + self.overlap - scaled_height) / 2
+        scaled = self.get_upright(self.mediabox, self.rotation).scale(scale, scale)
+        self.tiles = []
+        for row in range(self.rows):
+            for col in range(self.cols):
+                x = col * step_x - offset_x
+                y = scaled_height + offset_y - row * step_y - tile_height
+                matrix = scaled.translate(self.margin - x, self.margin - y)
+                # the overlap at the left and top is glued under the neighbour
+                cut_box = (
+                    self.margin + (self.overlap if col > 0 else 0),
+                    self.margin,
+                    self.margin + tile_width,
+                    self.margin + tile_height - (self.overlap if row > 0 else 0),
+                )
+                self.tiles.append(Tile(row, col, matrix, cut_box))
+
+
+class Tiler:
+    """
+    places pages on sheets - as tiles of a poster or n-up
+    by reusing each page as a form XObject
+    """
+
+    def __init__(
+        self,
+        sheet_format: str = "A4",
+        overlap: float = 0,
+        margin: float = 0,
+        crop_marks: bool = False,
+        mark_length: float = 5 * mm,
+    ):
+        """
+        constructor
+
+        Args:
+            sheet_format (str): the paper format of the sheets to print on
+            overlap (float): the glue margin shared by neighbouring tiles in points
+            margin (float): the unprintable border of each sheet in points
+            crop_marks (bool): if True draw marks where the tiles are to be cut
+            mark_length (float): the length of the crop marks in points
+        """
+        self.sheet_width, self.sheet_height = PaperFormat.get_size(sheet_format)
+        self.overlap = overlap
+        self.margin = margin
+        self.crop_marks = crop_marks
+        self.mark_length = mark_length
+        # tile grids by page geometry
+        self.grids: Dict[tuple, TileGrid] = {}
+
+    def get_grid(
+        self, page: PageObject, poster_width: float, poster_height: float
+    ) -> TileGrid:
+        """
+        get the tile grid for the given page - sheets are oriented
+        to need as few tiles as possible
+
+        Args:
+            page (PageObject): the page to tile
+            poster_width (float): the width of the poster
+            poster_height (float): the height of the poster
+
+        Returns:
+            TileGrid: the (cached) grid for the geometry of the page
+        """
+        mediabox = tuple(float(v) for v in page.mediabox)
+        rotation = page.get("/Rotate", 0) % 360
+        key = (mediabox, rotation, poster_width, poster_height)
+        grid = self.grids.get(key)
+        if grid is None:
+            for sheet_width, sheet_height in [
+                (self.sheet_width, self.sheet_height),
+                (self.sheet_height, self.sheet_width),
+            ]:
+                candidate = TileGrid(
+                    mediabox=mediabox,
+                    rotation=rotation,
+                    poster_width=poster_width,
+                    poster_height=poster_height,
+                    sheet_width=sheet_width,
+                    sheet_height=sheet_height,
+                    overlap=self.overlap,
+                    margin=self.margin,
+                )
+                if grid is None or len(candidate.tiles) < len(grid.tiles):
+                    grid = candidate
+            self.grids[key] = grid
+        return grid
+
+    @classmethod
+    def as_form(cls, page: PageObject, writer: PdfWriter):
+        """
+        add the given page as a form XObject to the given writer
+
+        Returns:
+            IndirectObject: the reference to the form
+        """
+        form = DecodedStreamObject()
+        contents = page.get_contents()
+        form.set_data(contents.get_data() if contents is not None else b"")
+        form[NameObject("/Type")] = NameObject("/XObject")
+        form[NameObject("/Subtype")] = NameObject("/Form")
+        form[NameObject("/BBox")] = RectangleObject(page.mediabox)
+        resources = page.get("/Resources")
+        if resources is not None:
+            # pages of the same document often share fonts and images
+            registry = ResourceRegistry.of(writer)
+            form[NameObject("/Resources")] = registry.intern_resources(resources)
+        form = form.flate_encode().clone(writer)
+        form_ref = writer._add_object(form)
+        return form_ref
+
+    @classmethod
+    def create_sheet(
+        cls,
+        width: float,
+        height: float,
+        placements: List[Tuple[str, object, Transformation]],
+        clip: Tuple[float, float, float, float] = None,
+        marks: List[Tuple[float, float, float, float]] = None,
+    ) -> PageObject:
+        """
+        create a sheet of the given size showing the given forms
+
+        Args:
+            width (float): the width of the sheet
+            height (float): the height of the sheet
+            placements (list): resource name, form and transformation of each form
+            clip (tuple): the optional clipping rectangle x, y, width, height
+            marks (list): lines x0, y0, x1, y1 to draw on top
+        """
+        sheet = PageObject.create_blank_page(pdf=None, width=width, height=height)
+        floats = lambda values: [FloatObject(value) for value in values]
+        operations = []
+        xobjects = DictionaryObject()
+        for name, form, matrix in placements:
+            operations.append(([], b"q"))
+            if clip is not None:
+                operations += [
+                    (floats(clip), b"re"),
+                    ([], b"W"),
+                    ([], b"n"),
+                ]
+            operations += [
+                (floats(matrix.ctm), b"cm"),
+                ([NameObject(name)], b"Do"),
+                ([], b"Q"),
+            ]
+            xobjects[NameObject(name)] = form
+        if marks:
+            operations += [([], b"q"), (floats([0.25]), b"w"), (floats([0]), b"G")]
+            for x0, y0, x1, y1 in marks:
+                operations += [(floats([x0, y0]), b"m"), (floats([x1, y1]), b"l")]
+            operations += [([], b"S"), ([], b"Q")]
+        content = ContentStream(None, None)
+        content.operations = operations
+        sheet[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/XObject"): xobjects,
+                NameObject("/ProcSet"): ArrayObject([NameObject("/PDF")]),
+            }
+        )
+        sheet[NameObject("/Contents")] = content
+        return sheet
+
+    def get_marks(self, cut_box: Tuple[float, float, float, float]) -> List[tuple]:
+        """
+        get the crop marks pointing outwards from the corners of the given cut box
+        """
+        x0, y0, x1, y1 = cut_box
+        length = self.mark_length
+        marks = []
+        for x, dx in [(x0, -length), (x1, length)]:
+            for y, dy in [(y0, -length), (y1, length)]:
+                marks.append((x, y, x + dx, y))
+                marks.append((x, y, x, y + dy))
+        return marks
+
+    def poster_sheets(
+        self, page: PageObject, writer: PdfWriter, grid: TileGrid
+    ) -> List[PageObject]:
+        """
+        get the sheets showing the tiles of the given page
+
+        Args:
+            page (PageObject): the page to tile
+            writer (PdfWriter): the writer the sheets are to be added to
+            grid (TileGrid): the grid see get_grid
+
+        Returns:
+            List[PageObject]: the sheets row by row from the top left
+        """
+        form = self.as_form(page, writer)
+        tile_width = grid.sheet_width - 2 * grid.margin
+        tile_height = grid.sheet_height - 2 * grid.margin
+        clip = (grid.margin, grid.margin, tile_width, tile_height)
+        sheets = []
+        for tile in grid.tiles:
+            marks = self.get_marks(tile.cut_box) if self.crop_marks else None
+            sheet = self.create_sheet(
+                grid.sheet_width,
+                grid.sheet_height,
+                [("/Page", form, tile.matrix)],
+                clip=clip,
+                marks=marks,
+            )
+            sheets.append(sheet)
+        return sheets
+
+    def poster_shard(
+        self,
+        input_path: str,
+        page_indices: List[int],
+        poster_width: float,
+        poster_height: float,
+    ) -> bytes:
+        """
+        tile the given pages of the given file on sheets - runs in a worker process
+
+        Args:
+            input_path (str): the path of the pdf file to read
+            page_indices (list): the indices of the pages to tile
+            poster_width (float): the width of the poster
+            poster_height (float): the height of the poster
+
+        Returns:
+            bytes: a pdf with the sheets of the pages in the given order
+        """
+        reader = PdfReader(input_path)
+        writer = PdfWriter()
+        for index in page_indices:
+            page = reader.pages[index]
+            grid = self.get_grid(page, poster_width, poster_height)
+            for sheet in self.poster_sheets(page, writer, grid):
+                writer.add_page(sheet)
+        buffer = BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    def n_up(
+        self, pages: List[PageObject], writer: PdfWriter, rows: int, cols: int
+    ) -> List[PageObject]:
+        """
+        get sheets showing rows x cols of the given pages each
+
+        Args:
+            pages (list): the pages to place
+            writer (PdfWriter): the writer the sheets are to be added to
+            rows (int): the number of rows per sheet
+            cols (int): the number of columns per sheet
+
+        Returns:
+            List[PageObject]: the sheets
+        """
+        # orient the sheet like the grid of cells
+        sheet_width, sheet_height = sorted((self.sheet_width, self.sheet_height))
+        if cols > rows:
+            sheet_width, sheet_height = sheet_height, sheet_width
+        cell_width = (sheet_width - 2 * self.margin) / cols
+        cell_height = (sheet_height - 2 * self.margin) / rows
+        per_sheet = rows * cols
+        sheets = []
+        for start in range(0, len(pages), per_sheet):
+            placements = []
+            for i, page in enumerate(pages[start : start + per_sheet]):
+                mediabox = tuple(float(v) for v in page.mediabox)
+                rotation = page.get("/Rotate", 0) % 360
+                width, height = TileGrid.get_page_size(mediabox, rotation)
+                scale = min(cell_width / width, cell_height / height)
+                row, col = divmod(i, cols)
+                x = self.margin + col * cell_width + (cell_width - width * scale) / 2
+                y = (
+                    sheet_height
+                    - self.margin
+                    - (row + 1) * cell_height
+                    + (cell_height - height * scale) / 2
+                )
+                matrix = (
+                    TileGrid.get_upright(mediabox, rotation)
+                    .scale(scale, scale)
+                    .translate(x, y)
+                )
+                placements.append((f"/Page{i}", self.as_form(page, writer), matrix))
+            sheets.append(self.create_sheet(sheet_width, sheet_height, placements))
+        return sheets
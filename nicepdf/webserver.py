@@ -4,15 +4,27 @@ Created on 2023-09-09
 @author: wf
 """
 
+import asyncio
 import os
+import time
 
+from fastapi import HTTPException, Request
 from ngwidgets.file_selector import FileSelector
 from ngwidgets.input_webserver import InputWebserver, InputWebSolution
 from ngwidgets.progress import NiceguiProgressbar
 from ngwidgets.webserver import WebserverConfig
 from nicegui import Client, app, run, ui
 
+from nicepdf.checkpoint import Checkpoint
+from nicepdf.document_cache import CachedDocument, DocumentCache
+from nicepdf.file_indexer import FileIndexer
+from nicepdf.job_queue import Job, JobQueue, JobQueueApi
+from nicepdf.pdf_index import PdfIndex
 from nicepdf.pdftool import PDFTool
+from nicepdf.pipeline import Pipeline
+from nicepdf.progress import JobProgress, ProgressbarConsumer, ProgressBus
+from nicepdf.sheet_check import SheetChecker
+from nicepdf.text_index import TextIndex
 from nicepdf.version import Version
 
 
@@ -38,6 +50,16 @@ class NicePdfWebServer(InputWebserver):
     def __init__(self):
         """Constructs all the necessary attributes for the WebServer object."""
         InputWebserver.__init__(self, config=NicePdfWebServer.get_config())
+        # shared index of the structure of known pdf files
+        self.pdf_index = PdfIndex()
+        # background indexer of the files below the root path
+        self.file_indexer = None
+        # the queue of the conversion workers - None: convert in this server
+        self.job_queue = None
+        # full-text index of the un-booklet results
+        self.text_index = TextIndex()
+        # the parsed input files shared by all sessions
+        self.document_cache = DocumentCache()
 
     @classmethod
     def examples_path(cls) -> str:
@@ -50,6 +72,61 @@ class NicePdfWebServer(InputWebserver):
         super(NicePdfWebServer, self).configure_run()
         self.from_binder = self.args.from_binder
         self.allowed_urls = [self.examples_path(), self.root_path]
+        self.file_indexer = FileIndexer(
+            self.root_path, self.pdf_index, filter_func=self.is_input
+        )
+        os.makedirs(self.file_indexer.thumbnail_dir, exist_ok=True)
+        app.add_static_files("/thumbnails", self.file_indexer.thumbnail_dir)
+        self.file_indexer.start()
+        self.add_cache_api()
+        if getattr(self.args, "queue", None):
+            token = getattr(self.args, "queue_token", None)
+            # the token is also needed to use the queue of another server
+            self.job_queue = JobQueue.of(self.args.queue, token=token)
+            if token:
+                self.add_job_api(token)
+            else:
+                print(
+                    "the job api is disabled - set --queue_token to let remote workers in"
+                )
+
+    def add_job_api(self, token: str):
+        """
+        let workers on other nodes pull the jobs of my queue
+
+        Args:
+            token (str): the shared token the workers have to send
+        """
+        api = JobQueueApi(self.job_queue, token, roots=self.allowed_urls)
+
+        @app.post("/api/jobs/{action}")
+        async def job_api(action: str, request: Request):
+            if action not in JobQueueApi.actions:
+                raise HTTPException(status_code=404, detail=f"unknown action {action}")
+            authorization = request.headers.get("Authorization", "")
+            client_token = authorization.removeprefix("Bearer ").strip()
+            payload = await request.json()
+            try:
+                result = await run.io_bound(api.handle, action, payload, client_token)
+            except PermissionError as ex:
+                raise HTTPException(status_code=403, detail=str(ex))
+            return result
+
+    def add_cache_api(self):
+        """
+        show the hit rate and memory of the document cache
+        """
+
+        @app.get("/api/document_cache")
+        async def document_cache_api():
+            return self.document_cache.stats().as_dict()
+
+    @classmethod
+    def is_input(cls, item_name: str) -> bool:
+        """
+        check whether the given file name is an input and not a result
+        """
+        return not ("-A4" in item_name)
 
 
 class NicePdfSolution(InputWebSolution):
@@ -83,24 +160,124 @@ class NicePdfSolution(InputWebSolution):
         """
         switch to the given page
         """
-        pass
+        if self.output_path and os.path.exists(self.output_path):
+            self.show_pdf(self.pdf_split_view, self.output_path, page_num=page_num)
+
+    async def search(self, _click_args=None):
+        """
+        search the text of my un-booklet result and jump to the best hit
+        """
+        try:
+            self.search_results.clear()
+            query = self.search_input.value
+            if not query or not self.output_path:
+                return
+            if not os.path.exists(self.output_path):
+                return
+            text_index = self.webserver.text_index
+            # e.g. for results of an earlier run of the server
+            await run.io_bound(text_index.index_document, self.output_path)
+            hits = await run.io_bound(text_index.search, query, self.output_path)
+            with self.search_results:
+                if not hits:
+                    ui.label(f"{query} not found")
+                for hit in hits:
+                    ui.html(hit.as_html()).classes("cursor-pointer").on(
+                        "click",
+                        lambda _e, page_num=hit.page_num: self.page_slider.set_value(
+                            page_num
+                        ),
+                    )
+            if hits:
+                self.page_slider.set_value(hits[0].page_num)
+        except Exception as ex:
+            self.handle_exception(ex)
 
     def update_progress(self):
         """
-        update the progress bar 
+        update the progress bar
         """
-        self.progressbar.update(1)
+        self.progress_bus.update(1)
+
+    async def check_sheets(self):
+        """
+        warn about duplicate and missing scanned sides before the conversion
+        """
+        try:
+            if not os.path.exists(self.input_source):
+                return
+            checker = SheetChecker()
+            report = await run.io_bound(
+                checker.check, self.input_source, self.from_binder
+            )
+            if not report.available:
+                ui.notify(str(report), type="info")
+            for issue in report.issues:
+                ui.notify(issue.message, type="warning", multi_line=True)
+        except Exception as ex:
+            self.handle_exception(ex)
+
+    async def acquire_document(self) -> CachedDocument:
+        """
+        get the parsed input from the document cache of the webserver
+
+        Returns:
+            CachedDocument: the shared document or None if the input is not a local file
+        """
+        document = None
+        if self.input_source and os.path.isfile(self.input_source):
+            document = await run.io_bound(
+                self.webserver.document_cache.acquire, self.input_source
+            )
+        return document
+
+    def release_document(self, document: CachedDocument):
+        if document is not None:
+            self.webserver.document_cache.release(document)
 
     async def unbooklet(self):
         """
         convert the booklet pdf to a plain pdf
         """
         if self.input_source:
-            pdftool = PDFTool(self.input_source, self.output_path, debug=self.debug)
-            pdftool.from_binder = self.from_binder
-            self.progressbar.total = pdftool.get_total_steps()
-            self.progressbar.reset()
-            await run.io_bound(pdftool.split_booklet_style, self.progressbar)
+            await self.check_sheets()
+        if self.input_source and self.webserver.job_queue:
+            job = Job(
+                "unbooklet",
+                self.input_source,
+                self.output_path,
+                options={
+                    "from_binder": self.from_binder,
+                    "debug": self.debug,
+                    "linearize": True,
+                },
+            )
+            await self.run_job(job)
+            await run.io_bound(
+                self.webserver.text_index.index_document, self.output_path
+            )
+            await self.render()
+        elif self.input_source:
+            document = await self.acquire_document()
+            try:
+                pdftool = PDFTool(
+                    self.input_source,
+                    self.output_path,
+                    debug=self.debug,
+                    shared_document=document,
+                )
+                pdftool.from_binder = self.from_binder
+                # a restarted server continues where an interrupted job stopped
+                pdftool.checkpoint_interval = Checkpoint.default_interval
+                pdftool.resume = True
+                # let the browser show the first page while the rest is loading
+                pdftool.linearize = True
+                pdftool.text_index = self.webserver.text_index
+                self.progress_bus.total = pdftool.get_total_steps()
+                self.progress_bus.reset()
+                await run.io_bound(pdftool.split_booklet_style, self.progress_bus)
+            finally:
+                self.release_document(document)
             await self.render()
 
     async def poster(self):
@@ -109,23 +286,105 @@ class NicePdfSolution(InputWebSolution):
         """
         try:
             self.poster_path = self.input.replace(".pdf", f"-poster.pdf")
-            pdftool = PDFTool(self.input_source, self.poster_path, debug=self.debug)
-            
-            self.progressbar.total = len(pdftool.input_file.reader.pages)
-            self.progressbar.reset()
+            if self.webserver.job_queue:
+                job = Job(
+                    "poster",
+                    self.input_source,
+                    self.poster_path,
+                    options={
+                        "sheet_format": self.source_format_select.value,
+                        "target_format": self.target_format_select.value,
+                        "debug": self.debug,
+                        "linearize": True,
+                    },
+                )
+                await self.run_job(job)
+            else:
+                document = await self.acquire_document()
+                try:
+                    pdftool = PDFTool(
+                        self.input_source,
+                        self.poster_path,
+                        debug=self.debug,
+                        shared_document=document,
+                    )
+                    pdftool.linearize = True
+                    # the poster sets the total number of tiles
+
+                    await run.io_bound(
+                        pdftool.poster,
+                        self.source_format_select.value,
+                        self.target_format_select.value,
+                        self.progress_bus,
+                    )
+                finally:
+                    self.release_document(document)
 
-            await run.io_bound(pdftool.poster, self.source_format_select.value, self.target_format_select.value, self.progressbar)
-            
             self.show_pdf(self.pdf_split_view, self.poster_path)
         except Exception as ex:
             self.handle_exception(ex)
 
-    def show_pdf(self, view, file_path):
+    async def run_job(self, job: Job, claim_timeout: float = 60.0) -> Job:
+        """
+        submit the given job to the queue of the workers and show
+        its progress until it is finished
+
+        Args:
+            job (Job): the job to run
+            claim_timeout (float): seconds to wait for a worker to claim the job
+
+        Raises:
+            Exception: if the job failed or no worker claimed it in time
+        """
+        queue = self.webserver.job_queue
+        job = await run.io_bound(queue.submit, job)
+        self.progress_bus.reset()
+        self.progress_bus.set_description(f"{job.operation} queued")
+        deadline = time.monotonic() + claim_timeout
+        while not job.is_finished:
+            await asyncio.sleep(0.5)
+            job = await run.io_bound(queue.get, job.job_id)
+            if job.state == "queued" and time.monotonic() > deadline:
+                error = f"no worker claimed the job within {claim_timeout:.0f} s"
+                await run.io_bound(queue.cancel, job.job_id, error)
+                job = await run.io_bound(queue.get, job.job_id)
+            progress = job.progress
+            if progress:
+                self.progress_bus.total = progress["total"]
+                self.progress_bus.set_description(progress["stage"])
+                self.progress_bus.update_value(progress["done"])
+        if job.state == "failed":
+            raise Exception(f"{job.operation} failed: {job.error}")
+        return job
+
+    async def run_pipeline(self):
+        """
+        run the pipeline given by the pipeline input on my pdf
+        """
+        try:
+            if self.input_source:
+                pipeline_path = self.input.replace(".pdf", "-pipeline.pdf")
+                pdftool = PDFTool(self.input_source, pipeline_path, debug=self.debug)
+                pdftool.from_binder = self.from_binder
+                pipeline = Pipeline.from_spec(self.pipeline_input.value, pdftool)
+                await run.io_bound(pipeline.run, self.progress_bus)
+                self.show_pdf(self.pdf_split_view, pipeline_path)
+        except Exception as ex:
+            self.handle_exception(ex)
+
+    def show_pdf(self, view, file_path, page_num: int = None):
         """
         show the given pdf in the given ui.html view
+
+        Args:
+            view: the ui.html view
+            file_path (str): the pdf file
+            page_num (int): the page to open the pdf at - counting from 1
         """
         if os.path.exists(file_path):
             url = app.add_static_file(local_file=file_path)
+            if page_num:
+                url = f"{url}#page={page_num}"
             html = (
                 f'<embed src="{url}" type="application/pdf" width="100%" height="100%">'
             )
@@ -133,6 +392,38 @@ class NicePdfSolution(InputWebSolution):
             html = "-"
         view.content = html
 
+    def decorate_selector(self):
+        """
+        show the page count, kind and thumbnail of the indexed files in the file selector
+        """
+        file_indexer = self.webserver.file_indexer
+        if file_indexer is None or file_indexer.version == self.selector_version:
+            return
+        self.selector_version = file_indexer.version
+
+        def decorate(node: dict):
+            entry = file_indexer.get_entry(node["value"])
+            if entry:
+                node["label"] = f"{os.path.basename(entry.path)} ({entry.summary})"
+                if entry.thumbnail:
+                    node["avatar"] = f"/thumbnails/{entry.thumbnail}"
+            for child in node.get("children", []):
+                decorate(child)
+
+        if self.pdf_selector.tree_structure:
+            decorate(self.pdf_selector.tree_structure)
+            self.pdf_selector.tree.update()
+
+    async def show_structure(self):
+        """
+        show the page structure of my input from the pdf index
+        """
+        if self.input and os.path.isfile(self.input):
+            doc_info = await run.io_bound(self.webserver.pdf_index.get, self.input)
+            self.pdf_desc.content = doc_info.as_html(self.from_binder)
+        else:
+            self.pdf_desc.content = ""
+
     async def render(self, _click_args=None):
         """
         render my pdf file
@@ -145,6 +436,14 @@ class NicePdfSolution(InputWebSolution):
             self.output_path = self.input.replace(".pdf", f"-A4{debug_suffix}.pdf")
 
             self.show_pdf(self.pdf_split_view, self.output_path)
+            if os.path.exists(self.output_path):
+                doc_info = await run.io_bound(
+                    self.webserver.pdf_index.probe, self.output_path
+                )
+                self.page_slider._props["min"] = 1
+                self.page_slider._props["max"] = max(1, doc_info.page_count)
+                self.page_slider.update()
+            await self.show_structure()
 
         except BaseException as ex:
             self.solution.handle_exception(ex)
@@ -158,13 +457,15 @@ class NicePdfSolution(InputWebSolution):
             with ui.splitter() as splitter:
                 with splitter.before:
                     extensions = {"pdf": ".pdf"}
-                    filter_func = lambda item_name: not ("-A4" in item_name)
                     self.pdf_selector = FileSelector(
                         path=self.root_path,
                         extensions=extensions,
                         handler=self.read_and_optionally_render,
-                        filter_func=filter_func,
+                        filter_func=NicePdfWebServer.is_input,
                     )
+                    self.selector_version = None
+                    self.decorate_selector()
+                    ui.timer(1.0, self.decorate_selector)
                     self.input_input = ui.input(
                         value=self.input, on_change=self.input_changed
                     ).props("size=100")
@@ -185,6 +486,14 @@ class NicePdfSolution(InputWebSolution):
                             icon="import_contacts",
                             handler=self.unbooklet,
                         )
+                        self.pipeline_input = ui.input(
+                            "pipeline", value="split scale:A4 simplify optimize"
+                        ).tooltip(", ".join(Pipeline.stage_names()))
+                        self.tool_button(
+                            tooltip="run pipeline",
+                            icon="account_tree",
+                            handler=self.run_pipeline,
+                        )
                         if self.is_local:
                             self.tool_button(
                                 tooltip="open", icon="file_open", handler=self.open_file
@@ -199,7 +508,23 @@ class NicePdfSolution(InputWebSolution):
                 value=50,
                 on_change=lambda e: self.on_page_change(e.value),
             ).props(slider_props)
+            with ui.row():
+                self.search_input = ui.input("search").on("keydown.enter", self.search)
+                self.tool_button(tooltip="search", icon="search", handler=self.search)
+            self.search_results = ui.column()
             self.progressbar = NiceguiProgressbar(100, "work on PDF pages", "steps")
+            # the workers publish to the bus - the progress bar is only
+            # updated a few times per second
+            self.job_progress = JobProgress()
+            self.progress_bus = ProgressBus(
+                100,
+                "work on PDF pages",
+                "steps",
+                consumers=[
+                    ProgressbarConsumer(self.progressbar, show_eta=True),
+                    self.job_progress,
+                ],
+            )
 
             with ui.splitter() as splitter:
                 with splitter.before:
@@ -0,0 +1,29 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+from ngwidgets.basetest import Basetest
+
+from nicepdf.benchmark import Benchmark
+
+
+class TestBenchmark(Basetest):
+    """
+    test the benchmark
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=True)
+
+    def test_unbooklet_memory(self):
+        """
+        test that the compact mode needs less memory per page
+        """
+        double_pages = 20
+        standard = self.benchmark.unbooklet(double_pages, compact=False)
+        compact = self.benchmark.unbooklet(double_pages, compact=True)
+        self.assertEqual(double_pages * 2, compact.pages)
+        self.assertLess(compact.memory_per_page, standard.memory_per_page)
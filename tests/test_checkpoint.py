@@ -0,0 +1,151 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import os
+
+from ngwidgets.basetest import Basetest
+from ngwidgets.progress import TqdmProgressbar
+from pypdf import PdfReader
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.checkpoint import Checkpoint
+from nicepdf.pdftool import PDFTool
+
+
+class TestCheckpoint(Basetest):
+    """
+    test resumable un-bookleting with checkpoints
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+        self.input_path = self.benchmark.get_example_booklet(8)
+
+    def get_tool(self, name: str, interval: int, resume: bool = False) -> PDFTool:
+        output_path = os.path.join(self.benchmark.work_dir, f"checkpoint_{name}.pdf")
+        tool = PDFTool(self.input_path, output_path)
+        tool.checkpoint_interval = interval
+        tool.resume = resume
+        return tool
+
+    def get_texts(self, path: str) -> list:
+        texts = [page.extract_text().strip() for page in PdfReader(path).pages]
+        return texts
+
+    def test_checkpoint(self):
+        """
+        test that checkpointing creates the same pages as the compact un-booklet
+        """
+        tool = self.get_tool("compact", 0)
+        tool.compact = True
+        tool.split_booklet_style()
+        expected = self.get_texts(tool.output_file.filename)
+        tool = self.get_tool("chunked", 5)
+        tool.split_booklet_style()
+        self.assertEqual(expected, self.get_texts(tool.output_file.filename))
+        # the chunks are removed after a successful run
+        self.assertFalse(os.path.exists(f"{tool.output_file.filename}.checkpoint"))
+
+    def test_resume(self):
+        """
+        test resuming an interrupted run
+        """
+        tool = self.get_tool("resume", 5)
+        tool.split_booklet_style()
+        expected = self.get_texts(tool.output_file.filename)
+        # simulate a crash after two chunks
+        tool = self.get_tool("resume", 5)
+        tool.progress_bar = self.get_progress_bar(tool)
+        checkpoint = tool.get_checkpoint()
+        rendered = []
+        original_render = tool.render_half_page
+
+        def crashing_render(ref, analyses, raster_halves=None):
+            if len(rendered) == 12:
+                raise MemoryError("simulated crash")
+            rendered.append(ref)
+            return original_render(ref, analyses, raster_halves)
+
+        tool.render_half_page = crashing_render
+        with self.assertRaises(MemoryError):
+            tool.write_checkpointed(checkpoint)
+        # the lock of a crashed process is gone with it
+        checkpoint.release()
+        with open(checkpoint.manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        self.assertEqual(2, len(manifest["chunks"]))
+        # resume - only the missing pages are rendered
+        tool = self.get_tool("resume", 5, resume=True)
+        rendered = []
+        original_render = tool.render_half_page
+
+        def counting_render(ref, analyses, raster_halves=None):
+            rendered.append(ref)
+            return original_render(ref, analyses, raster_halves)
+
+        tool.render_half_page = counting_render
+        tool.split_booklet_style()
+        self.assertEqual(6, len(rendered))
+        self.assertEqual(expected, self.get_texts(tool.output_file.filename))
+
+    def test_job_id(self):
+        """
+        test that chunks of a different job are not resumed
+        """
+        tool = self.get_tool("job_id", 4, resume=True)
+        checkpoint = Checkpoint(tool.output_file.filename, "other", 16, 4)
+        checkpoint.reset()
+        self.assertTrue(Checkpoint(tool.output_file.filename, "other", 16).load())
+        # the tool starts over and replaces the manifest of the other job
+        checkpoint = tool.get_checkpoint()
+        self.assertEqual(0, checkpoint.done)
+        checkpoint.release()
+        self.assertFalse(Checkpoint(tool.output_file.filename, "other", 16).load())
+
+    def test_options(self):
+        """
+        test that the checkpoints of runs with different options differ
+        """
+        tool = self.get_tool("options", 4)
+        job_ids = set()
+        for simplify, backend in [(False, None), (True, None), (False, "pypdf")]:
+            tool.simplify = simplify
+            tool.backend = backend
+            job_ids.add(tool.get_document_id("unbooklet checkpoint"))
+        self.assertEqual(3, len(job_ids))
+
+    def test_lock(self):
+        """
+        test that jobs with the same output do not share the checkpoint
+        """
+        tool = self.get_tool("lock", 4, resume=True)
+        checkpoint = tool.get_checkpoint()
+        self.assertTrue(checkpoint.locked)
+        # a second session converting the same booklet runs without checkpoint
+        other = self.get_tool("lock", 4, resume=True)
+        self.assertIsNone(other.get_checkpoint())
+        other.split_booklet_style()
+        self.assertTrue(os.path.exists(checkpoint.manifest_path))
+        self.assertTrue(os.path.exists(checkpoint.lock_path))
+        checkpoint.release()
+        self.assertFalse(os.path.exists(checkpoint.lock_path))
+        # the lock of a process that is not running any more is taken over
+        with open(checkpoint.lock_path, "w") as lock_file:
+            lock_file.write("99999999_crashed")
+        checkpoint = other.get_checkpoint()
+        self.assertTrue(checkpoint.locked)
+        checkpoint.release()
+        tool.split_booklet_style()
+        self.assertFalse(os.path.exists(checkpoint.checkpoint_dir))
+        self.assertFalse(os.path.exists(checkpoint.lock_path))
+
+    def get_progress_bar(self, tool: PDFTool):
+        progress_bar = TqdmProgressbar(
+            total=tool.get_total_steps(), desc="resume", unit="step"
+        )
+        return progress_bar
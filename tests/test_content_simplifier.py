@@ -0,0 +1,135 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader
+from pypdf.generic import ContentStream, StreamObject
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.content_simplifier import ContentSimplifier
+from nicepdf.pdftool import PDFTool
+from nicepdf.pipeline import Pipeline
+
+
+class TestContentSimplifier(Basetest):
+    """
+    test flattening generated content streams
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def simplify(self, data: bytes) -> bytes:
+        """
+        simplify the given content stream
+        """
+        stream = StreamObject()
+        stream.set_data(data)
+        content = ContentStream(stream, None)
+        content.operations = ContentSimplifier().simplify_operations(content.operations)
+        simplified = b" ".join(content.get_data().split())
+        return simplified
+
+    def test_multiply(self):
+        """
+        test combining a scale and a translation
+        """
+        scale = (2, 0, 0, 2, 0, 0)
+        translate = (1, 0, 0, 1, 5, 7)
+        # translate in the scaled space
+        self.assertEqual(
+            (2, 0, 0, 2, 10, 14), ContentSimplifier.multiply(scale, translate)
+        )
+        self.assertEqual(
+            (2, 0, 0, 2, 5, 7), ContentSimplifier.multiply(translate, scale)
+        )
+
+    def test_simplify_operations(self):
+        """
+        test the simplification of nested wrappers
+        """
+        cases = [
+            (
+                b"q 1 0 0 1 0 0 cm q 2 0 0 2 0 0 cm q 1 0 0 1 5 5 cm BT ET n 0 0 m 9 9 l S Q Q Q",
+                b"2 0 0 2 10 10 cm 0 0 m 9 9 l S",
+            ),
+            # the restore matters for the following operations
+            (
+                b"q 2 0 0 2 0 0 cm 0 0 m S Q 0 0 m S",
+                b"q 2 0 0 2 0 0 cm 0 0 m S Q 0 0 m S",
+            ),
+            # the clipping path is kept
+            (b"q 0 0 9 9 re W n q Q /Im0 Do Q", b"0 0 9 9 re W n /Im0 Do"),
+            # unbalanced streams keep their save/restore operators
+            (b"q 0 0 m S Q Q", b"q 0 0 m S Q Q"),
+        ]
+        for data, expected in cases:
+            with self.subTest(data=data):
+                self.assertEqual(expected, self.simplify(data))
+
+    def test_unbooklet(self):
+        """
+        test simplifying the half pages of an un-booklet
+        """
+        input_path = self.benchmark.get_example_booklet(6, with_random_rotation=True)
+        paths = {}
+        for simplify in [False, True]:
+            output_path = os.path.join(
+                self.benchmark.work_dir, f"simplify_{simplify}.pdf"
+            )
+            tool = PDFTool(input_path, output_path)
+            tool.simplify = simplify
+            tool.split_booklet_style()
+            paths[simplify] = output_path
+        stats = tool.simplifier.stats
+        if self.debug:
+            print(stats)
+        self.assertEqual(12, stats.pages)
+        self.assertGreater(stats.reduction, 0.3)
+        standard = PdfReader(paths[False])
+        simplified = PdfReader(paths[True])
+        self.assertEqual(
+            stats.operators_after, ContentSimplifier.count_operators(simplified.pages)
+        )
+        for page, simplified_page in zip(standard.pages, simplified.pages):
+            self.assertEqual(page.extract_text(), simplified_page.extract_text())
+        try:
+            import pymupdf
+        except ImportError:
+            self.skipTest("pymupdf is not installed - rendering not compared")
+        document = pymupdf.open(paths[False])
+        simplified_document = pymupdf.open(paths[True])
+        for page, simplified_page in zip(document, simplified_document):
+            self.assertEqual(
+                page.get_pixmap(dpi=36).samples,
+                simplified_page.get_pixmap(dpi=36).samples,
+            )
+
+    def test_pipeline(self):
+        """
+        test the simplify stage of a pipeline
+        """
+        input_path = self.benchmark.get_example_booklet(2)
+        output_path = os.path.join(self.benchmark.work_dir, "simplify_pipeline.pdf")
+        tool = PDFTool(input_path, output_path)
+        pipeline = Pipeline.from_spec("split simplify", tool)
+        pipeline.run()
+        reader = PdfReader(output_path)
+        self.assertEqual(4, len(reader.pages))
+        simplifier = pipeline.stages[1].simplifier
+        self.assertEqual(4, simplifier.stats.pages)
+        # the input pages are not changed by simplifying them
+        source = PdfReader(input_path)
+        page = source.pages[0]
+        before = page.get_contents().get_data()
+        ContentSimplifier().simplify_page(page)
+        self.assertEqual(
+            before, PdfReader(input_path).pages[0].get_contents().get_data()
+        )
+        self.assertEqual(before, page.get_contents().get_data())
@@ -0,0 +1,96 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import glob
+import json
+import os
+import tempfile
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.debug_collector import DebugCollector
+from nicepdf.pdftool import DoublePage, PdfFile, PDFTool
+
+
+class TestDebugCollector(Basetest):
+    """
+    test the consolidated debug pages and trace
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def test_unbooklet(self):
+        """
+        test collecting the debug pages of an un-booklet
+        """
+        input_path = self.benchmark.get_example_booklet(
+            4, with_random_rotation=True, as_scan=True, seed=7
+        )
+        output_path = os.path.join(self.benchmark.work_dir, "debug_collector.pdf")
+        tool = PDFTool(input_path, output_path, debug=True)
+        tool.split_booklet_style()
+        collector = tool.input_file.debug_collector
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        self.assertEqual(
+            os.path.join(tempfile.gettempdir(), f"{name}_debug.pdf"),
+            collector.pdf_path,
+        )
+        # no debug files per page anymore
+        self.assertEqual(
+            [], glob.glob(os.path.join(tempfile.gettempdir(), f"{name}_0_debug*.pdf"))
+        )
+        reader = PdfReader(collector.pdf_path)
+        self.assertEqual(12, len(reader.pages))
+        self.assertEqual(4, len(reader.outline))
+        # the image of each scan is stored once for its three debug pages
+        self.assertLess(
+            os.path.getsize(collector.pdf_path), 1.5 * os.path.getsize(input_path)
+        )
+        with open(collector.trace_path) as json_file:
+            trace = json.load(json_file)
+        if self.debug:
+            print(json.dumps(trace, indent=2))
+        self.assertEqual(input_path, trace["source"])
+        for index, record in enumerate(trace["double_pages"]):
+            left_num, right_num = DoublePage.calculate_booklet_page_numbers(
+                index, 8, False
+            )
+            self.assertEqual((left_num, right_num), (record["left"], record["right"]))
+            self.assertEqual(
+                PdfReader(input_path).pages[index].rotation, record["rotation"]
+            )
+            self.assertEqual(
+                [3 * index, 3 * index + 1, 3 * index + 2], record["debug_pages"]
+            )
+
+    def test_closed(self):
+        """
+        test that pages can not be added after closing
+        """
+        input_path = self.benchmark.get_example_booklet(2)
+        pdf_file = PdfFile(input_path)
+        collector = DebugCollector(
+            os.path.join(self.benchmark.work_dir, "closed_debug.pdf")
+        )
+        double_page = DoublePage.from_page(
+            pdf_file.reader.pages[0], 0, 4, debug_collector=collector
+        )
+        collector.wait()
+        self.assertEqual(3, len(PdfReader(collector.pdf_path).pages))
+        with self.assertRaises(RuntimeError):
+            collector.add(
+                1,
+                2,
+                3,
+                0,
+                double_page.page,
+                double_page.left.page,
+                double_page.right.page,
+            )
@@ -0,0 +1,153 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from ngwidgets.basetest import Basetest
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.document_cache import DocumentCache
+from nicepdf.pdftool import PdfFile, PDFTool
+from nicepdf.progress import ProgressBus
+from nicepdf.scan_analysis import ScanAnalyzer
+
+
+class TestDocumentCache(Basetest):
+    """
+    test the document cache shared by the sessions of the webserver
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def test_shared(self):
+        """
+        test that a document is parsed once and shared
+        """
+        cache = DocumentCache()
+        path = self.benchmark.get_example_booklet(4)
+        with cache.open(path) as document:
+            with cache.open(path) as other:
+                self.assertIs(document, other)
+                self.assertEqual(2, document.refs)
+            refs = document.derive(("refs", False), lambda: [1, 2])
+            self.assertIs(refs, document.derive(("refs", False), lambda: [3]))
+        stats = cache.stats()
+        if self.debug:
+            print(stats)
+        self.assertEqual(1, stats.hits)
+        self.assertEqual(1, stats.misses)
+        self.assertEqual(0.5, stats.hit_rate)
+        self.assertEqual(1, stats.entries)
+        self.assertEqual(0, stats.in_use)
+        self.assertGreater(stats.memory, os.path.getsize(path))
+
+    def test_derived(self):
+        """
+        test that the image pages and scan analyses are shared
+        """
+        cache = DocumentCache()
+        path = self.benchmark.get_example_booklet(4, as_scan=True)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with cache.open(path) as document:
+                analyzers = []
+                results = []
+                for _session in range(2):
+                    pdf_file = PdfFile.of_shared(document)
+                    analyzer = ScanAnalyzer(cache_dir=cache_dir, max_workers=1)
+                    image_pages = pdf_file.get_image_pages()
+                    results.append(pdf_file.analyze_scans(analyzer))
+                    analyzers.append(analyzer)
+                    self.assertEqual(4, len(image_pages))
+                    self.assertEqual(
+                        [1, 3], list(pdf_file.analyze_scans(analyzer, {1, 3}))
+                    )
+                self.assertEqual(results[0], results[1])
+                self.assertEqual(4, analyzers[0].cache_misses)
+                # the second session does not analyze the scans again
+                self.assertEqual(0, analyzers[1].cache_misses + analyzers[1].cache_hits)
+
+    def unbooklet(self, cache: DocumentCache, input_path: str, index: int) -> bytes:
+        """
+        un-booklet the given input with the shared reader of the given cache
+        """
+        output_path = os.path.join(
+            self.benchmark.work_dir, f"document_cache_{index}.pdf"
+        )
+        with cache.open(input_path) as document:
+            tool = PDFTool(input_path, output_path, shared_document=document)
+            tool.compact = index % 2 == 1
+            tool.deterministic = True
+            tool.split_booklet_style(progress_bar=ProgressBus(interval=60.0))
+        with open(output_path, "rb") as pdf_file:
+            pdf = pdf_file.read()
+        return pdf
+
+    def test_threads(self):
+        """
+        test sessions sharing a reader in several threads
+        """
+        input_path = self.benchmark.get_example_booklet(
+            10, with_random_rotation=True, as_scan=True
+        )
+        expected = {}
+        for compact in [False, True]:
+            output_path = os.path.join(self.benchmark.work_dir, "document_cache.pdf")
+            tool = PDFTool(input_path, output_path)
+            tool.compact = compact
+            tool.deterministic = True
+            tool.split_booklet_style(progress_bar=ProgressBus(interval=60.0))
+            with open(output_path, "rb") as pdf_file:
+                expected[compact] = pdf_file.read()
+        cache = DocumentCache()
+        sessions = 8
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pdfs = list(
+                executor.map(
+                    lambda index: self.unbooklet(cache, input_path, index),
+                    range(sessions),
+                )
+            )
+        for index, pdf in enumerate(pdfs):
+            self.assertEqual(expected[index % 2 == 1], pdf)
+        stats = cache.stats()
+        self.assertEqual(1, stats.misses)
+        self.assertEqual(sessions - 1, stats.hits)
+
+    def test_eviction(self):
+        """
+        test the eviction of changed and least recently used documents
+        """
+        cache = DocumentCache(max_entries=1)
+        paths = []
+        for double_pages in [2, 3]:
+            path = os.path.join(self.benchmark.work_dir, f"cache_{double_pages}.pdf")
+            shutil.copy(self.benchmark.get_example_booklet(double_pages), path)
+            paths.append(path)
+        first = cache.acquire(paths[0])
+        with cache.open(paths[1]):
+            pass
+        # the referenced document is kept
+        self.assertEqual(2, cache.stats().entries)
+        cache.release(first)
+        self.assertEqual(1, cache.stats().entries)
+        self.assertEqual(1, cache.stats().evictions)
+        # a changed file is parsed again and replaces the older version
+        shutil.copy(self.benchmark.get_example_booklet(4), paths[0])
+        with cache.open(paths[0]) as document:
+            self.assertEqual(4, len(document.reader.pages))
+        with cache.open(paths[0]):
+            pass
+        stats = cache.stats()
+        self.assertEqual(3, stats.misses)
+        self.assertEqual(1, stats.hits)
+        self.assertEqual(1, stats.entries)
+        cache.clear()
+        self.assertEqual(0, cache.stats().entries)
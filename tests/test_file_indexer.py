@@ -0,0 +1,84 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from ngwidgets.basetest import Basetest
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.file_indexer import FileIndexer
+from nicepdf.pdf_index import PdfIndex
+
+
+class TestFileIndexer(Basetest):
+    """
+    test the background file indexer
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark()
+        self.tmp_dir = tempfile.mkdtemp(prefix="nicepdf_indexer")
+        self.root_path = os.path.join(self.tmp_dir, "pdfs")
+        os.makedirs(self.root_path)
+        for name, as_scan in [("booklet.pdf", False), ("scan.pdf", True)]:
+            path = self.benchmark.get_example_booklet(3, as_scan=as_scan)
+            shutil.copyfile(path, os.path.join(self.root_path, name))
+        self.pdf_index = PdfIndex(os.path.join(self.tmp_dir, "index.db"))
+        self.thumbnail_dir = os.path.join(self.tmp_dir, "thumbnails")
+
+    def wait_for(self, condition, timeout: float = 10.0) -> bool:
+        """
+        wait for the given condition to become true
+        """
+        start = time.time()
+        while not condition():
+            if time.time() - start > timeout:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def test_scan(self):
+        """
+        test indexing the files of a directory in the thread pool
+        """
+        indexer = FileIndexer(self.root_path, self.pdf_index, self.thumbnail_dir)
+        for future in indexer.start(with_watcher=False):
+            future.result()
+        indexer.stop()
+        self.assertEqual(2, len(indexer.entries))
+        booklet = indexer.get_entry(os.path.join(self.root_path, "booklet.pdf"))
+        scan = indexer.get_entry(os.path.join(self.root_path, "scan.pdf"))
+        self.assertEqual("booklet", booklet.kind)
+        self.assertEqual(3, booklet.doc_info.page_count)
+        self.assertEqual("3 p, booklet", booklet.summary)
+        # only scans get a thumbnail
+        self.assertIsNone(booklet.thumbnail)
+        self.assertTrue(
+            os.path.isfile(os.path.join(self.thumbnail_dir, scan.thumbnail))
+        )
+
+    def test_watch(self):
+        """
+        test keeping the entries up to date
+        """
+        indexer = FileIndexer(self.root_path, self.pdf_index, self.thumbnail_dir)
+        indexer.start()
+        try:
+            self.assertTrue(self.wait_for(lambda: len(indexer.entries) == 2))
+            # give the watcher time to start
+            time.sleep(0.5)
+            new_path = os.path.join(self.root_path, "new.pdf")
+            shutil.copyfile(self.benchmark.get_example_booklet(5), new_path)
+            self.assertTrue(self.wait_for(lambda: indexer.get_entry(new_path)))
+            self.assertEqual(5, indexer.get_entry(new_path).doc_info.page_count)
+            os.remove(new_path)
+            self.assertTrue(self.wait_for(lambda: indexer.get_entry(new_path) is None))
+        finally:
+            indexer.stop()
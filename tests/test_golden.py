@@ -0,0 +1,128 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from importlib.metadata import version
+
+from ngwidgets.basetest import Basetest
+from ngwidgets.progress import TqdmProgressbar
+from reportlab.lib.units import mm
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdftool import PDFTool
+
+
+class TestGolden(Basetest):
+    """
+    golden file regression tests and timing baselines
+
+    set NICEPDF_UPDATE_GOLDEN=1 to record new golden hashes and timing baselines
+    and NICEPDF_CHECK_TIMING=1 to fail on a timing regression - by default the
+    timing is only reported since the baselines depend on the machine
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.golden_dir = os.path.join(os.path.dirname(__file__), "golden")
+        self.update = os.environ.get("NICEPDF_UPDATE_GOLDEN") == "1"
+        self.check_timing = os.environ.get("NICEPDF_CHECK_TIMING") == "1"
+        self.benchmark = Benchmark(work_dir=tempfile.mkdtemp(prefix="nicepdf_golden"))
+        # the output bytes depend on the versions of these libraries
+        self.versions = {
+            package: version(package) for package in ["pypdf", "reportlab", "pillow"]
+        }
+
+    def load_json(self, name: str) -> dict:
+        json_path = os.path.join(self.golden_dir, name)
+        record = {}
+        if os.path.exists(json_path):
+            with open(json_path) as json_file:
+                record = json.load(json_file)
+        return record
+
+    def store_json(self, name: str, record: dict):
+        os.makedirs(self.golden_dir, exist_ok=True)
+        with open(os.path.join(self.golden_dir, name), "w") as json_file:
+            json.dump(record, json_file, indent=2, sort_keys=True)
+            json_file.write("\n")
+
+    def run_case(self, name: str, run: str) -> str:
+        """
+        run the given case twice and check that the output is reproducible
+
+        Returns:
+            str: the sha256 hash of the output
+        """
+        hashes = []
+        for i in range(2):
+            input_path = self.benchmark.get_example_booklet(
+                3, with_random_rotation=True, as_scan="scan" in name, seed=7
+            )
+            output_path = os.path.join(self.benchmark.work_dir, f"{name}_{i}.pdf")
+            tool = PDFTool(input_path, output_path)
+            tool.deterministic = True
+            tool.compact = "compact" in name
+            if run == "unbooklet":
+                progress_bar = TqdmProgressbar(
+                    total=tool.get_total_steps(), desc=name, unit="step"
+                )
+                tool.split_booklet_style(progress_bar)
+            else:
+                tool.poster("A4", "A2", overlap=10 * mm, crop_marks=True)
+            with open(output_path, "rb") as output_file:
+                hashes.append(hashlib.sha256(output_file.read()).hexdigest())
+        self.assertEqual(hashes[0], hashes[1], f"{name} is not reproducible")
+        return hashes[0]
+
+    def test_golden(self):
+        """
+        test the output against the golden hashes
+        """
+        cases = {
+            "unbooklet": "unbooklet",
+            "unbooklet_compact": "unbooklet",
+            "unbooklet_compact_scan": "unbooklet",
+            "poster": "poster",
+        }
+        golden = self.load_json("golden.json")
+        hashes = {name: self.run_case(name, run) for name, run in cases.items()}
+        if self.update:
+            self.store_json("golden.json", {"versions": self.versions, **hashes})
+            return
+        if golden.get("versions") != self.versions:
+            self.skipTest(
+                f"golden hashes recorded with {golden.get('versions')} - running {self.versions}"
+            )
+        for name, sha256 in hashes.items():
+            self.assertEqual(golden.get(name), sha256, f"output of {name} changed")
+
+    def test_timing(self):
+        """
+        report the timing against the baselines - see NICEPDF_CHECK_TIMING
+        """
+        results = [
+            self.benchmark.unbooklet(50),
+            self.benchmark.unbooklet(50, compact=True),
+            self.benchmark.poster(10, "A4", "A1", deterministic=True),
+        ]
+        timing = {result.name: round(result.seconds, 3) for result in results}
+        if self.debug:
+            print(json.dumps(timing, indent=2))
+        if self.update:
+            self.store_json("timing.json", timing)
+            return
+        baselines = self.load_json("timing.json")
+        for name, seconds in timing.items():
+            baseline = baselines.get(name)
+            if baseline is None:
+                continue
+            print(f"{name:30} {seconds:8.3f} s baseline {baseline:8.3f} s")
+            if self.check_timing:
+                # generous limit for slower machines - a regression shows up as a diff on update
+                self.assertLess(seconds, baseline * 5 + 0.5, f"{name} got slower")
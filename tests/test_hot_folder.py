@@ -0,0 +1,89 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.hot_folder import FolderProfile, HotFolder, Journal
+
+
+class TestHotFolder(Basetest):
+    """
+    test the hot folder conversion of dropped scans
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+        self.folder = tempfile.mkdtemp(prefix="nicepdf_hot")
+
+    def test_partial_file(self):
+        """
+        test that files are only queued when they are complete and stable
+        """
+        hot_folder = HotFolder([self.folder], settle=0)
+        booklet = self.benchmark.get_example_booklet(2)
+        with open(booklet, "rb") as pdf_file:
+            data = pdf_file.read()
+        path = os.path.join(self.folder, "scan.pdf")
+        with open(path, "wb") as pdf_file:
+            pdf_file.write(data[: len(data) // 2])
+        # ignored while being written
+        with open(os.path.join(self.folder, ".scan.tmp.pdf"), "wb") as pdf_file:
+            pdf_file.write(data)
+        self.assertEqual([], hot_folder.scan())
+        self.assertEqual([], hot_folder.scan())
+        with open(path, "ab") as pdf_file:
+            pdf_file.write(data[len(data) // 2 :])
+        # the first scan after the change only debounces
+        self.assertEqual([], hot_folder.scan())
+        self.assertEqual([path], hot_folder.scan())
+        self.assertEqual([], hot_folder.scan())
+        entries = Journal(self.folder).read()
+        self.assertEqual(["queued"], [entry["state"] for entry in entries])
+
+    def test_burst(self):
+        """
+        test converting a burst of files with a bounded process pool
+        """
+        with open(os.path.join(self.folder, FolderProfile.profile_file), "w") as f:
+            json.dump({"from_binder": True, "poster_formats": ["A3"]}, f)
+        booklet = self.benchmark.get_example_booklet(2)
+        count = 12
+        for i in range(count):
+            shutil.copy(booklet, os.path.join(self.folder, f"scan{i:02}.pdf"))
+        with open(os.path.join(self.folder, "broken.pdf"), "wb") as pdf_file:
+            pdf_file.write(b"%PDF-1.4\nnot a pdf\n%%EOF\n")
+        hot_folder = HotFolder(
+            [self.folder], max_workers=2, settle=0, poll_interval=0.01
+        )
+        self.assertEqual(4, hot_folder.max_in_flight)
+        self.assertEqual(count + 1, hot_folder.run(stop_when_idle=True))
+        if self.debug:
+            print(hot_folder.status())
+        self.assertEqual(count, hot_folder.done_count)
+        self.assertEqual(1, hot_folder.failed_count)
+        converted = sorted(os.listdir(os.path.join(self.folder, "converted")))
+        self.assertEqual(2 * count, len(converted))
+        self.assertIn("scan00-poster-A3.pdf", converted)
+        reader = PdfReader(os.path.join(self.folder, "converted", "scan00.pdf"))
+        self.assertEqual(4, len(reader.pages))
+        self.assertEqual(count, len(os.listdir(os.path.join(self.folder, "processed"))))
+        self.assertEqual(
+            ["broken.pdf"], os.listdir(os.path.join(self.folder, "failed"))
+        )
+        entries = Journal(self.folder).read()
+        states = [entry["state"] for entry in entries]
+        self.assertEqual(count + 1, states.count("queued"))
+        self.assertEqual(count, states.count("done"))
+        failed = [entry for entry in entries if entry["state"] == "failed"]
+        self.assertEqual("broken.pdf", failed[0]["file"])
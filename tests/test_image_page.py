@@ -0,0 +1,244 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+
+from ngwidgets.basetest import Basetest
+from pypdf import PageObject, PdfReader, PdfWriter, Transformation
+from pypdf.generic import DictionaryObject, FloatObject, NameObject, StreamObject
+from reportlab.lib import pagesizes
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.image_page import ImagePage
+from nicepdf.pdftool import PdfFile, PDFTool
+
+
+class TestImagePage(Basetest):
+    """
+    test the single image page fast path
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=True)
+
+    def test_detect(self):
+        """
+        test detecting single image pages
+        """
+        for as_scan in [True, False]:
+            path = self.benchmark.get_example_booklet(2, as_scan=as_scan)
+            pdf_file = PdfFile(path)
+            for page in pdf_file.reader.pages:
+                image_page = ImagePage.detect(page)
+                self.assertEqual(as_scan, image_page is not None)
+            pdf_file.close()
+
+    def test_clip_mode(self):
+        """
+        test that the clip mode shares the scanned images
+        """
+        double_pages = 10
+        merge = self.benchmark.unbooklet(double_pages, as_scan=True, image_mode="merge")
+        clip = self.benchmark.unbooklet(double_pages, as_scan=True, image_mode="clip")
+        output_path = os.path.join(
+            self.benchmark.work_dir, f"booklet_{double_pages}_standard_scan_clip.pdf"
+        )
+        reader = PdfReader(output_path)
+        self.assertEqual(double_pages * 2, len(reader.pages))
+        images = set()
+        for page in reader.pages:
+            xobjects = page["/Resources"]["/XObject"]
+            for xobject in xobjects.values():
+                images.add(xobject.idnum)
+        # one image per double page
+        self.assertEqual(double_pages, len(images))
+        if self.debug:
+            print(merge, clip)
+
+    def test_raster_mode(self):
+        """
+        test that the raster mode splits the scanned images physically
+        """
+        double_pages = 4
+        clip = self.benchmark.unbooklet(double_pages, as_scan=True, image_mode="clip")
+        raster = self.benchmark.unbooklet(
+            double_pages, as_scan=True, image_mode="raster"
+        )
+        output_path = os.path.join(
+            self.benchmark.work_dir, f"booklet_{double_pages}_standard_scan_raster.pdf"
+        )
+        reader = PdfReader(output_path)
+        self.assertEqual(double_pages * 2, len(reader.pages))
+        for page in reader.pages:
+            xobjects = page["/Resources"]["/XObject"]
+            self.assertEqual(1, len(xobjects))
+            for xobject in xobjects.values():
+                image = xobject.get_object()
+                # half of the 100 dpi A4 landscape scan
+                self.assertAlmostEqual(585, image["/Width"], delta=2)
+        self.assertLess(raster.output_size, clip.output_size * 1.1)
+
+    def test_split_once(self):
+        """
+        test that each scan is split physically once for both of its half pages
+        """
+        double_pages = 4
+        input_path = self.benchmark.get_example_booklet(double_pages, as_scan=True)
+        split_raster = ImagePage.split_raster
+        splits = []
+
+        def count_split(image_page, *args, **kwargs):
+            splits.append(image_page)
+            return split_raster(image_page, *args, **kwargs)
+
+        ImagePage.split_raster = count_split
+        try:
+            for mode in ["standard", "compact", "checkpoint"]:
+                splits.clear()
+                output_path = os.path.join(
+                    self.benchmark.work_dir, f"split_once_{mode}.pdf"
+                )
+                tool = PDFTool(input_path, output_path)
+                tool.image_mode = "raster"
+                tool.compact = mode == "compact"
+                if mode == "checkpoint":
+                    # chunks that do not contain both halves of a double page
+                    tool.checkpoint_interval = 3
+                tool.split_booklet_style()
+                with self.subTest(mode=mode):
+                    self.assertEqual(double_pages, len(splits))
+                    self.assertEqual(
+                        double_pages * 2, len(PdfReader(output_path).pages)
+                    )
+        finally:
+            ImagePage.split_raster = split_raster
+
+    def test_raster_fallback(self):
+        """
+        test that images that can not be split physically are clipped instead
+        """
+        from PIL import Image
+
+        height, width = pagesizes.A4
+        input_path = os.path.join(self.benchmark.work_dir, "raster_fallback.pdf")
+        writer = PdfWriter()
+
+        def add_scan(image, matrix: Transformation):
+            page = PageObject.create_blank_page(pdf=None, width=width, height=height)
+            page[NameObject("/Resources")] = DictionaryObject(
+                {
+                    NameObject("/XObject"): DictionaryObject(
+                        {NameObject("/Im0"): writer._add_object(image)}
+                    )
+                }
+            )
+            content = StreamObject()
+            ctm = " ".join(f"{value:.4f}" for value in matrix.ctm)
+            content.set_data(f"q {ctm} cm /Im0 Do Q".encode())
+            page[NameObject("/Contents")] = writer._add_object(content)
+            writer.add_page(page)
+
+        gray = Image.new("L", (400, 280), 200)
+        # a slightly skewed scan
+        skewed = ImagePage.encode_image(gray, jpeg=False)
+        add_scan(skewed, Transformation().scale(width, height).rotate(0.5))
+        # a scan with a soft mask
+        masked = ImagePage.encode_image(gray, jpeg=False)
+        masked[NameObject("/SMask")] = writer._add_object(
+            ImagePage.encode_image(gray, jpeg=False)
+        )
+        add_scan(masked, Transformation().scale(width, height))
+        writer.write(input_path)
+        for compact in [False, True]:
+            output_path = os.path.join(
+                self.benchmark.work_dir, f"raster_fallback_{compact}_split.pdf"
+            )
+            tool = PDFTool(input_path, output_path)
+            tool.image_mode = "raster"
+            tool.compact = compact
+            tool.split_booklet_style()
+            reader = PdfReader(output_path)
+            with self.subTest(compact=compact):
+                self.assertEqual(4, len(reader.pages))
+                for page in reader.pages:
+                    for xobject in page["/Resources"]["/XObject"].values():
+                        # the whole image is clipped
+                        self.assertEqual(400, xobject.get_object()["/Width"])
+
+    def test_ext_gstate(self):
+        """
+        test that the graphics states of a scan are kept in its half pages
+        """
+        from PIL import Image
+
+        height, width = pagesizes.A4
+        input_path = os.path.join(self.benchmark.work_dir, "ext_gstate.pdf")
+        writer = PdfWriter()
+        image = writer._add_object(
+            ImagePage.encode_image(Image.new("L", (400, 280), 200), jpeg=False)
+        )
+        smasks = {"/None": True, "/Luminosity": False}
+        for smask in smasks:
+            page = PageObject.create_blank_page(pdf=None, width=width, height=height)
+            ext_gstate = DictionaryObject(
+                {
+                    NameObject("/CA"): FloatObject(0.5),
+                    NameObject("/SMask"): NameObject(smask),
+                }
+            )
+            page[NameObject("/Resources")] = DictionaryObject(
+                {
+                    NameObject("/XObject"): DictionaryObject(
+                        {NameObject("/Im0"): image}
+                    ),
+                    NameObject("/ExtGState"): DictionaryObject(
+                        {NameObject("/GS0"): ext_gstate}
+                    ),
+                }
+            )
+            content = StreamObject()
+            content.set_data(
+                f"q /GS0 gs {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode()
+            )
+            page[NameObject("/Contents")] = writer._add_object(content)
+            writer.add_page(page)
+        writer.write(input_path)
+        reader = PdfReader(input_path)
+        for page, (smask, expected) in zip(reader.pages, smasks.items()):
+            image_page = ImagePage.detect(page)
+            with self.subTest(smask=smask):
+                # a soft mask depends on the placement - not an image page
+                self.assertEqual(expected, image_page is not None)
+                if not expected:
+                    continue
+                self.assertEqual(["/GS0"], image_page.gstates)
+                halves = [image_page.copy_page(width / 2, height)]
+                halves.extend(image_page.split_raster(width, height))
+                for half_page in halves:
+                    resources = half_page["/Resources"]
+                    self.assertEqual(0.5, resources["/ExtGState"]["/GS0"]["/CA"])
+                    operators = [
+                        operator for _, operator in half_page["/Contents"].operations
+                    ]
+                    self.assertIn(b"gs", operators)
+
+    def test_detect_gutter(self):
+        """
+        test detecting the gutter from the column profile
+        """
+        from PIL import Image, ImageDraw
+
+        for expected in [0.45, 0.5, 0.56]:
+            image = Image.new("L", (1000, 700), 240)
+            draw = ImageDraw.Draw(image)
+            x = round(expected * 1000)
+            # binding shadow
+            draw.rectangle((x - 8, 0, x + 8, 700), fill=90)
+            gutter = ImagePage.detect_gutter(image)
+            self.assertAlmostEqual(expected, gutter, delta=0.01)
+        blank = Image.new("L", (1000, 700), 255)
+        self.assertEqual(0.5, ImagePage.detect_gutter(blank))
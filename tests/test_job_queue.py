@@ -0,0 +1,304 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.job_queue import (
+    HttpJobQueue,
+    Job,
+    JobQueue,
+    JobQueueApi,
+    JobWorker,
+    LeaseLost,
+    QueueProgress,
+    SqliteJobQueue,
+)
+from nicepdf.progress import ProgressBus
+
+
+class TestJobQueue(Basetest):
+    """
+    test the job queue and the workers
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+        self.tmp_dir = tempfile.mkdtemp(prefix="nicepdf_jobs")
+        self.db_path = os.path.join(self.tmp_dir, "jobs.db")
+
+    def get_job(self, name: str, operation: str = "unbooklet", **options) -> Job:
+        input_path = self.benchmark.get_example_booklet(4)
+        job = Job(
+            operation,
+            input_path,
+            os.path.join(self.tmp_dir, f"{name}.pdf"),
+            options=options,
+        )
+        return job
+
+    def test_sqlite_queue(self):
+        """
+        test submitting, claiming and finishing jobs
+        """
+        queue = JobQueue.of(self.db_path)
+        self.assertIsInstance(queue, SqliteJobQueue)
+        first = queue.submit(self.get_job("first"))
+        second = queue.submit(self.get_job("second", "poster", target_format="A2"))
+        claimed = queue.claim("worker 1")
+        self.assertEqual(first.job_id, claimed.job_id)
+        self.assertEqual("running", claimed.state)
+        self.assertEqual(second.job_id, queue.claim("worker 2").job_id)
+        self.assertIsNone(queue.claim("worker 3"))
+        self.assertTrue(
+            queue.update_progress(
+                first.job_id, "worker 1", {"stage": "writing pages", "done": 3}
+            )
+        )
+        self.assertTrue(queue.finish(first.job_id, "worker 1"))
+        self.assertTrue(
+            queue.finish(second.job_id, "worker 2", error="failed on purpose")
+        )
+        self.assertEqual("done", queue.get(first.job_id).state)
+        self.assertEqual(3, queue.get(first.job_id).progress["done"])
+        failed = queue.list_jobs("failed")
+        self.assertEqual([second.job_id], [job.job_id for job in failed])
+        self.assertEqual({"target_format": "A2"}, failed[0].options)
+        with self.assertRaises(ValueError):
+            queue.submit(self.get_job("unknown", "shred"))
+
+    def test_lease(self):
+        """
+        test that the job of a crashed worker is claimed again
+        """
+        queue = SqliteJobQueue(self.db_path, lease=0)
+        job = queue.submit(self.get_job("lease"))
+        self.assertEqual("crashed", queue.claim("crashed").worker)
+        reclaimed = queue.claim("worker 2")
+        self.assertEqual(job.job_id, reclaimed.job_id)
+        self.assertEqual("worker 2", reclaimed.worker)
+        # the worker that lost the job can not change it any more
+        self.assertFalse(queue.heartbeat(job.job_id, "crashed"))
+        self.assertFalse(queue.update_progress(job.job_id, "crashed", {"done": 1}))
+        self.assertFalse(queue.finish(job.job_id, "crashed", error="too late"))
+        self.assertTrue(queue.finish(job.job_id, "worker 2"))
+        self.assertEqual("done", queue.get(job.job_id).state)
+        self.assertEqual("worker 2", queue.get(job.job_id).worker)
+
+    def test_incomplete_queue(self):
+        """
+        test that a queue missing an operation can not be created
+        """
+
+        class IncompleteQueue(JobQueue):
+            def submit(self, job):
+                return job
+
+        with self.assertRaises(TypeError):
+            IncompleteQueue()
+
+    def test_lost_lease(self):
+        """
+        test that a worker stops a job that has been given to another worker
+        """
+        queue = SqliteJobQueue(self.db_path, lease=0)
+        job = queue.submit(self.get_job("lost"))
+        worker = JobWorker(queue, worker_id="slow worker", heartbeat_interval=60)
+        pages = []
+
+        def process(job, progress_bus=None):
+            progress_bus = ProgressBus(
+                total=10,
+                interval=0,
+                consumers=[
+                    QueueProgress(
+                        queue, job.job_id, worker.worker_id, worker.lease_lost
+                    )
+                ],
+            )
+            for page in range(10):
+                if page == 3:
+                    # the lease has expired
+                    queue.claim("other worker")
+                progress_bus.update(1)
+                pages.append(page)
+
+        worker.process = process
+        worker.run_once()
+        self.assertEqual([0, 1, 2], pages)
+        job = queue.get(job.job_id)
+        self.assertEqual("running", job.state)
+        self.assertEqual("other worker", job.worker)
+
+    def test_unreachable_queue(self):
+        """
+        test that errors of the queue do not abort the job or the worker
+        """
+
+        class FlakyQueue(SqliteJobQueue):
+            def update_progress(self, job_id, worker, progress):
+                raise TimeoutError("timed out")
+
+            def finish(self, job_id, worker, error=None):
+                raise ConnectionError("503 Service Unavailable")
+
+        queue = FlakyQueue(self.db_path)
+        job = queue.submit(self.get_job("flaky"))
+        progress = QueueProgress(queue, job.job_id, "worker")
+        progress_bus = ProgressBus(total=2, interval=0, consumers=[progress])
+        progress_bus.update(1)
+        self.assertFalse(progress.lease_lost.is_set())
+        worker = JobWorker(queue, worker_id="worker")
+        worker.process = lambda job, progress_bus=None: None
+        self.assertEqual(job.job_id, worker.run_once().job_id)
+        with self.assertRaises(LeaseLost):
+            progress.lease_lost.set()
+            progress_bus.update(1)
+
+    def test_heartbeat(self):
+        """
+        test that a slow worker keeps its job by sending heartbeats
+        """
+        queue = SqliteJobQueue(self.db_path, lease=0.3)
+        job = queue.submit(self.get_job("slow"))
+        worker = JobWorker(queue, worker_id="slow worker", heartbeat_interval=0.05)
+        claims = []
+
+        def process(job, progress_bus=None):
+            # no progress for longer than the lease
+            for _i in range(8):
+                time.sleep(0.1)
+                claims.append(queue.claim("other worker"))
+
+        worker.process = process
+        self.assertEqual(job.job_id, worker.run_once().job_id)
+        self.assertEqual([None] * 8, claims)
+        self.assertEqual("done", queue.get(job.job_id).state)
+
+    def test_concurrent_claims(self):
+        """
+        test that workers with their own connections never claim the same job
+        """
+        queue = SqliteJobQueue(self.db_path)
+        for i in range(20):
+            queue.submit(self.get_job(f"job {i}"))
+        claims = []
+
+        def work(worker: str):
+            worker_queue = SqliteJobQueue(self.db_path)
+            while True:
+                job = worker_queue.claim(worker)
+                if job is None:
+                    break
+                claims.append(job.job_id)
+
+        threads = [
+            threading.Thread(target=work, args=(f"worker {i}",)) for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(20, len(claims))
+        self.assertEqual(20, len(set(claims)))
+
+    def test_worker(self):
+        """
+        test running jobs with a worker
+        """
+        queue = SqliteJobQueue(self.db_path)
+        unbooklet = queue.submit(self.get_job("unbooklet", linearize=True))
+        poster = queue.submit(self.get_job("poster", "poster", target_format="A2"))
+        missing = self.get_job("missing")
+        missing.input_path = os.path.join(self.tmp_dir, "missing.pdf")
+        missing = queue.submit(missing)
+        worker = JobWorker(queue, worker_id="test worker")
+        self.assertEqual(3, worker.run(stop_when_idle=True))
+        unbooklet = queue.get(unbooklet.job_id)
+        self.assertEqual("done", unbooklet.state)
+        self.assertTrue(unbooklet.progress["final"])
+        self.assertEqual(8, len(PdfReader(unbooklet.output_path).pages))
+        poster = queue.get(poster.job_id)
+        self.assertEqual("done", poster.state)
+        self.assertEqual(16, len(PdfReader(poster.output_path).pages))
+        missing = queue.get(missing.job_id)
+        self.assertEqual("failed", missing.state)
+        if self.debug:
+            print(missing.error)
+
+    def test_http_queue(self):
+        """
+        test the json api with a remote worker
+        """
+        roots = [self.tmp_dir, self.benchmark.work_dir]
+        api = JobQueueApi(SqliteJobQueue(self.db_path), "secret", roots=roots)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                action = self.path.rsplit("/", 1)[-1]
+                length = int(self.headers["Content-Length"])
+                payload = json.loads(self.rfile.read(length))
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                try:
+                    result = api.handle(action, payload, token)
+                    status = 200
+                except PermissionError as ex:
+                    result = {"detail": str(ex)}
+                    status = 403
+                body = json.dumps(result).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        with ThreadingHTTPServer(("127.0.0.1", 0), Handler) as server:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                url = f"http://127.0.0.1:{server.server_port}/"
+                # calls without the token and jobs outside of the roots are rejected
+                for token, job in [
+                    (None, self.get_job("no token")),
+                    ("wrong", self.get_job("wrong token")),
+                    ("secret", Job("unbooklet", "/etc/hosts", "/etc/hosts.pdf")),
+                ]:
+                    with self.assertRaises(urllib.error.HTTPError) as context:
+                        JobQueue.of(url, token=token).submit(job)
+                    self.assertEqual(403, context.exception.code)
+                queue = JobQueue.of(url, token="secret")
+                self.assertIsInstance(queue, HttpJobQueue)
+                job = queue.submit(self.get_job("remote"))
+                self.assertEqual("queued", job.state)
+                worker = JobWorker(queue, worker_id="remote worker")
+                self.assertEqual(1, worker.run(stop_when_idle=True))
+                job = queue.get(job.job_id)
+                self.assertEqual("done", job.state)
+                self.assertEqual("remote worker", job.worker)
+                self.assertEqual(1, len(queue.list_jobs("done")))
+                # a job no worker claimed is cancelled
+                job = queue.submit(self.get_job("unclaimed"))
+                self.assertTrue(queue.cancel(job.job_id, "no worker"))
+                self.assertFalse(queue.cancel(job.job_id, "again"))
+                job = queue.get(job.job_id)
+                self.assertEqual("failed", job.state)
+                self.assertEqual("no worker", job.error)
+                self.assertIsNone(worker.run_once())
+            finally:
+                server.shutdown()
@@ -0,0 +1,78 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader
+from reportlab.lib.units import mm
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.linearize import Linearizer
+from nicepdf.pdftool import PDFTool
+
+
+class TestLinearize(Basetest):
+    """
+    test the linearized output for fast web view
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def check_linearized(self, path: str, expected_path: str):
+        """
+        check that the given linearized pdf has the pages of the expected pdf
+        """
+        with open(path, "rb") as pdf_file:
+            data = pdf_file.read()
+        parameters = Linearizer.get_parameters(data)
+        self.assertIsNotNone(parameters)
+        reader = PdfReader(path)
+        expected = PdfReader(expected_path)
+        self.assertEqual(len(data), parameters["L"])
+        self.assertEqual(len(expected.pages), parameters["N"])
+        self.assertEqual(len(expected.pages), len(reader.pages))
+        # the first page is the object given by /O and complete before /E
+        first_page = reader.pages[0].indirect_reference
+        self.assertEqual(parameters["O"], first_page.idnum)
+        self.assertLess(parameters["E"], parameters["L"])
+        self.assertLess(data.find(b"\n%d 0 obj" % parameters["O"]), parameters["E"])
+        for page, expected_page in zip(reader.pages, expected.pages):
+            self.assertEqual(expected_page.extract_text(), page.extract_text())
+            self.assertEqual(expected_page.mediabox, page.mediabox)
+
+    def test_linearize(self):
+        """
+        test linearizing the un-booklet and poster results
+        """
+        input_path = self.benchmark.get_example_booklet(4)
+        for operation in ["unbooklet", "poster"]:
+            paths = {}
+            for linearize in [False, True]:
+                output_path = os.path.join(
+                    self.benchmark.work_dir, f"linearize_{operation}_{linearize}.pdf"
+                )
+                tool = PDFTool(input_path, output_path)
+                tool.linearize = linearize
+                if operation == "unbooklet":
+                    tool.split_booklet_style()
+                else:
+                    tool.poster("A4", "A2", overlap=10 * mm)
+                paths[linearize] = output_path
+            self.check_linearized(paths[True], paths[False])
+
+    def test_first_page(self):
+        """
+        test the time to the first page through the local http server
+        """
+        standard = self.benchmark.first_page(6, linearize=False, bytes_per_second=2e6)
+        linearized = self.benchmark.first_page(6, linearize=True, bytes_per_second=2e6)
+        if self.debug:
+            print(standard)
+            print(linearized)
+        self.assertLess(linearized.seconds, standard.seconds)
@@ -0,0 +1,128 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.image_page import ImagePage
+from nicepdf.memory_budget import (
+    AdaptiveScheduler,
+    MemoryBudget,
+    PageEstimate,
+    PageMemoryEstimator,
+)
+from nicepdf.pdftool import PDFTool
+
+
+class FakeBudget(MemoryBudget):
+    """
+    a budget with a given sequence of resident memory observations
+    """
+
+    def __init__(self, budget: int, observations: list):
+        MemoryBudget.__init__(self, budget)
+        self.observations = list(observations)
+
+    def rss(self):
+        return self.observations.pop(0)
+
+
+class TestMemoryBudget(Basetest):
+    """
+    test the memory budget aware scheduling of the process pool
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def test_estimate_page(self):
+        """
+        test estimating scanned and vector pages
+        """
+        scan_path = self.benchmark.get_example_booklet(2, as_scan=True)
+        page = PdfReader(scan_path).pages[0]
+        image = ImagePage.detect(page).image.get_object()
+        estimate = PageMemoryEstimator.estimate_page(page)
+        if self.debug:
+            print(estimate)
+        # a gray scan
+        self.assertEqual(image["/Width"] * image["/Height"], estimate.raster_bytes)
+        self.assertGreaterEqual(estimate.stream_bytes, len(image._data))
+        self.assertGreater(estimate.cost(decode=True), estimate.cost())
+        vector_path = self.benchmark.get_example_booklet(2)
+        vector = PageMemoryEstimator.estimate_page(PdfReader(vector_path).pages[0])
+        self.assertEqual(0, vector.raster_bytes)
+        self.assertLess(vector.cost(), estimate.cost())
+
+    def test_chunk(self):
+        """
+        test splitting work into chunks that fit into the budget
+        """
+        budget = MemoryBudget(budget=1000)
+        chunks = budget.chunk(list(range(7)), [100, 100, 100, 600, 100, 100, 100], 4, 2)
+        self.assertEqual([[0, 1, 2], [3], [4, 5, 6]], chunks)
+        chunks = budget.chunk(list(range(5)), [10] * 5, 2, 2)
+        self.assertEqual([[0, 1], [2, 3], [4]], chunks)
+
+    def test_admission(self):
+        """
+        test admitting tasks against the budget and the concurrency limit
+        """
+        scheduler = AdaptiveScheduler(max_workers=2, memory_budget=MemoryBudget(1000))
+        # a single task is always admitted
+        self.assertTrue(scheduler.admits(5000, 0, 0))
+        self.assertTrue(scheduler.admits(400, 500, 1))
+        self.assertFalse(scheduler.admits(600, 500, 1))
+        self.assertFalse(scheduler.admits(100, 200, 2))
+
+    def test_adapt(self):
+        """
+        test shrinking and growing the concurrency with the resident memory
+        """
+        budget = FakeBudget(1000, [950, 950, 950, 700, 100, 100, 100])
+        scheduler = AdaptiveScheduler(max_workers=3, memory_budget=budget)
+        for _i in range(7):
+            scheduler.adapt()
+        self.assertEqual([2, 1, 1, 1, 2, 3, 3], scheduler.limits)
+        self.assertEqual(950, scheduler.peak_rss)
+
+    def test_run(self):
+        """
+        test running tasks in order of their results
+        """
+        scheduler = AdaptiveScheduler(max_workers=2, memory_budget=MemoryBudget(100))
+        finished = []
+        results = scheduler.run(
+            pow,
+            [(2, i) for i in range(6)],
+            [60] * 6,
+            on_result=lambda index, _result: finished.append(index),
+        )
+        self.assertEqual([2**i for i in range(6)], results)
+        # the tasks did not fit into the budget together
+        self.assertEqual(list(range(6)), finished)
+
+    def test_unbooklet(self):
+        """
+        test splitting a scanned booklet with a small budget
+        """
+        input_path = self.benchmark.get_example_booklet(6, as_scan=True)
+        estimates = PDFTool(input_path, None).estimate_pages()
+        page_cost = max(estimate.cost() for estimate in estimates)
+        output_path = os.path.join(self.benchmark.work_dir, "memory_budget.pdf")
+        tool = PDFTool(input_path, output_path)
+        tool.max_workers = 2
+        # room for two half pages per worker
+        tool.memory_budget = MemoryBudget(budget=4 * page_cost)
+        tool.split_booklet_style()
+        self.assertEqual(12, len(PdfReader(output_path).pages))
+        self.assertEqual(6, len(tool.scheduler.limits))
+        if self.debug:
+            print(tool.scheduler.limits, tool.scheduler.peak_rss)
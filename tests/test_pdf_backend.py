@@ -0,0 +1,140 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdf_backend import PageGeometry, PdfBackends
+from nicepdf.pdftool import PDFTool
+
+
+class TestPdfBackend(Basetest):
+    """
+    test the pdf backends
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def test_geometry(self):
+        """
+        test the transformation of the parts of rotated pages
+        """
+        clip = (0, 0, 100, 50)
+        for rotation in [0, 90, 180, 270]:
+            geometry = PageGeometry(10, 20, 300, 200, rotation)
+            trsf = geometry.upright_transformation()
+            x0, y0, x1, y1 = geometry.unrotated_rect(clip)
+            corners = [trsf.apply_on(corner) for corner in ((x0, y0), (x1, y1))]
+            xs = sorted(round(x, 6) for x, _y in corners)
+            ys = sorted(round(y, 6) for _x, y in corners)
+            with self.subTest(rotation=rotation):
+                self.assertEqual([0, 100], xs)
+                self.assertEqual([0, 50], ys)
+                upright_width, _height = geometry.upright_size
+                self.assertEqual(300 if rotation in (0, 180) else 200, upright_width)
+
+    def get_pixels(self, path: str) -> list:
+        """
+        render the pages of the given pdf to compare them
+        """
+        import numpy as np
+
+        try:
+            import pymupdf
+        except ImportError:
+            self.skipTest("pymupdf is needed to render the pages")
+        with pymupdf.open(path) as document:
+            pixels = [
+                np.frombuffer(page.get_pixmap(dpi=20).samples, np.uint8).astype(float)
+                for page in document
+            ]
+        return pixels
+
+    def test_backends(self):
+        """
+        test that each available backend creates the pages of the standard implementation
+        """
+        available = PdfBackends.available()
+        self.assertIn("pypdf", available)
+        for as_scan in [False, True]:
+            input_path = self.benchmark.get_example_booklet(
+                6, with_random_rotation=True, as_scan=as_scan
+            )
+            expected_path = os.path.join(
+                self.benchmark.work_dir, "backend_standard.pdf"
+            )
+            PDFTool(input_path, expected_path).split_booklet_style()
+            expected = self.get_pixels(expected_path)
+            for name in available:
+                output_path = os.path.join(
+                    self.benchmark.work_dir, f"backend_{name}.pdf"
+                )
+                tool = PDFTool(input_path, output_path)
+                tool.backend = name
+                self.assertTrue(tool.use_backend())
+                tool.split_booklet_style()
+                reader = PdfReader(output_path)
+                pixels = self.get_pixels(output_path)
+                with self.subTest(backend=name, as_scan=as_scan):
+                    self.assertEqual(12, len(reader.pages))
+                    for page in reader.pages:
+                        width = float(page.mediabox.width)
+                        height = float(page.mediabox.height)
+                        self.assertAlmostEqual(595.3, width, delta=0.1)
+                        self.assertAlmostEqual(841.9, height, delta=0.1)
+                    for expected_page, page in zip(expected, pixels):
+                        self.assertEqual(expected_page.shape, page.shape)
+                        # only anti-aliasing and image interpolation differ
+                        self.assertLess(abs(expected_page - page).mean(), 4.0)
+
+    def test_options(self):
+        """
+        test that options needing pypdf pages fall back to the standard implementation
+        """
+        tool = PDFTool(self.benchmark.get_example_booklet(2), "unused.pdf")
+        self.assertFalse(tool.use_backend())
+        tool.backend = "pypdf"
+        self.assertTrue(tool.use_backend())
+        tool.simplify = True
+        self.assertFalse(tool.use_backend())
+        with self.assertRaises(ValueError):
+            PdfBackends.of("nobackend")
+
+    def test_fastest_backend(self):
+        """
+        test saving the fastest backend of the benchmark for the auto backend
+        """
+        with tempfile.TemporaryDirectory() as work_dir:
+            choice_path = os.path.join(work_dir, "backend.json")
+            self.assertIsNone(PdfBackends.chosen(choice_path))
+            benchmark = Benchmark(work_dir=work_dir, verbose=self.debug)
+            fastest = benchmark.fastest_backend(double_pages=4, choice_path=choice_path)
+            self.assertIn(fastest, PdfBackends.available())
+            self.assertEqual(2 * len(PdfBackends.available()), len(benchmark.results))
+            # auto only reads the saved choice
+            self.assertEqual(fastest, PdfBackends.chosen(choice_path))
+            tool = PDFTool(self.benchmark.get_example_booklet(2), "unused.pdf")
+            tool.backend = "auto"
+            default_path = PdfBackends.choice_path
+            PdfBackends.choice_path = choice_path
+            try:
+                self.assertEqual(fastest, tool.get_backend().name)
+            finally:
+                PdfBackends.choice_path = default_path
+            with open(choice_path) as json_file:
+                choice = json.load(json_file)
+            # a choice for other versions of the libraries is not used
+            choice["versions"][fastest] = "0.0"
+            with open(choice_path, "w") as json_file:
+                json.dump(choice, json_file)
+            self.assertIsNone(PdfBackends.chosen(choice_path))
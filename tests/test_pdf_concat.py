@@ -0,0 +1,87 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+from io import BytesIO
+
+from ngwidgets.basetest import Basetest
+from pypdf import PageObject, PdfReader, PdfWriter
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdf_concat import PdfConcatenator
+from nicepdf.pdftool import PDFTool, Watermark
+from nicepdf.resources import ResourceRegistry
+
+
+class TestPdfConcat(Basetest):
+    """
+    test the concatenation of pdf fragments
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def get_fragment(self, messages: list) -> bytes:
+        """
+        get a pdf with a watermarked page for each of the given messages
+        """
+        writer = PdfWriter()
+        for message in messages:
+            blank = PageObject.create_blank_page(None, 200, 300)
+            page = Watermark.get_watermarked_page(blank, message)
+            ResourceRegistry.of(writer).add_page(page)
+        writer.add_metadata({"/Title": "(a 1 0 R title)"})
+        buffer = BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    def test_concatenate(self):
+        """
+        test concatenating fragments
+        """
+        messages = [f"page {i}" for i in range(7)]
+        fragments = [
+            self.get_fragment(messages[:3]),
+            self.get_fragment(messages[3:4]),
+            self.get_fragment(messages[4:]),
+        ]
+        buffer = BytesIO()
+        PdfConcatenator().write(fragments, buffer, document_id=b"0123456789abcdef")
+        reader = PdfReader(BytesIO(buffer.getvalue()), strict=True)
+        self.assertEqual(len(messages), len(reader.pages))
+        for message, page in zip(messages, reader.pages):
+            self.assertEqual(message, page.extract_text().strip())
+        # the font without references is shared by all fragments
+        fonts = {
+            font.idnum
+            for page in reader.pages
+            for font in page["/Resources"]["/Font"].values()
+        }
+        self.assertEqual(1, len(fonts))
+        # strings are not renumbered
+        self.assertEqual("(a 1 0 R title)", reader.metadata.title)
+        self.assertEqual(b"0123456789abcdef", reader.trailer["/ID"][0].original_bytes)
+
+    def test_unbooklet_fragments(self):
+        """
+        test that the fragments of the process pool create the same pages
+        """
+        input_path = self.benchmark.get_example_booklet(12)
+        texts = {}
+        for max_workers in [1, 2]:
+            output_path = os.path.join(
+                self.benchmark.work_dir, f"fragments_{max_workers}.pdf"
+            )
+            tool = PDFTool(input_path, output_path)
+            tool.compact = True
+            tool.max_workers = max_workers
+            tool.fragment_pages = 5
+            tool.split_booklet_style()
+            reader = PdfReader(output_path, strict=True)
+            texts[max_workers] = [page.extract_text() for page in reader.pages]
+        self.assertEqual(24, len(texts[2]))
+        self.assertEqual(texts[1], texts[2])
@@ -0,0 +1,76 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from ngwidgets.basetest import Basetest
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdf_index import PdfIndex
+
+
+class TestPdfIndex(Basetest):
+    """
+    test the persistent pdf metadata index
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmp_dir = tempfile.mkdtemp(prefix="nicepdf_index")
+        self.pdf_index = PdfIndex(os.path.join(self.tmp_dir, "index.db"))
+        self.benchmark = Benchmark()
+
+    def test_reopen(self):
+        """
+        test that a known document is loaded from the index
+        """
+        path = self.benchmark.get_example_booklet(50, with_random_rotation=True)
+        start = time.perf_counter()
+        doc_info = self.pdf_index.get(path)
+        parse_time = time.perf_counter() - start
+        self.assertEqual(50, doc_info.page_count)
+        start = time.perf_counter()
+        known_info = self.pdf_index.get(path)
+        reopen_time = time.perf_counter() - start
+        if self.debug:
+            print(f"parse: {parse_time*1000:.1f} ms reopen: {reopen_time*1000:.1f} ms")
+        self.assertEqual(doc_info, known_info)
+        self.assertLess(reopen_time, parse_time)
+        self.assertEqual((100, 1), known_info.booklet_mapping(False)[0])
+        self.assertEqual((50, 51), known_info.booklet_mapping(True)[0])
+        html = known_info.as_html()
+        self.assertIn("50 pages", html)
+
+    def test_copy_and_modify(self):
+        """
+        test that a copy is found by its hash and a modified file is parsed again
+        """
+        path = self.benchmark.get_example_booklet(2)
+        doc_info = self.pdf_index.get(path)
+        copy_path = os.path.join(self.tmp_dir, "copy.pdf")
+        shutil.copyfile(path, copy_path)
+        self.assertIsNone(self.pdf_index.lookup(copy_path))
+        copy_info = self.pdf_index.get(copy_path)
+        self.assertEqual(doc_info.file_hash, copy_info.file_hash)
+        self.assertEqual(doc_info.pages, copy_info.pages)
+        self.assertIsNotNone(self.pdf_index.lookup(copy_path))
+        other_path = self.benchmark.get_example_booklet(4)
+        shutil.copyfile(other_path, copy_path)
+        modified_info = self.pdf_index.get(copy_path)
+        self.assertEqual(4, modified_info.page_count)
+
+    def test_html(self):
+        """
+        test that the file name is escaped in the html table
+        """
+        path = os.path.join(self.tmp_dir, "<img src=x onerror=alert(1)>.pdf")
+        shutil.copyfile(self.benchmark.get_example_booklet(2), path)
+        html = self.pdf_index.get(path).as_html()
+        self.assertNotIn("<img", html)
+        self.assertIn("&lt;img src=x onerror=alert(1)&gt;.pdf", html)
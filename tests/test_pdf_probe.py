@@ -0,0 +1,81 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import tempfile
+import time
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import NameObject, NumberObject, RectangleObject
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdf_index import PdfIndex
+from nicepdf.pdf_probe import PdfProbe
+
+
+class TestPdfProbe(Basetest):
+    """
+    test the page tree probe
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark()
+        self.tmp_dir = tempfile.mkdtemp(prefix="nicepdf_probe")
+
+    def test_probe(self):
+        """
+        test that the probe finds the same geometry as the page objects
+        """
+        path = self.benchmark.get_example_booklet(200, with_random_rotation=True)
+        start = time.perf_counter()
+        reader = PdfReader(path)
+        page_count = PdfProbe.page_count(reader)
+        page_infos = PdfProbe.pages(reader)
+        probe_time = time.perf_counter() - start
+        start = time.perf_counter()
+        reader = PdfReader(path)
+        pages = list(reader.pages)
+        parse_time = time.perf_counter() - start
+        if self.debug:
+            print(f"probe: {probe_time*1000:.1f} ms parse: {parse_time*1000:.1f} ms")
+        self.assertEqual(len(pages), page_count)
+        self.assertEqual(len(pages), len(page_infos))
+        for page, page_info in zip(pages, page_infos):
+            self.assertEqual(page.get("/Rotate", 0) % 360, page_info.rotation)
+            self.assertEqual(PdfProbe.box(page.mediabox), page_info.mediabox)
+
+    def test_inherited(self):
+        """
+        test attributes inherited from the page tree
+        """
+        writer = PdfWriter()
+        for _i in range(3):
+            writer.add_blank_page(100, 200)
+        pages_node = writer.root_object["/Pages"].get_object()
+        pages_node[NameObject("/MediaBox")] = RectangleObject([0, 0, 300, 400])
+        pages_node[NameObject("/Rotate")] = NumberObject(90)
+        for page in writer.pages[1:]:
+            del page[NameObject("/MediaBox")]
+        path = os.path.join(self.tmp_dir, "inherited.pdf")
+        writer.write(path)
+        page_infos = PdfProbe.pages(PdfReader(path))
+        self.assertEqual([100, 300, 300], [page_info.width for page_info in page_infos])
+        self.assertEqual([90, 90, 90], [page_info.rotation for page_info in page_infos])
+
+    def test_index_probe(self):
+        """
+        test probing with and without the index
+        """
+        pdf_index = PdfIndex(os.path.join(self.tmp_dir, "index.db"))
+        path = self.benchmark.get_example_booklet(4)
+        doc_info = pdf_index.probe(path)
+        self.assertIsNone(doc_info.file_hash)
+        self.assertEqual(4, doc_info.page_count)
+        indexed_info = pdf_index.get(path)
+        doc_info = pdf_index.probe(path)
+        self.assertEqual(indexed_info, doc_info)
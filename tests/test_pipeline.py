@@ -0,0 +1,97 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader
+from reportlab.lib import pagesizes
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdftool import PDFTool
+from nicepdf.pipeline import Pipeline, ReorderStage
+
+
+class TestPipeline(Basetest):
+    """
+    test the in memory pipeline
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+        self.double_pages = 6
+        self.input_path = self.benchmark.get_example_booklet(self.double_pages)
+
+    def run_pipeline(self, spec: str, name: str) -> PdfReader:
+        """
+        run the pipeline with the given spec and return a reader of the result
+        """
+        output_path = os.path.join(self.benchmark.work_dir, f"pipeline_{name}.pdf")
+        tool = PDFTool(self.input_path, output_path)
+        pipeline = Pipeline.from_spec(spec, tool)
+        self.assertEqual(spec, str(pipeline))
+        pipeline.run()
+        reader = PdfReader(output_path)
+        return reader
+
+    def test_split(self):
+        """
+        test that the split stage creates the same pages as the un-booklet
+        """
+        output_path = os.path.join(self.benchmark.work_dir, "pipeline_unbooklet.pdf")
+        tool = PDFTool(self.input_path, output_path)
+        tool.split_booklet_style()
+        expected = PdfReader(output_path)
+        reader = self.run_pipeline("split", "split")
+        self.assertEqual(len(expected.pages), len(reader.pages))
+        for expected_page, page in zip(expected.pages, reader.pages):
+            self.assertEqual(
+                expected_page.extract_text().strip(), page.extract_text().strip()
+            )
+
+    def test_chain(self):
+        """
+        test chaining stages
+        """
+        half_pages = self.double_pages * 2
+        for spec, name, expected_pages in [
+            ("split scale:A3 watermark:draft optimize", "scale", half_pages),
+            ("split tile:A3", "tile", half_pages * 2),
+            ("split nup:2x2", "nup", half_pages // 4),
+            ("split reorder:1,3,5-7", "reorder", 5),
+        ]:
+            reader = self.run_pipeline(spec, name)
+            self.assertEqual(expected_pages, len(reader.pages), spec)
+            if name == "scale":
+                page = reader.pages[0]
+                self.assertAlmostEqual(pagesizes.A3[0], float(page.mediabox.width), 1)
+                self.assertIn("draft", page.extract_text())
+            if name == "reorder":
+                split_reader = self.run_pipeline("split", "split")
+                for index, page in zip([0, 2, 4, 5, 6], reader.pages):
+                    split_page = split_reader.pages[index]
+                    self.assertEqual(split_page.extract_text(), page.extract_text())
+
+    def test_reorder_indices(self):
+        """
+        test the page selection of the reorder stage
+        """
+        for order, expected in [
+            ("reverse", [3, 2, 1, 0]),
+            ("2", [1]),
+            ("4-2,1", [3, 2, 1, 0]),
+        ]:
+            stage = ReorderStage(None, order)
+            self.assertEqual(expected, stage.get_indices(4))
+
+    def test_unknown_stage(self):
+        """
+        test the error for an unknown stage
+        """
+        tool = PDFTool(self.input_path, None)
+        with self.assertRaises(ValueError):
+            Pipeline.from_spec("split shuffle", tool)
@@ -0,0 +1,122 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import logging
+import os
+import threading
+
+from ngwidgets.basetest import Basetest
+from ngwidgets.progress import TqdmProgressbar
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdftool import PDFTool
+from nicepdf.progress import (
+    JobProgress,
+    LogConsumer,
+    ProgressBus,
+    ProgressConsumer,
+    ProgressEvent,
+)
+
+
+class EventRecorder(ProgressConsumer):
+    """
+    records all events
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def on_progress(self, event: ProgressEvent):
+        self.events.append(event)
+
+
+class TestProgress(Basetest):
+    """
+    test the progress event bus
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def test_coalesce(self):
+        """
+        test that the updates of many threads are coalesced
+        """
+        recorder = EventRecorder()
+        job = JobProgress()
+        bus = ProgressBus(interval=3600, consumers=[recorder, job])
+        bus.total = 10000
+        bus.reset()
+        bus.set_description("tiling pages")
+
+        def work():
+            for _i in range(2500):
+                bus.update(1)
+
+        threads = [threading.Thread(target=work) for _i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        bus.close()
+        self.assertEqual(10000, bus.value)
+        # total, reset, stage, first update, done and final
+        self.assertLessEqual(len(recorder.events), 6)
+        last = recorder.events[-1]
+        self.assertTrue(last.final)
+        self.assertEqual("tiling pages", last.stage)
+        self.assertEqual(10000, job.as_dict()["done"])
+        self.assertEqual(0, job.as_dict()["eta"])
+
+    def test_eta(self):
+        """
+        test the estimated time
+        """
+        event = ProgressEvent(stage="writing pages", done=25, total=100, elapsed=2.0)
+        self.assertAlmostEqual(12.5, event.rate)
+        self.assertAlmostEqual(6.0, event.eta)
+        self.assertEqual("writing pages 25/100 step ETA 6 s", str(event))
+        event = ProgressEvent(stage="reading", done=0, total=100)
+        self.assertIsNone(event.eta)
+
+    def test_consumers(self):
+        """
+        test the progress bar and log consumers
+        """
+        progress_bar = TqdmProgressbar(total=10, desc="test", unit="step")
+        bus = ProgressBus.of(progress_bar)
+        self.assertIs(bus, ProgressBus.of(bus))
+        bus.subscribe(LogConsumer())
+        with self.assertLogs("nicepdf.progress", level=logging.INFO) as logs:
+            bus.set_description("counting")
+            for _i in range(10):
+                bus.update(1)
+            bus.close()
+        self.assertEqual(10, progress_bar.value)
+        self.assertIn("counting 10/10 step", logs.output[-1])
+
+    def test_unbooklet(self):
+        """
+        test the events of an un-booklet job
+        """
+        input_path = self.benchmark.get_example_booklet(20)
+        output_path = os.path.join(self.benchmark.work_dir, "progress.pdf")
+        tool = PDFTool(input_path, output_path)
+        recorder = EventRecorder()
+        bus = ProgressBus(tool.get_total_steps(), consumers=[recorder])
+        tool.split_booklet_style(bus)
+        stages = {event.stage for event in recorder.events}
+        if self.debug:
+            for event in recorder.events:
+                print(event)
+        self.assertIn("writing pages", stages)
+        last = recorder.events[-1]
+        self.assertTrue(last.final)
+        self.assertEqual(last.total, last.done)
+        # far fewer events than steps
+        self.assertLess(len(recorder.events), last.total / 4)
@@ -0,0 +1,65 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+
+from ngwidgets.basetest import Basetest
+from pypdf import PageObject, PdfReader, PdfWriter
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdftool import PDFTool, Watermark
+from nicepdf.resources import ResourceRegistry
+
+
+class TestResources(Basetest):
+    """
+    test the writer level resource registry
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def get_fonts(self, reader: PdfReader) -> set:
+        """
+        get the object numbers of the fonts used by the pages of the given reader
+        """
+        fonts = set()
+        for page in reader.pages:
+            for font in page["/Resources"]["/Font"].values():
+                fonts.add(font.idnum)
+        return fonts
+
+    def test_watermark_fonts(self):
+        """
+        test that the font of the watermarks is stored once
+        """
+        writer = PdfWriter()
+        registry = ResourceRegistry.of(writer)
+        self.assertIs(registry, ResourceRegistry.of(writer))
+        for i in range(5):
+            blank = PageObject.create_blank_page(None, 200, 300)
+            page = Watermark.get_watermarked_page(blank, f"page {i}")
+            registry.add_page(page)
+        self.assertEqual(4, registry.hits)
+        path = os.path.join(self.benchmark.work_dir, "watermarks.pdf")
+        writer.write(path)
+        reader = PdfReader(path)
+        self.assertEqual(1, len(self.get_fonts(reader)))
+
+    def test_unbooklet_fonts(self):
+        """
+        test that the half pages share the fonts of the booklet
+        """
+        input_path = self.benchmark.get_example_booklet(10)
+        output_path = os.path.join(self.benchmark.work_dir, "shared_fonts.pdf")
+        tool = PDFTool(input_path, output_path, debug=True)
+        tool.compact = True
+        tool.split_booklet_style()
+        reader = PdfReader(output_path)
+        self.assertEqual(20, len(reader.pages))
+        # the numbers font of the booklet and the font of the debug watermarks
+        self.assertEqual(2, len(self.get_fonts(reader)))
@@ -0,0 +1,141 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import math
+import os
+import tempfile
+from io import BytesIO
+
+from ngwidgets.basetest import Basetest
+from PIL import Image, ImageDraw
+from pypdf import Transformation
+from reportlab.lib import pagesizes
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from nicepdf.pdftool import PdfFile, PDFTool
+from nicepdf.scan_analysis import ScanAnalyzer
+
+
+class TestScanAnalysis(Basetest):
+    """
+    test the auto-cropping and deskew analysis of scans
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmp_dir = tempfile.mkdtemp(prefix="nicepdf_scan_analysis")
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+
+    def create_skewed_scan(self, path: str, angle: float, gutter: float, border: int):
+        """
+        create a single page scan with text lines rotated by the given angle,
+        a binding shadow at the given gutter and a black border
+        """
+        width, height = 1169, 827
+        image = Image.new("L", (width, height), 250)
+        draw = ImageDraw.Draw(image)
+        x = round(gutter * width)
+        draw.rectangle((x - 10, 0, x + 10, height), fill=120)
+        for y in range(120, height - 120, 24):
+            draw.rectangle((120, y, x - 60, y + 6), fill=20)
+            draw.rectangle((x + 60, y, width - 120, y + 6), fill=20)
+        image = image.rotate(angle, fillcolor=250)
+        framed = Image.new("L", (width, height), 0)
+        framed.paste(
+            image.crop((border, border, width - border, height - border)),
+            (border, border),
+        )
+        buffer = BytesIO()
+        framed.save(buffer, "JPEG", quality=90)
+        buffer.seek(0)
+        a4_landscape = pagesizes.landscape(pagesizes.A4)
+        c = canvas.Canvas(path, pagesize=a4_landscape)
+        c.drawImage(ImageReader(buffer), 0, 0, *a4_landscape)
+        c.showPage()
+        c.save()
+
+    def test_analyze(self):
+        """
+        test the content box, skew and gutter detection and the caching
+        """
+        path = os.path.join(self.tmp_dir, "skewed.pdf")
+        self.create_skewed_scan(path, angle=2.0, gutter=0.52, border=40)
+        pdf_file = PdfFile(path)
+        analyzer = ScanAnalyzer(cache_dir=self.cache_dir, max_workers=2)
+        analyses = pdf_file.analyze_scans(analyzer)
+        self.assertEqual(0, analyzer.cache_hits)
+        analysis = analyses[0]
+        if self.debug:
+            print(analysis)
+        left, top, right, bottom = analysis.bbox
+        self.assertAlmostEqual(40 / 1169, left, delta=0.01)
+        self.assertAlmostEqual(40 / 827, top, delta=0.01)
+        self.assertAlmostEqual(1 - 40 / 1169, right, delta=0.01)
+        self.assertAlmostEqual(1 - 40 / 827, bottom, delta=0.01)
+        # counter clockwise rotation is a negative (clockwise) skew
+        self.assertAlmostEqual(-2.0, analysis.skew, delta=0.5)
+        self.assertAlmostEqual(0.52, analysis.gutter, delta=0.01)
+        # a re-run uses the cache
+        analyses = pdf_file.analyze_scans(analyzer)
+        self.assertEqual(1, analyzer.cache_hits)
+        self.assertEqual(analysis, analyses[0])
+        pdf_file.close()
+
+    def get_image_matrix(self, page) -> Transformation:
+        """
+        get the transformation in effect when the image of the given page is drawn
+        """
+        ctm = Transformation()
+        stack = []
+        for operands, operator in page.get_contents().operations:
+            if operator == b"cm":
+                ctm = Transformation(tuple(float(v) for v in operands)).transform(ctm)
+            elif operator == b"q":
+                stack.append(ctm)
+            elif operator == b"Q":
+                ctm = stack.pop()
+            elif operator == b"Do":
+                return ctm
+        return None
+
+    def test_split_analyzed(self):
+        """
+        test splitting an analyzed scan
+        """
+        path = os.path.join(self.tmp_dir, "skewed.pdf")
+        gutter = 0.48
+        self.create_skewed_scan(path, angle=-1.5, gutter=gutter, border=30)
+        for compact in [False, True]:
+            output_path = path.replace(".pdf", f"-A4-{compact}.pdf")
+            tool = PDFTool(path, output_path)
+            tool.analyze = True
+            tool.compact = compact
+            tool.split_booklet_style()
+            self.assertTrue(os.path.exists(output_path))
+            output = PdfFile(output_path)
+            self.assertEqual(2, len(output.reader.pages))
+            page_edges = []
+            for page in output.reader.pages:
+                width = float(page.mediabox.width)
+                matrix = self.get_image_matrix(page)
+                a, b, _c, _d, _e, _f = matrix.ctm
+                # the gutter of the scan is at the inner edge of each half page
+                gutter_x, _y = matrix.apply_on((gutter, 0.5))
+                edge = round(gutter_x / width)
+                page_edges.append(edge)
+                with self.subTest(compact=compact):
+                    # the clockwise skew of the scan is rotated back
+                    self.assertAlmostEqual(
+                        1.5, math.degrees(math.atan2(b, a)), delta=0.5
+                    )
+                    # the black border is cropped - the image is scaled beyond
+                    # the two half pages it would cover without the analysis
+                    self.assertGreater(math.hypot(a, b), 2 * width * 1.03)
+                    self.assertAlmostEqual(edge * width, gutter_x, delta=3)
+            # one right and one left half page
+            self.assertEqual([0, 1], sorted(page_edges))
+            output.close()
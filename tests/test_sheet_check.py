@@ -0,0 +1,136 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import time
+
+from ngwidgets.basetest import Basetest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import NameObject
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.image_page import ImagePage
+from nicepdf.pdftool import PDFTool
+from nicepdf.sheet_check import SheetChecker
+
+
+class TestSheetCheck(Basetest):
+    """
+    test the pre-flight check for duplicate and missing scanned sides
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+        self.checker = SheetChecker()
+
+    def rescan(self, input_path: str, name: str, indices: list) -> str:
+        """
+        simulate a scan run that produced the sides with the given indices
+        """
+        reader = PdfReader(input_path)
+        writer = PdfWriter()
+        for index in indices:
+            writer.add_page(reader.pages[index])
+        output_path = os.path.join(self.benchmark.work_dir, f"{name}.pdf")
+        with open(output_path, "wb") as output_file:
+            writer.write(output_file)
+        return output_path
+
+    def test_hash_index(self):
+        """
+        test finding near duplicate hashes with the banded index
+        """
+        checker = SheetChecker(hash_size=4, max_distance=2)
+        hashes = {0: 0b0, 1: 0b1, 2: 0b111, 3: 0b11110000, 4: 0b11110011}
+        self.assertEqual(
+            [(0, 1, 1), (1, 2, 2), (3, 4, 2)],
+            checker.find_near_duplicates(hashes),
+        )
+
+    def test_booklets(self):
+        """
+        test that the sides of the example booklets are not flagged
+        """
+        for as_scan in [True, False]:
+            for with_random_rotation in [False, True]:
+                path = self.benchmark.get_example_booklet(
+                    20, with_random_rotation=with_random_rotation, as_scan=as_scan
+                )
+                start = time.perf_counter()
+                report = self.checker.check(path)
+                seconds = time.perf_counter() - start
+                if self.debug:
+                    print(f"{os.path.basename(path)} {seconds:.3f} s\n{report}")
+                with self.subTest(as_scan=as_scan, rotation=with_random_rotation):
+                    self.assertTrue(report.ok, str(report))
+                    if as_scan:
+                        self.assertEqual(20, len(report.hashes))
+
+    def test_duplicate_side(self):
+        """
+        test a side that has been scanned twice
+        """
+        input_path = self.benchmark.get_example_booklet(
+            6, with_random_rotation=True, as_scan=True
+        )
+        path = self.rescan(input_path, "duplicate_side", [0, 1, 2, 3, 3, 4, 5])
+        report = self.checker.check(path)
+        if self.debug:
+            print(report)
+        kinds = [issue.kind for issue in report.issues]
+        self.assertEqual(["count", "duplicate"], kinds)
+        self.assertEqual((3, 4), report.issues[1].page_indices)
+        self.assertIn("without the duplicates there are 6 sides", str(report))
+
+    def test_missing_side(self):
+        """
+        test a side that has not been scanned
+        """
+        input_path = self.benchmark.get_example_booklet(6, as_scan=True)
+        path = self.rescan(input_path, "missing_side", [0, 1, 2, 4, 5])
+        tool = PDFTool(path, os.path.join(self.benchmark.work_dir, "missing.pdf"))
+        report = tool.check_booklet()
+        self.assertEqual(["count"], [issue.kind for issue in report.issues])
+        self.assertIs(report, tool.sheet_report)
+
+    def test_unavailable(self):
+        """
+        test that a missing numpy does not abort the un-booklet
+        """
+        input_path = self.benchmark.get_example_booklet(4, as_scan=True)
+        output_path = os.path.join(self.benchmark.work_dir, "unavailable.pdf")
+        tool = PDFTool(input_path, output_path)
+        tool.check_sheets = True
+        is_available = SheetChecker.__dict__["is_available"]
+        try:
+            # simulate an installation without the scan extra
+            SheetChecker.is_available = classmethod(lambda cls: False)
+            tool.split_booklet_style()
+        finally:
+            SheetChecker.is_available = is_available
+        self.assertFalse(tool.sheet_report.available)
+        self.assertIn("check unavailable", str(tool.sheet_report))
+        self.assertEqual(8, len(PdfReader(output_path).pages))
+        self.assertTrue(SheetChecker.is_available())
+
+    def test_undecodable_scan(self):
+        """
+        test that a scan pypdf can not decode is rendered instead
+        """
+        input_path = self.benchmark.get_example_booklet(2, as_scan=True)
+        reader = PdfReader(input_path)
+        writer = PdfWriter()
+        for page in reader.pages:
+            writer.add_page(page)
+        image = ImagePage.detect(writer.pages[1]).image.get_object()
+        image[NameObject("/Filter")] = NameObject("/JBIG2Decode")
+        image[NameObject("/ColorSpace")] = NameObject("/DeviceCMYK")
+        path = os.path.join(self.benchmark.work_dir, "undecodable.pdf")
+        with open(path, "wb") as output_file:
+            writer.write(output_file)
+        report = self.checker.check(path)
+        self.assertEqual(2, len(report.hashes) + len(report.blank))
@@ -0,0 +1,85 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from ngwidgets.basetest import Basetest
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdftool import PDFTool
+from nicepdf.text_index import TextIndex
+
+
+class TestTextIndex(Basetest):
+    """
+    test the full-text index of the un-booklet results
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+        self.tmp_dir = tempfile.mkdtemp(prefix="nicepdf_text")
+        self.text_index = TextIndex(
+            os.path.join(self.tmp_dir, "text.db"), max_workers=2, chunk_pages=10
+        )
+
+    def test_unbooklet(self):
+        """
+        test indexing an un-booklet result in a process pool
+        """
+        input_path = self.benchmark.get_example_booklet(20)
+        output_path = os.path.join(self.tmp_dir, "booklet-A4.pdf")
+        tool = PDFTool(input_path, output_path)
+        tool.text_index = self.text_index
+        tool.split_booklet_style()
+        hits = self.text_index.search("17", output_path)
+        if self.debug:
+            for hit in hits:
+                print(hit)
+        self.assertEqual([17], [hit.page_num for hit in hits])
+        self.assertEqual("17", hits[0].label)
+        self.assertIn("<b>17</b>", hits[0].as_html())
+        # a copy is known by its content
+        copy_path = os.path.join(self.tmp_dir, "copy.pdf")
+        shutil.copy(output_path, copy_path)
+        file_hash = self.text_index.index_document(copy_path)
+        self.assertEqual(hits[0].file_hash, file_hash)
+        self.assertEqual(1, len(self.text_index.search("17")))
+        self.assertEqual([], self.text_index.search("17", input_path))
+
+    def test_to_match(self):
+        """
+        test that queries can not break the match syntax
+        """
+        self.assertEqual('"page" "1"*', TextIndex.to_match('page "1'))
+        self.assertEqual("", TextIndex.to_match('" * ('))
+        self.assertEqual([], self.text_index.search(") OR ("))
+
+    def test_many_documents(self):
+        """
+        test that searching stays fast for thousands of documents
+        """
+        pdf_path = os.path.join(self.tmp_dir, "dummy.pdf")
+        with open(pdf_path, "wb") as pdf_file:
+            pdf_file.write(b"%PDF-1.3")
+        words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta"]
+        for doc in range(3000):
+            pages = [
+                (str(page), f"document {doc} page {page} {words[(doc + page) % 7]}")
+                for page in range(1, 6)
+            ]
+            self.text_index.store(pdf_path, f"hash{doc}", pages)
+        start = time.perf_counter()
+        hits = self.text_index.search("document 2999 epsilon", limit=10)
+        seconds = time.perf_counter() - start
+        if self.debug:
+            print(f"{seconds*1000:.1f} ms {hits}")
+        self.assertEqual(["hash2999"], [hit.file_hash for hit in hits])
+        self.assertEqual(1, hits[0].page_num)
+        self.assertLess(seconds, 0.5)
@@ -0,0 +1,142 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+
+from ngwidgets.basetest import Basetest
+from pypdf import PageObject, PdfReader
+from reportlab.lib import pagesizes
+from reportlab.lib.units import mm
+
+from nicepdf.benchmark import Benchmark
+from nicepdf.pdftool import LazyPdfWriter, PDFTool
+from nicepdf.tiling import PaperFormat, TileGrid, Tiler
+
+
+class TestTiling(Basetest):
+    """
+    test the poster tiling and n-up engine
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.benchmark = Benchmark(verbose=debug)
+
+    def test_paper_format(self):
+        """
+        test named and custom paper formats
+        """
+        self.assertEqual(pagesizes.LETTER, PaperFormat.get_size("Letter"))
+        self.assertEqual(pagesizes.A4, PaperFormat.get_size("a4"))
+        width, height = PaperFormat.get_size("600x900mm")
+        self.assertAlmostEqual(600 * mm, width)
+        self.assertAlmostEqual(900 * mm, height)
+        self.assertEqual((1728.0, 2592.0), PaperFormat.get_size("24x36in"))
+        with self.assertRaises(ValueError):
+            PaperFormat.get_size("A4XL")
+
+    def test_tile_count(self):
+        """
+        test the number of tiles for some ratios - the former
+        poster code needed ceil(target/source) - 1 splits
+        """
+        a4_box = (0, 0, *pagesizes.A4)
+        for target, overlap, margin, expected in [
+            ("A3", 0, 0, (2, 2)),
+            ("A2", 0, 0, (2, 2)),
+            ("A0", 0, 0, (4, 4)),
+            ("A2", 10 * mm, 0, (3, 3)),
+            ("A1", 10 * mm, 5 * mm, (3, 4)),
+            ("600x900mm", 0, 0, (3, 3)),
+            ("Letter", 0, 0, (1, 1)),
+        ]:
+            grid = TileGrid(
+                a4_box, 0, *PaperFormat.get_size(target), *pagesizes.A4, overlap, margin
+            )
+            if self.debug:
+                print(f"{target} {overlap:.0f} {margin:.0f}: {grid.rows}x{grid.cols}")
+            self.assertEqual(expected, (grid.rows, grid.cols), target)
+            self.assertEqual(grid.rows * grid.cols, len(grid.tiles))
+        # landscape sheets need less tiles for an A3 poster
+        tiler = Tiler("A4")
+        page = PageObject.create_blank_page(None, *pagesizes.A4)
+        grid = tiler.get_grid(page, *pagesizes.A3)
+        self.assertEqual((2, 1), (grid.rows, grid.cols))
+        self.assertGreater(grid.sheet_width, grid.sheet_height)
+        # the grid is reused for pages of the same geometry
+        other_page = PageObject.create_blank_page(None, *pagesizes.A4)
+        self.assertIs(grid, tiler.get_grid(other_page, *pagesizes.A3))
+
+    def test_poster(self):
+        """
+        test creating a poster with overlap and crop marks
+        """
+        double_pages = 4
+        input_path = self.benchmark.get_example_booklet(
+            double_pages, with_random_rotation=True
+        )
+        output_path = os.path.join(self.benchmark.work_dir, "poster.pdf")
+        tool = PDFTool(input_path, output_path)
+        writer = tool.poster("A4", "A2", overlap=10 * mm, crop_marks=True)
+        # 3x2 portrait A4 sheets for each A4 landscape page scaled to A2
+        self.assertEqual(double_pages * 6, len(writer.pages))
+        reader = PdfReader(output_path)
+        forms = set()
+        for page in reader.pages:
+            sheet_size = sorted(float(value) for value in page.mediabox[2:])
+            for expected, value in zip(sorted(pagesizes.A4), sheet_size):
+                self.assertAlmostEqual(expected, value, places=3)
+            for xobject in page["/Resources"]["/XObject"].values():
+                forms.add(xobject.idnum)
+        # each page is stored once as a form and shared by its tiles
+        self.assertEqual(double_pages, len(forms))
+
+    def test_poster_parallel(self):
+        """
+        test that the process pool creates the same sheets in the same order
+        """
+        input_path = self.benchmark.get_example_booklet(
+            6, with_random_rotation=True, seed=3
+        )
+        contents = {}
+        for max_workers in [1, 2]:
+            output_path = os.path.join(
+                self.benchmark.work_dir, f"poster_{max_workers}_workers.pdf"
+            )
+            tool = PDFTool(input_path, output_path)
+            tool.max_workers = max_workers
+            # 4 tiles per page - 2 pages per shard
+            tool.poster_shard_tiles = 8
+            writer = tool.poster("A4", "A2", crop_marks=True)
+            if max_workers > 1:
+                # the concatenated output is not parsed again unless needed
+                self.assertIsInstance(writer, LazyPdfWriter)
+                self.assertFalse(writer.is_loaded())
+            self.assertEqual(24, len(writer.pages))
+            reader = PdfReader(output_path)
+            contents[max_workers] = [
+                (tuple(page.mediabox), page.get_contents().get_data())
+                for page in reader.pages
+            ]
+            forms = {
+                xobject.idnum
+                for page in reader.pages
+                for xobject in page["/Resources"]["/XObject"].values()
+            }
+            self.assertEqual(6, len(forms))
+        self.assertEqual(contents[1], contents[2])
+
+    def test_n_up(self):
+        """
+        test placing several pages on each sheet
+        """
+        input_path = self.benchmark.get_example_booklet(5)
+        output_path = os.path.join(self.benchmark.work_dir, "n_up.pdf")
+        tool = PDFTool(input_path, output_path)
+        writer = tool.n_up(2, 2, "Letter")
+        self.assertEqual(2, len(writer.pages))
+        page = writer.pages[0]
+        self.assertAlmostEqual(pagesizes.LETTER[0], float(page.mediabox.width))